@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Benchmark the LabelsOnFloor font generation pipeline
+Times each stage of generate_font_system.py across font sizes and charset sizes,
+records median/p95 wall time and peak RSS, and compares against a stored baseline
+"""
+
+import os
+import sys
+import json
+import glob
+import math
+import time
+import shutil
+import platform
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import generate_font_system as fontgen
+
+# Freely licensed fonts to benchmark against when no --font is given (first match wins)
+BENCHMARK_FONT_PATTERNS = [
+    "fonts/**/DejaVuSans.ttf",
+    "/usr/share/fonts/**/DejaVuSans.ttf",
+    "/usr/share/fonts/**/LiberationSans-Regular.ttf",
+    "/usr/local/share/fonts/**/DejaVuSans.ttf",
+    "/Library/Fonts/**/DejaVuSans.ttf",
+    os.path.expanduser("~/.fonts/**/DejaVuSans.ttf"),
+    "C:/Windows/Fonts/DejaVuSans.ttf",
+]
+
+# Matrix defaults - font sizes scale the cell size with them, like the "Doubled" constants
+DEFAULT_FONT_SIZES = [46, 92]
+DEFAULT_CHARSET_SIZES = [128, 256]
+DEFAULT_REPEAT = 5
+
+STAGES = ["coverage", "rasterize", "png_encode", "atlas_json", "preview"]
+
+def find_benchmark_font():
+    """Find a freely licensed font installed locally"""
+    for pattern in BENCHMARK_FONT_PATTERNS:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if matches:
+            return matches[0]
+    return None
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[rank]
+
+def get_peak_rss_kb():
+    """Peak resident set size of this process in KB, or None where unavailable"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports KB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def run_configuration(font_path, font_size, charset_size, repeat):
+    """Time every pipeline stage for one matrix point (runs in a fresh worker process)"""
+    # Scale the cell with the font size and the grid with the charset size
+    fontgen.FONT_SIZE = font_size
+    fontgen.CHAR_WIDTH = round(70 * font_size / 92)
+    fontgen.CHAR_HEIGHT = round(128 * font_size / 92)
+    fontgen.TOTAL_CHARS = charset_size
+    fontgen.TOTAL_ROWS = charset_size // fontgen.CHARS_PER_ROW
+    fontgen.GLYPH_CACHE_DIR = None  # Measure real rasterization, not cache hits
+    
+    charset = [fontgen.get_character_for_index(i) for i in range(charset_size)]
+    codepoints = {ord(c) for c in charset}
+    timings = {stage: [] for stage in STAGES}
+    output_dir = tempfile.mkdtemp(prefix="font_bench_")
+    
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            coverage = fontgen.read_cmap_coverage(font_path, codepoints)
+            timings["coverage"].append(time.perf_counter() - start)
+            
+            start = time.perf_counter()
+            img, supported_chars, ink_boxes = fontgen.build_font_texture(font_path, coverage)
+            timings["rasterize"].append(time.perf_counter() - start)
+            
+            start = time.perf_counter()
+            img.save(os.path.join(output_dir, "Font.png"), 'PNG')
+            timings["png_encode"].append(time.perf_counter() - start)
+            
+            # Keep the generator's own console output out of the report
+            with open(os.devnull, 'w') as devnull:
+                stdout = sys.stdout
+                sys.stdout = devnull
+                try:
+                    start = time.perf_counter()
+                    fontgen.generate_atlas_json("Bench", supported_chars, os.path.join(output_dir, "Atlas.json"),
+                                                ink_boxes=ink_boxes)
+                    timings["atlas_json"].append(time.perf_counter() - start)
+                    
+                    start = time.perf_counter()
+                    fontgen.generate_preview_image(font_path, "Bench", os.path.join(output_dir, "Preview.png"))
+                    timings["preview"].append(time.perf_counter() - start)
+                finally:
+                    sys.stdout = stdout
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    
+    totals = [sum(timings[stage][i] for stage in STAGES) for i in range(repeat)]
+    return {
+        "fontSize": font_size,
+        "charsetSize": charset_size,
+        "repeat": repeat,
+        "stages": {
+            stage: {"median": percentile(values, 0.5), "p95": percentile(values, 0.95)}
+            for stage, values in timings.items()
+        },
+        "total": {"median": percentile(totals, 0.5), "p95": percentile(totals, 0.95)},
+        "peakRssKb": get_peak_rss_kb(),
+    }
+
+def run_benchmarks(font_path, font_sizes, charset_sizes, repeat):
+    """Run the full matrix, each point in its own process so peak RSS is per configuration"""
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for font_size in font_sizes:
+        for charset_size in charset_sizes:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(run_configuration, font_path, font_size, charset_size, repeat).result()
+            results.append(result)
+            print_result(result)
+    return results
+
+def print_result(result):
+    """Print one matrix point as a table row per stage"""
+    print(f"\nFont size {result['fontSize']}, {result['charsetSize']} characters"
+          f" (peak RSS: {result['peakRssKb'] or '?'} KB)")
+    for stage in STAGES + ["total"]:
+        timing = result["stages"][stage] if stage != "total" else result["total"]
+        print(f"  {stage:<12} median {timing['median'] * 1000:8.1f} ms   p95 {timing['p95'] * 1000:8.1f} ms")
+
+def compare_with_baseline(results, baseline_path, threshold, min_delta):
+    """Report stages whose median got slower than the baseline by more than threshold
+    
+    Differences below min_delta seconds are ignored as noise. Returns the list of regressions.
+    """
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    
+    baseline_results = {(r["fontSize"], r["charsetSize"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        previous = baseline_results.get((result["fontSize"], result["charsetSize"]))
+        if previous is None:
+            continue
+        for stage in STAGES:
+            old = previous["stages"].get(stage, {}).get("median")
+            new = result["stages"][stage]["median"]
+            if old is None:
+                continue
+            if new - old > min_delta and new > old * (1 + threshold):
+                regressions.append((result["fontSize"], result["charsetSize"], stage, old, new))
+    
+    print(f"\nComparison with {baseline_path} (threshold {threshold:.0%}):")
+    if not regressions:
+        print("  No regressions")
+    for font_size, charset_size, stage, old, new in regressions:
+        print(f"  REGRESSION size {font_size}, {charset_size} chars, {stage}: "
+              f"{old * 1000:.1f} ms -> {new * 1000:.1f} ms (+{(new / old - 1):.0%})")
+    return regressions
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Benchmark the LabelsOnFloor font generation pipeline")
+    parser.add_argument("--font", help="Font file to benchmark (default: an installed DejaVu/Liberation font)")
+    parser.add_argument("--font-sizes", default=",".join(map(str, DEFAULT_FONT_SIZES)),
+                        help="Comma-separated font sizes")
+    parser.add_argument("--charset-sizes", default=",".join(map(str, DEFAULT_CHARSET_SIZES)),
+                        help=f"Comma-separated charset sizes (multiples of {fontgen.CHARS_PER_ROW}, max {fontgen.TOTAL_CHARS})")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Runs per configuration")
+    parser.add_argument("--output", default="font_benchmark.json", help="Results JSON file")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed slowdown of a stage median before it counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="Ignore slowdowns smaller than this many milliseconds")
+    args = parser.parse_args()
+    
+    font_path = args.font or find_benchmark_font()
+    if not font_path or not os.path.exists(font_path):
+        print("Error: no benchmark font found - pass --font or install DejaVu/Liberation fonts")
+        sys.exit(2)
+    
+    font_sizes = [int(size) for size in args.font_sizes.split(",")]
+    charset_sizes = [int(size) for size in args.charset_sizes.split(",")]
+    for size in charset_sizes:
+        if size % fontgen.CHARS_PER_ROW or not 0 < size <= fontgen.TOTAL_CHARS:
+            parser.error(f"charset size {size} must be a multiple of {fontgen.CHARS_PER_ROW} up to {fontgen.TOTAL_CHARS}")
+    
+    print("LabelsOnFloor Font Pipeline Benchmark")
+    print("=====================================")
+    print(f"Font: {font_path}")
+    
+    results = run_benchmarks(font_path, font_sizes, charset_sizes, args.repeat)
+    
+    report = {
+        "font": os.path.basename(font_path),
+        "fontHash": fontgen.hash_file(font_path),
+        "environment": {
+            "python": platform.python_version(),
+            "pillow": fontgen.PIL_VERSION,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    
+    if args.baseline:
+        if compare_with_baseline(results, args.baseline, args.threshold, args.min_delta_ms / 1000):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
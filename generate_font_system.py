@@ -4,12 +4,31 @@ Generate complete font system for LabelsOnFloor mod
 Creates Font.png, Atlas.json, and Preview.png for each font
 """
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw, ImageFont, __version__ as PIL_VERSION
+import numpy as np
 import os
 import sys
+import struct
+import bisect
 import json
 import glob
 import shutil
+import tempfile
+import io
+import contextlib
+import hashlib
+import functools
+import cProfile
+import sqlite3
+import time
+import zlib
+import select
+import ctypes
+import ctypes.util
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
 # Configuration
@@ -19,6 +38,8 @@ CHAR_WIDTH = 70  # Doubled from 35 for higher resolution
 CHAR_HEIGHT = 128  # Doubled from 64 for higher resolution
 FONT_SIZE = 92   # Doubled from 46 to match resolution increase
 OUTPUT_DIR = "mod-structure/Textures/Fonts"
+MANIFEST_FILE = ".build_manifest.json"  # Incremental build cache, stored in OUTPUT_DIR
+MANIFEST_VERSION = 1
 
 # Target fonts to generate (add more fonts here as needed)
 TARGET_FONTS = [
@@ -31,154 +52,1472 @@ TARGET_FONTS = [
     ("fonts/ttf/SpecialElite-Regular.ttf", "Typewriter"),  # Typewriter style font
 ]
 
+# Prebaked label layouts (Labels.json): common labels with their quads precomputed per font, so
+# the runtime can skip per-character glyph lookups for them. Labels are upper-cased like LabelMaker;
+# "{n}" expands to 1..PREBAKED_LABEL_NUMBERS for numbered default zone names.
+PREBAKED_LABELS = [
+    # Room roles
+    "bedroom", "barracks", "hospital", "dining room", "rec room", "kitchen", "workshop",
+    "laboratory", "prison cell", "prison barracks", "storeroom", "tomb", "throne room",
+    # Default zone names
+    "stockpile zone {n}", "dumping stockpile {n}", "growing zone {n}",
+    # Crops shown on growing zones
+    "rice plant", "potato plant", "corn plant", "strawberry plant", "haygrass", "cotton plant",
+    "devilstrand", "healroot", "hop plant", "smokeleaf plant", "psychoid plant",
+]
+PREBAKED_LABEL_NUMBERS = 9
+LABEL_TABLE_VERSION = 2
+LABEL_QUAD_BOTTOM = -0.3  # FontRenderer: -0.4 plus 0.1 vertical padding
+LABEL_QUAD_TOP = 1.7  # Plus the 2.0 glyph height of FontAtlas
+LABEL_QUAD_DIGITS = 6  # Decimals kept in label quads
+
 # Preview configuration - increased size for better readability
 PREVIEW_HEIGHT = 48  # Doubled height for better visibility
 PREVIEW_FONT_SIZE = 32  # Doubled font size for clarity
 PREVIEW_PADDING = 8  # Increased padding
 
+# Preview sprite sheet: every font's preview in one texture (in OUTPUT_DIR), indexed by a JSON file
+PREVIEW_SHEET_ENABLED = True
+PREVIEW_SHEET_NAME = "Previews"
+PREVIEW_SHEET_WIDTH = 1024  # Previews are packed into rows of this width
+PREVIEW_SHEET_GUTTER = 2  # Transparent pixels between previews to prevent filtering bleed
+PREVIEW_SHEET_VERSION = 1
+
 # Character mapping configuration
 TOTAL_CHARS = 256  # 16x16 grid
 
-def get_character_for_index(index):
-    """Get the character that should be at this grid position"""
-    if index == 0:
-        return ' '  # Space at position 0
+# The slot of every grid character is declared once in CHARSET_SPEC_FILE and compiled into dense
+# lookup tables: Charset.bin in OUTPUT_DIR and a C# source file compiled into the mod
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CHARSET_SPEC_FILE = os.path.join(SCRIPT_DIR, "font_charset.json")
+CHARSET_CSHARP_FILE = os.path.join(SCRIPT_DIR, "src", "LabelsOnFloor", "FontLibrary", "CharsetTable.g.cs")
+CHARSET_BIN_FILE = "Charset.bin"
+CHARSET_BIN_MAGIC = b'LOFC'
+CHARSET_BIN_VERSION = 1
+CHARSET_BIN_HEADER = struct.Struct('<4sHHI')  # magic, version, slot count, lookup table length
+# Followed by slot count little-endian uint32 codepoints and lookup table length int16 slots (-1 = none)
+
+# Atlas layout: "grid" (fixed 16x16 cells, read by FontAtlas/GenericFont),
+# "packed" (glyphs trimmed to their ink bounds and bin-packed, per-glyph rects in Atlas.json) or
+# "paged" (codepoint space split into 16x16 grid pages, only pages holding supported glyphs written)
+ATLAS_LAYOUT = "grid"
+PACK_GUTTER = 2  # Transparent pixels around each packed glyph to prevent filtering bleed
+MAX_TEXTURE_SIZE = 4096
+
+# Paged layout: page N holds codepoints N * PAGE_SIZE .. N * PAGE_SIZE + PAGE_SIZE - 1 in its
+# 16x16 grid, so a glyph's page and cell follow from its codepoint alone
+PAGE_SIZE = CHARS_PER_ROW * TOTAL_ROWS
+PAGE_SCRIPT_RANGES = {
+    "latin": [(0x0020, 0x007E), (0x00A0, 0x024F), (0x1E00, 0x1EFF)],
+    "greek": [(0x0370, 0x03FF), (0x1F00, 0x1FFF)],
+    "cyrillic": [(0x0400, 0x052F)],
+    "cjk": [(0x3000, 0x30FF), (0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xFF00, 0xFFEF)],
+    "hangul": [(0x1100, 0x11FF), (0x3130, 0x318F), (0xAC00, 0xD7A3)],
+}
+PAGE_SCRIPTS = ["latin", "greek", "cyrillic"]
+
+# Signed distance field mode: glyphs are rasterized at SDF_SCALE x the SDF cell size, turned
+# into a distance field and area-averaged down into single-channel SDF_CELL_WIDTH x SDF_CELL_HEIGHT cells
+SDF_ENABLED = False
+SDF_CELL_WIDTH = 35
+SDF_CELL_HEIGHT = 64
+SDF_SCALE = 4  # Internal rasterization resolution multiplier
+SDF_SPREAD = 4  # Distance range in output pixels on each side of the glyph edge
+
+# Corpus-driven subsetting (--charset-from): only glyphs used by the corpus plus the baseline
+# are put in the atlases. None disables subsetting.
+CHARSET_SUBSET = None
+CHARSET_BASELINE = "0020-007E"  # Hex codepoint ranges always kept when subsetting
+CORPUS_SUFFIXES = {".xml", ".txt", ".rws"}  # Files picked up when a corpus path is a directory
+CORPUS_XML_SUFFIXES = {".xml", ".rws"}  # Translations and save games; only text and attributes count
+
+# Atlas texture PNG encoding. Glyphs are always white, so only alpha carries information:
+# "rgba" (runtime default), "la" (luminance + alpha), "l" (alpha stored as luminance - the shader
+# must read it as alpha) or "palette" (8-bit indices into 256 white alpha levels). Value: decoded
+# bytes per pixel. Distance field textures are single-channel already and ignore this.
+PNG_ENCODINGS = {"rgba": 4, "la": 2, "l": 1, "palette": 1}
+PNG_ENCODING = "rgba"
+PNG_COMPRESS_LEVEL = 6  # zlib level, 0-9
+PNG_STRATEGIES = {
+    "default": -1,  # Pillow's choice (adaptive row filters), not the same as zlib.Z_DEFAULT_STRATEGY
+    "filtered": zlib.Z_FILTERED,
+    "huffman": zlib.Z_HUFFMAN_ONLY,
+    "rle": zlib.Z_RLE,
+    "fixed": zlib.Z_FIXED,
+}
+PNG_STRATEGY = "default"
+PNG_REPORT = False  # Print size/time of every encoding and level for each atlas texture
+PNG_REPORT_LEVELS = [1, 6, 9]
+
+# Block-compressed DDS copies of atlas textures (--dds): "bc4" keeps alpha (or the distance field)
+# in one channel at 4 bits per pixel, "dxt5" keeps RGBA at 8 bits per pixel. None disables them.
+DDS_FORMAT = None
+DDS_FOURCC = {"bc4": b'ATI1', "dxt5": b'DXT5'}
+DDS_MAGIC = b'DDS '
+DDS_HEADER = struct.Struct('<4s7I11I2I4s5I5I')  # Magic, DDS_HEADER with its DDS_PIXELFORMAT
+DDS_FLAGS = 0x1 | 0x2 | 0x4 | 0x1000 | 0x80000  # Caps, height, width, pixel format, linear size
+DDS_PIXEL_FORMAT_FOURCC = 0x4
+DDS_CAPS_TEXTURE = 0x1000
+DDS_MAX_ERROR = 32  # Largest per-pixel alpha error accepted from the block encoder
+
+# Watch mode (--watch): font files that trigger a rebuild, and change batching
+FONT_SUFFIXES = (".ttf", ".otf", ".ttc")
+WATCH_DEBOUNCE = 0.5  # Seconds without further changes before rebuilding
+WATCH_POLL_INTERVAL = 1.0  # Used when inotify isn't available
+
+# Combined output (--combined): the full-resolution textures of every built font in one shared
+# atlas ("atlas") or in equal-size slices for a texture array ("array"), plus a Combined.json index
+COMBINED_MODE = None
+COMBINED_DIR_NAME = "Combined"  # In OUTPUT_DIR
+COMBINED_VERSION = 1
+
+# Golden-output check (--verify): per-pixel difference that still counts as unchanged, and where
+# diff heatmaps are written
+VERIFY_TOLERANCE = 2
+VERIFY_REPORT_DIR = "font_verify"
+
+# Loaded fonts are kept for the life of the process: {(path, size): ((mtime, file size), ImageFont)}
+_loaded_fonts = {}
+
+# Persistent glyph raster cache shared by runs and worker processes (None disables it)
+GLYPH_CACHE_DIR = ".glyph_cache"
+GLYPH_CACHE_MAX_BYTES = 64 * 1024 * 1024
+GLYPH_RENDER_MARGIN = 8  # Extra pixels around the text bbox when rasterizing, trimmed afterwards
+INK_MARGIN = 1  # Pixels kept around each glyph's ink box in Atlas.json for texture filtering
+
+# Profiling (--profile): per-font stage timings and counters, merged from worker processes
+PROFILE_ENABLED = False
+PROFILE_CPROFILE_DIR = None  # Write a cProfile dump per font task here when set
+_profile_data = {}  # {font: {"stages": {stage: seconds}, "counters": {name: value}}}
+_profile_font = None
+_profile_stack = []  # [[stage, seconds spent in nested stages], ...]
+
+# Resolution tiers written per font, each area-averaged from the full-resolution atlas.
+# "full" is always generated as Font.png; other tiers become Font<Name>.png (e.g. FontHalf.png)
+TIER_FACTORS = {"full": 1, "half": 2, "quarter": 4}
+RESOLUTION_TIERS = ["full"]
+
+# Atlas.json format versions - loaders must check this before reading per-glyph rects
+ATLAS_FORMAT_GRID = 1
+ATLAS_FORMAT_PACKED = 2
+ATLAS_FORMAT_PAGED = 3
+
+# Atlas.bin - little-endian sidecar with a fixed header and one record per supported glyph,
+# sorted by codepoint, holding the final (padded, vertically flipped) UV rect FontAtlas uses
+ATLAS_BIN_MAGIC = b'LOFA'
+ATLAS_BIN_VERSION = 1
+ATLAS_BIN_HEADER = struct.Struct('<4sHHIHHHHHH8x')  # magic, version, header size, glyph count,
+                                                    # texture w/h, cell w/h, record size, flags
+ATLAS_BIN_RECORD = np.dtype([
+    ('codepoint', '<u4'),
+    ('uvLeft', '<f4'), ('uvBottom', '<f4'), ('uvRight', '<f4'), ('uvTop', '<f4'),
+    ('advance', '<f4'),  # In cell widths
+])
+ATLAS_BIN_FLAG_PACKED = 1
+ATLAS_BIN_FLAG_DISTANCE_FIELD = 2
+ATLAS_BIN_FLAG_PAGED = 4  # UVs are relative to page codepoint // PAGE_SIZE
+
+@contextlib.contextmanager
+def profile_stage(stage):
+    """Time a pipeline stage for the font being processed (no-op unless profiling)
     
-    # Basic ASCII (1-94) -> characters 33-126
-    if index < 95:
-        return chr(32 + index)
+    Stages nest: time spent in an inner stage is only credited to the inner one, so the
+    stage times of a font add up to its wall time.
+    """
+    if not PROFILE_ENABLED or _profile_font is None:
+        yield
+        return
     
-    # Latin-1 Supplement (95-190) -> characters 160-255
-    if index < 191:
-        return chr(160 + (index - 95))
+    _profile_stack.append([stage, 0.0])
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _, nested = _profile_stack.pop()
+        stages = _profile_data.setdefault(_profile_font, {"stages": {}, "counters": {}})["stages"]
+        stages[stage] = stages.get(stage, 0.0) + elapsed - nested
+        if _profile_stack:
+            _profile_stack[-1][1] += elapsed
+
+def profiled(stage):
+    """Decorator form of profile_stage"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_stage(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def profile_count(counter, amount=1):
+    """Add to a per-font profiling counter (no-op unless profiling)"""
+    if PROFILE_ENABLED and _profile_font is not None:
+        counters = _profile_data.setdefault(_profile_font, {"stages": {}, "counters": {}})["counters"]
+        counters[counter] = counters.get(counter, 0) + amount
+
+@contextlib.contextmanager
+def profile_font(font_name, task):
+    """Attribute profiled stages to a font, optionally recording a cProfile dump of the task"""
+    global _profile_font
+    if not PROFILE_ENABLED:
+        yield
+        return
     
-    # Cyrillic (191-254) -> characters 1040-1103 (А-я)
-    # This covers Russian alphabet (uppercase and lowercase)
-    # 1040-1071 = А-Я (uppercase), 1072-1103 = а-я (lowercase)
-    if index < 255:
-        cyrillic_start = 1040  # Cyrillic 'А'
-        return chr(cyrillic_start + (index - 191))
+    _profile_font = font_name
+    profiler = None
+    if PROFILE_CPROFILE_DIR:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        with profile_stage("other"):
+            yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(PROFILE_CPROFILE_DIR, exist_ok=True)
+            profiler.dump_stats(os.path.join(PROFILE_CPROFILE_DIR, f"{font_name}.{task}.prof"))
+        _profile_font = None
+
+def take_profile_data():
+    """Return and reset the profiling data collected in this process"""
+    global _profile_data
+    data, _profile_data = _profile_data, {}
+    return data
+
+def merge_profile_data(data):
+    """Merge profiling data returned by a worker into this process"""
+    for font_name, font_data in data.items():
+        target = _profile_data.setdefault(font_name, {"stages": {}, "counters": {}})
+        for section in ("stages", "counters"):
+            for key, value in font_data[section].items():
+                target[section][key] = target[section].get(key, 0) + value
+
+def save_png(img, output_path, compress_level=None):
+    """Encode an image as PNG, recording encode time and output size when profiling"""
+    options = {
+        "compress_level": PNG_COMPRESS_LEVEL if compress_level is None else compress_level,
+        "compress_type": PNG_STRATEGIES[PNG_STRATEGY],
+    }
+    if img.mode == 'P' and "transparency" in img.info:
+        options["transparency"] = img.info["transparency"]
+    with profile_stage("png_encode"):
+        img.save(output_path, 'PNG', **options)
+    profile_count("bytes_written", os.path.getsize(output_path))
+
+def encode_texture(img, encoding=None):
+    """Convert a white-glyph RGBA atlas texture to a PNG_ENCODINGS encoding
+    
+    Images that aren't RGBA (distance fields) are returned unchanged.
+    """
+    encoding = encoding or PNG_ENCODING
+    if img.mode != 'RGBA' or encoding == "rgba":
+        return img
+    if encoding == "la":
+        return img.convert('LA')
     
-    # Last position (255) - special character or fallback
-    return '?'
+    alpha = img.getchannel('A')
+    if encoding == "l":
+        return alpha
+    # Palette index i is white with alpha i, so the indices are the alpha channel itself
+    paletted = Image.frombytes('P', alpha.size, alpha.tobytes())
+    paletted.putpalette([255, 255, 255] * 256)
+    paletted.info["transparency"] = bytes(range(256))
+    return paletted
 
-def get_index_for_character(char):
-    """Get the grid index for a character"""
-    char_code = ord(char)
+def decode_texture(img, encoding=None):
+    """Inverse of encode_texture: expand a decoded PNG back to RGBA"""
+    encoding = encoding or PNG_ENCODING
+    if encoding == "l" and img.mode == 'L':
+        return Image.merge('RGBA', [Image.new('L', img.size, 255)] * 3 + [img])
+    return img.convert('RGBA')
+
+def verify_texture_png(img, output_path):
+    """Check that an encoded texture decodes to the same alpha (and visible colour) as the RGBA original"""
+    with Image.open(output_path) as decoded:
+        decoded = decode_texture(decoded)
+    original = np.asarray(img)
+    result = np.asarray(decoded)
+    if not np.array_equal(original[:, :, 3], result[:, :, 3]):
+        raise ValueError(f"{os.path.basename(output_path)}: {PNG_ENCODING} encoding changed the alpha channel")
+    visible = original[:, :, 3] > 0
+    if not np.array_equal(original[visible, :3], result[visible, :3]):
+        raise ValueError(f"{os.path.basename(output_path)}: {PNG_ENCODING} encoding changed glyph colours")
+
+def report_png_encodings(img, name):
+    """Print encoded size, encode time and decoded size of an RGBA texture for every encoding and level"""
+    print(f"  PNG encodings for {name} ({img.width}x{img.height}, strategy {PNG_STRATEGY}):")
+    for encoding, bytes_per_pixel in PNG_ENCODINGS.items():
+        encoded = encode_texture(img, encoding)
+        decoded_mb = img.width * img.height * bytes_per_pixel / (1024 * 1024)
+        for level in PNG_REPORT_LEVELS:
+            buffer = io.BytesIO()
+            start = time.perf_counter()
+            options = {"transparency": encoded.info["transparency"]} if encoded.mode == 'P' else {}
+            encoded.save(buffer, 'PNG', compress_level=level, compress_type=PNG_STRATEGIES[PNG_STRATEGY], **options)
+            elapsed = time.perf_counter() - start
+            current = "*" if (encoding, level) == (PNG_ENCODING, PNG_COMPRESS_LEVEL) else " "
+            print(f"   {current}{encoding:<8} level {level}: {buffer.tell() / 1024:8.1f} KB"
+                  f"  {elapsed * 1000:7.1f} ms  decoded {decoded_mb:5.2f} MB")
+
+def get_dds_blocks(channel):
+    """Split a 2D array (dimensions multiples of 4) into rows of 16 block pixels, row-major per block"""
+    height, width = channel.shape[:2]
+    blocks = channel.reshape(height // 4, 4, width // 4, 4, *channel.shape[2:]).swapaxes(1, 2)
+    return blocks.reshape(height // 4 * (width // 4), 16, *channel.shape[2:])
+
+def put_dds_blocks(blocks, height, width):
+    """Inverse of get_dds_blocks"""
+    image = blocks.reshape(height // 4, width // 4, 4, 4, *blocks.shape[2:]).swapaxes(1, 2)
+    return image.reshape(height, width, *blocks.shape[2:])
+
+def get_bc4_palettes(a0, a1):
+    """The 8 values a BC4 block with endpoints a0, a1 decodes to, per block"""
+    a0 = a0.astype(np.int32)[:, None]
+    a1 = a1.astype(np.int32)[:, None]
+    steps = np.arange(1, 7)
+    # a0 > a1: six interpolated values; otherwise four plus explicit 0 and 255
+    eight = ((7 - steps) * a0 + steps * a1 + 3) // 7
+    six = ((5 - steps[:4]) * a0 + steps[:4] * a1 + 2) // 5
+    six = np.concatenate([six, np.zeros_like(a0), np.full_like(a0, 255)], axis=1)
+    return np.concatenate([a0, a1, np.where(a0 > a1, eight, six)], axis=1)
+
+def encode_bc4_blocks(blocks):
+    """Encode (n, 16) uint8 blocks as BC4, returning (n, 8) block bytes
+    
+    Both endpoint modes are tried for every block - min/max with six interpolated values, or the
+    range without 0 and 255 plus exact 0 and 255 (which suits anti-aliased glyph edges) - and the
+    one with the lower squared error is kept.
+    """
+    values = blocks.astype(np.int32)
+    candidates = []
+    interior = (values > 0) & (values < 255)
+    low = np.where(interior, values, 255).min(axis=1)
+    high = np.where(interior, values, 0).max(axis=1)
+    low, high = np.minimum(low, high), np.maximum(low, high)  # Blocks of only 0/255 get 0..0
+    for a0, a1 in [(values.max(axis=1), values.min(axis=1)), (low, high)]:
+        palettes = get_bc4_palettes(a0, a1)
+        distances = (values[:, :, None] - palettes[:, None, :]) ** 2
+        indices = distances.argmin(axis=2)
+        errors = np.take_along_axis(distances, indices[:, :, None], axis=2).sum(axis=(1, 2))
+        candidates.append((a0, a1, indices, errors))
+    
+    use_second = candidates[1][3] < candidates[0][3]
+    a0 = np.where(use_second, candidates[1][0], candidates[0][0])
+    a1 = np.where(use_second, candidates[1][1], candidates[0][1])
+    indices = np.where(use_second[:, None], candidates[1][2], candidates[0][2]).astype(np.uint64)
+    
+    bits = (indices << (np.arange(16, dtype=np.uint64) * 3)).sum(axis=1, dtype=np.uint64)
+    encoded = np.zeros((len(blocks), 8), dtype=np.uint8)
+    encoded[:, 0] = a0
+    encoded[:, 1] = a1
+    encoded[:, 2:] = (bits[:, None] >> (np.arange(6, dtype=np.uint64) * 8)).astype(np.uint8)
+    return encoded
+
+def decode_bc4_blocks(encoded):
+    """Decode (n, 8) BC4 block bytes to (n, 16) uint8 values"""
+    bits = (encoded[:, 2:].astype(np.uint64) << (np.arange(6, dtype=np.uint64) * 8)).sum(axis=1, dtype=np.uint64)
+    indices = ((bits[:, None] >> (np.arange(16, dtype=np.uint64) * 3)) & 7).astype(np.intp)
+    palettes = get_bc4_palettes(encoded[:, 0], encoded[:, 1])
+    return np.take_along_axis(palettes, indices, axis=1).astype(np.uint8)
+
+def unpack_rgb565(colors):
+    """Expand RGB565 values to (n, 3) 8-bit colours"""
+    colors = colors.astype(np.int32)
+    r, g, b = colors >> 11, (colors >> 5) & 63, colors & 31
+    return np.stack([(r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)], axis=1)
+
+def get_color_palettes(c0, c1):
+    """The 4 colours of a DXT5 colour block (always 4-colour mode), as (n, 4, 3)"""
+    rgb0, rgb1 = unpack_rgb565(c0), unpack_rgb565(c1)
+    return np.stack([rgb0, rgb1, (2 * rgb0 + rgb1 + 1) // 3, (rgb0 + 2 * rgb1 + 1) // 3], axis=1)
+
+def encode_dxt5_blocks(blocks):
+    """Encode (n, 16, 4) RGBA uint8 blocks as DXT5, returning (n, 16) block bytes
+    
+    Colour endpoints span the bounding box of the visible pixels only: the colour under zero
+    alpha never shows, and glyph texels are all white, so glyph colour survives exactly.
+    """
+    rgb = blocks[:, :, :3].astype(np.int32)
+    visible = blocks[:, :, 3] > 0
+    high = np.where(visible[:, :, None], rgb, 0).max(axis=1)
+    low = np.where(visible[:, :, None], rgb, 255).min(axis=1)
+    low = np.minimum(low, high)  # Blocks without visible pixels get black endpoints
+    
+    def pack_rgb565(colors):
+        return ((colors[:, 0] * 31 + 127) // 255 << 11) | ((colors[:, 1] * 63 + 127) // 255 << 5) \
+            | ((colors[:, 2] * 31 + 127) // 255)
+    c0, c1 = pack_rgb565(high), pack_rgb565(low)
+    c0, c1 = np.maximum(c0, c1), np.minimum(c0, c1)
+    palettes = get_color_palettes(c0, c1)
+    distances = ((rgb[:, :, None, :] - palettes[:, None, :, :]) ** 2).sum(axis=3)
+    indices = np.where(visible, distances.argmin(axis=2), 0).astype(np.uint32)
+    
+    encoded = np.zeros((len(blocks), 16), dtype=np.uint8)
+    encoded[:, :8] = encode_bc4_blocks(blocks[:, :, 3])
+    color_block = np.zeros(len(blocks), dtype=[('c0', '<u2'), ('c1', '<u2'), ('indices', '<u4')])
+    color_block['c0'] = c0
+    color_block['c1'] = c1
+    color_block['indices'] = (indices << (np.arange(16, dtype=np.uint32) * 2)).sum(axis=1, dtype=np.uint32)
+    encoded[:, 8:] = color_block.view(np.uint8).reshape(-1, 8)
+    return encoded
+
+def decode_dxt5_blocks(encoded):
+    """Decode (n, 16) DXT5 block bytes to (n, 16, 4) RGBA uint8 pixels"""
+    color_block = np.ascontiguousarray(encoded[:, 8:]).view(
+        [('c0', '<u2'), ('c1', '<u2'), ('indices', '<u4')]).reshape(-1)
+    indices = ((color_block['indices'][:, None] >> (np.arange(16, dtype=np.uint32) * 2)) & 3).astype(np.intp)
+    palettes = get_color_palettes(color_block['c0'], color_block['c1'])
+    rgb = np.take_along_axis(palettes, indices[:, :, None], axis=1)
+    alpha = decode_bc4_blocks(np.ascontiguousarray(encoded[:, :8]))
+    return np.concatenate([rgb, alpha[:, :, None]], axis=2).astype(np.uint8)
+
+def get_dds_source(img):
+    """The array a texture is block-compressed from: alpha (or the single channel) for BC4, RGBA for DXT5"""
+    if DDS_FORMAT == "bc4":
+        return np.asarray(img.getchannel('A') if img.mode == 'RGBA' else img)
+    return np.asarray(img.convert('RGBA'))
+
+def write_dds(img, output_path):
+    """Block-compress an atlas texture into a DDS file; returns the decoded pixels it will show"""
+    source = get_dds_source(img)
+    height, width = source.shape[:2]
+    if width % 4 or height % 4:
+        raise ValueError(f"{os.path.basename(output_path)}: {width}x{height} is not a multiple of 4x4 blocks")
+    
+    blocks = get_dds_blocks(source)
+    encoded = encode_bc4_blocks(blocks) if DDS_FORMAT == "bc4" else encode_dxt5_blocks(blocks)
+    fourcc = DDS_FOURCC[DDS_FORMAT]
+    header = DDS_HEADER.pack(
+        DDS_MAGIC, DDS_HEADER.size - len(DDS_MAGIC), DDS_FLAGS, height, width, encoded.nbytes,
+        0, 0, *[0] * 11, 32, DDS_PIXEL_FORMAT_FOURCC, fourcc, 0, 0, 0, 0, 0, DDS_CAPS_TEXTURE, 0, 0, 0, 0)
+    with open(output_path, 'wb') as f:
+        f.write(header)
+        f.write(encoded.tobytes())
+    profile_count("bytes_written", len(header) + encoded.nbytes)
+    return source
+
+def read_dds(path):
+    """Read and decode a DDS file written by write_dds, returning the decoded pixels"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    fields = DDS_HEADER.unpack_from(data)
+    magic, height, width, fourcc = fields[0], fields[3], fields[4], fields[21]
+    formats = {code: name for name, code in DDS_FOURCC.items()}
+    if magic != DDS_MAGIC or fourcc not in formats:
+        raise ValueError(f"{path} is not a BC4/DXT5 DDS file")
     
-    # Space
-    if char_code == 32:
-        return 0
+    block_size = 8 if formats[fourcc] == "bc4" else 16
+    encoded = np.frombuffer(data, dtype=np.uint8, offset=DDS_HEADER.size).reshape(-1, block_size)
+    if len(encoded) != (width // 4) * (height // 4):
+        raise ValueError(f"{path}: {len(encoded)} blocks for {width}x{height}")
+    blocks = decode_bc4_blocks(encoded) if block_size == 8 else decode_dxt5_blocks(encoded)
+    return put_dds_blocks(blocks, height, width)
+
+def get_psnr(original, result):
+    """Peak signal-to-noise ratio of 8-bit values in dB (inf when identical)"""
+    mse = np.mean((original.astype(np.float64) - result.astype(np.float64)) ** 2) if original.size else 0.0
+    return float('inf') if mse == 0 else 10 * np.log10(255 ** 2 / mse)
+
+@profiled("dds")
+def save_texture_dds(img, output_path):
+    """Write the block-compressed DDS of an atlas texture, decode it back and report the error"""
+    source = write_dds(img, output_path)
+    decoded = read_dds(output_path)
     
-    # Basic ASCII (33-126)
-    if 33 <= char_code <= 126:
-        return char_code - 32
+    # Alpha (or the single channel) must be within the block format's error; colour only matters where visible
+    alpha, decoded_alpha = (source, decoded) if source.ndim == 2 else (source[:, :, 3], decoded[:, :, 3])
+    max_error = int(np.abs(alpha.astype(np.int16) - decoded_alpha).max())
+    report = f"PSNR {get_psnr(alpha, decoded_alpha):.1f} dB, max error {max_error}"
+    if source.ndim == 3:
+        visible = alpha > 0
+        report += f", colour PSNR {get_psnr(source[visible, :3], decoded[visible, :3]):.1f} dB"
+    if max_error > DDS_MAX_ERROR:
+        raise ValueError(f"{os.path.basename(output_path)}: {DDS_FORMAT} error {max_error} exceeds {DDS_MAX_ERROR}")
+    print(f"  Generated {os.path.basename(output_path)} ({DDS_FORMAT.upper()}, "
+          f"{os.path.getsize(output_path) / 1024:.0f} KB; {report})")
+
+def save_texture_png(img, output_path):
+    """Save an atlas texture with the configured PNG_ENCODING, verifying it decodes losslessly
+    
+    With DDS_FORMAT set, a verified block-compressed copy is written next to it.
+    """
+    if PNG_REPORT and img.mode == 'RGBA':
+        report_png_encodings(img, os.path.basename(output_path))
+    save_png(encode_texture(img), output_path)
+    if img.mode == 'RGBA' and PNG_ENCODING != "rgba":
+        with profile_stage("png_verify"):
+            verify_texture_png(img, output_path)
+    if DDS_FORMAT:
+        save_texture_dds(img, os.path.splitext(output_path)[0] + ".dds")
+
+def load_charset_spec(path=None):
+    """Read the declarative charset spec"""
+    with open(path or CHARSET_SPEC_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def compile_charset(spec):
+    """Compile a charset spec into (slot codepoints, codepoint -> slot lookup table)
     
-    # Latin-1 Supplement (160-255)
-    if 160 <= char_code <= 255:
-        return 95 + (char_code - 160)
+    Each range puts codepoints first..last into consecutive slots from its "slot"; slots no
+    range covers draw the "fill" character (which keeps its own slot in the lookup table).
+    Raises ValueError for ranges that overlap or don't fit.
+    """
+    slot_count = spec["slots"]
+    slots = [None] * slot_count
+    mapped = {}
+    for entry in spec["ranges"]:
+        first, last = int(entry["first"], 16), int(entry["last"], 16)
+        for offset, codepoint in enumerate(range(first, last + 1)):
+            slot = entry["slot"] + offset
+            if slot >= slot_count:
+                raise ValueError(f"charset range {entry['name']} runs past slot {slot_count - 1}")
+            if slots[slot] is not None or codepoint in mapped:
+                raise ValueError(f"charset range {entry['name']} overlaps another range at U+{codepoint:04X}")
+            slots[slot] = codepoint
+            mapped[codepoint] = slot
     
-    # Cyrillic (1040-1103) - Russian alphabet
-    if 1040 <= char_code <= 1103:
-        return 191 + (char_code - 1040)
+    fill = int(spec["fill"], 16)
+    if fill not in mapped:
+        raise ValueError(f"charset fill character U+{fill:04X} has no slot of its own")
+    slots = [fill if codepoint is None else codepoint for codepoint in slots]
     
-    # Character not in our mapping
-    return -1
+    lookup = [-1] * (max(mapped) + 1)
+    for codepoint, slot in mapped.items():
+        lookup[codepoint] = slot
+    return slots, lookup
+
+def verify_charset(slots, lookup):
+    """Consistency check: every slot's character must map back to that slot (or be fill)"""
+    for slot, codepoint in enumerate(slots):
+        mapped_slot = lookup[codepoint] if codepoint < len(lookup) else -1
+        if mapped_slot < 0 or (mapped_slot != slot and slots[mapped_slot] != codepoint):
+            raise ValueError(f"charset slot {slot} (U+{codepoint:04X}) does not round-trip")
+    for codepoint, slot in enumerate(lookup):
+        if slot >= 0 and slots[slot] != codepoint:
+            raise ValueError(f"charset lookup of U+{codepoint:04X} points at slot {slot}")
+
+CHARSET_SLOTS, CHARSET_LOOKUP = compile_charset(load_charset_spec())
+
+def get_character_for_index(index):
+    """Get the character that should be at this grid position"""
+    return chr(CHARSET_SLOTS[index])
+
+def get_index_for_character(char):
+    """Get the grid index for a character, or -1 if it's not in the charset"""
+    char_code = ord(char)
+    return CHARSET_LOOKUP[char_code] if char_code < len(CHARSET_LOOKUP) else -1
+
+def write_charset_bin(output_path):
+    """Write the compiled charset tables for the runtime to load"""
+    header = CHARSET_BIN_HEADER.pack(CHARSET_BIN_MAGIC, CHARSET_BIN_VERSION, len(CHARSET_SLOTS), len(CHARSET_LOOKUP))
+    with open(output_path, 'wb') as f:
+        f.write(header)
+        f.write(np.array(CHARSET_SLOTS, dtype='<u4').tobytes())
+        f.write(np.array(CHARSET_LOOKUP, dtype='<i2').tobytes())
+
+def render_charset_csharp():
+    """C# source of the compiled charset tables"""
+    def format_array(values, per_line):
+        rows = [", ".join(str(v) for v in values[i:i + per_line]) for i in range(0, len(values), per_line)]
+        return ",\n".join(f"            {row}" for row in rows)
+    
+    return f"""// <auto-generated>
+// Generated by generate_font_system.py from font_charset.json - edit the spec, not this file.
+// </auto-generated>
+namespace LabelsOnFloor.FontLibrary
+{{
+    public static class CharsetTable
+    {{
+        public const int SlotCount = {len(CHARSET_SLOTS)};
+
+        // Codepoint drawn in each atlas slot
+        public static readonly int[] SlotCodepoints =
+        {{
+{format_array(CHARSET_SLOTS, 16)}
+        }};
+
+        // Atlas slot of every codepoint below CodepointToSlot.Length, -1 if unmapped
+        public static readonly short[] CodepointToSlot =
+        {{
+{format_array(CHARSET_LOOKUP, 32)}
+        }};
+
+        public static int GetSlot(char character)
+        {{
+            return character < CodepointToSlot.Length ? CodepointToSlot[character] : -1;
+        }}
+    }}
+}}
+"""
+
+def update_charset_csharp():
+    """Regenerate the C# charset table if the spec changed; returns True when the file was rewritten"""
+    source = render_charset_csharp()
+    try:
+        with open(CHARSET_CSHARP_FILE, 'r', encoding='utf-8') as f:
+            if f.read() == source:
+                return False
+    except OSError:
+        if not os.path.isdir(os.path.dirname(CHARSET_CSHARP_FILE)):
+            return False  # Generator used outside the mod source tree
+    with open(CHARSET_CSHARP_FILE, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(source)
+    return True
 
 def load_font(font_path, size):
-    """Load a font with fallback"""
+    """Load a font with fallback
+    
+    Fonts stay loaded (warm across --watch rebuilds) until their file changes.
+    """
+    try:
+        stat = os.stat(font_path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        stamp = None
+    cached = _loaded_fonts.get((font_path, size))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    
     try:
-        return ImageFont.truetype(font_path, size)
+        font = ImageFont.truetype(font_path, size)
     except:
         print(f"Warning: Could not load font {font_path}, using default")
         return ImageFont.load_default()
+    if stamp is not None:
+        _loaded_fonts[(font_path, size)] = (stamp, font)
+    return font
 
-def generate_font_texture(font_path, font_name, output_path):
-    """Generate the main font texture atlas"""
+@profiled("coverage")
+def read_cmap_coverage(font_path, codepoints):
+    """Return the subset of codepoints the font's Unicode cmap maps to a real glyph
+    
+    Reads the sfnt 'cmap' table directly (formats 0, 4, 6 and 12), so coverage for the
+    whole charset is answered in one pass without rendering. Returns None if the file
+    isn't a readable TrueType/OpenType font, in which case callers fall back to ink checks.
+    """
+    try:
+        with open(font_path, 'rb') as f:
+            data = f.read()
+        
+        font_offset = 0
+        if data[:4] == b'ttcf':
+            # Font collection - ImageFont.truetype uses the first face by default
+            font_offset = struct.unpack_from('>I', data, 12)[0]
+        
+        num_tables = struct.unpack_from('>H', data, font_offset + 4)[0]
+        cmap_offset = None
+        for i in range(num_tables):
+            tag, _, offset, _ = struct.unpack_from('>4sIII', data, font_offset + 12 + i * 16)
+            if tag == b'cmap':
+                cmap_offset = offset
+                break
+        if cmap_offset is None:
+            return None
+        
+        lookups = []
+        num_subtables = struct.unpack_from('>H', data, cmap_offset + 2)[0]
+        for i in range(num_subtables):
+            platform_id, encoding_id, offset = struct.unpack_from('>HHI', data, cmap_offset + 4 + i * 8)
+            # Unicode platform, or Windows Unicode BMP / full repertoire
+            if platform_id == 0 or (platform_id == 3 and encoding_id in (1, 10)):
+                lookup = _cmap_subtable_lookup(data, cmap_offset + offset)
+                if lookup is not None:
+                    lookups.append(lookup)
+        if not lookups:
+            return None
+        
+        return {cp for cp in codepoints if any(lookup(cp) for lookup in lookups)}
+    except (OSError, struct.error):
+        return None
+
+def _cmap_subtable_lookup(data, offset):
+    """Build a codepoint -> glyph id function for one cmap subtable (None if unsupported format)"""
+    subtable_format = struct.unpack_from('>H', data, offset)[0]
+    
+    if subtable_format == 0:
+        glyph_ids = data[offset + 6:offset + 6 + 256]
+        return lambda cp: glyph_ids[cp] if cp < 256 else 0
+    
+    if subtable_format == 6:
+        first_code, entry_count = struct.unpack_from('>HH', data, offset + 6)
+        def lookup_format6(cp):
+            if first_code <= cp < first_code + entry_count:
+                return struct.unpack_from('>H', data, offset + 10 + (cp - first_code) * 2)[0]
+            return 0
+        return lookup_format6
+    
+    if subtable_format == 4:
+        seg_count = struct.unpack_from('>H', data, offset + 6)[0] // 2
+        end_codes = struct.unpack_from(f'>{seg_count}H', data, offset + 14)
+        start_codes_at = offset + 16 + seg_count * 2
+        start_codes = struct.unpack_from(f'>{seg_count}H', data, start_codes_at)
+        id_deltas = struct.unpack_from(f'>{seg_count}h', data, start_codes_at + seg_count * 2)
+        range_offsets_at = start_codes_at + seg_count * 4
+        range_offsets = struct.unpack_from(f'>{seg_count}H', data, range_offsets_at)
+        def lookup_format4(cp):
+            # Segments are sorted by end code: the first one ending at or after cp is the candidate
+            seg = bisect.bisect_left(end_codes, cp)
+            if seg == seg_count or cp < start_codes[seg]:
+                return 0
+            if range_offsets[seg] == 0:
+                return (cp + id_deltas[seg]) & 0xFFFF
+            # idRangeOffset is relative to its own position in the array
+            glyph_at = range_offsets_at + seg * 2 + range_offsets[seg] + (cp - start_codes[seg]) * 2
+            glyph_id = struct.unpack_from('>H', data, glyph_at)[0]
+            return (glyph_id + id_deltas[seg]) & 0xFFFF if glyph_id else 0
+        return lookup_format4
+    
+    if subtable_format == 12:
+        num_groups = struct.unpack_from('>I', data, offset + 12)[0]
+        groups = struct.unpack_from(f'>{num_groups * 3}I', data, offset + 16)
+        start_chars, end_chars, start_glyphs = groups[0::3], groups[1::3], groups[2::3]
+        def lookup_format12(cp):
+            # Groups are sorted by start code: the last one starting at or before cp is the candidate
+            group = bisect.bisect_right(start_chars, cp) - 1
+            if group < 0 or cp > end_chars[group]:
+                return 0
+            return start_glyphs[group] + (cp - start_chars[group])
+        return lookup_format12
+    
+    return None
+
+def get_glyph_coverage(font_path, codepoints):
+    """Codepoints of the charset to rasterize: those the font maps, limited to CHARSET_SUBSET
+    
+    Returns None when the font has no cmap and no subset is configured (test render everything).
+    """
+    if CHARSET_SUBSET is not None:
+        codepoints = set(codepoints) & CHARSET_SUBSET
+    coverage = read_cmap_coverage(font_path, codepoints)
+    if coverage is None and CHARSET_SUBSET is not None:
+        return set(codepoints)
+    return coverage
+
+def parse_codepoint_ranges(text):
+    """Parse comma-separated hex codepoints and ranges ("0020-007E,00B0") into a set"""
+    codepoints = set()
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        codepoints.update(range(int(first, 16), int(last or first, 16) + 1))
+    return codepoints
+
+def iter_corpus_files(paths):
+    """Yield corpus files, walking directories for CORPUS_SUFFIXES files"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in sorted(os.walk(path)):
+                for name in sorted(files):
+                    if os.path.splitext(name)[1].lower() in CORPUS_SUFFIXES:
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+def iter_corpus_text(paths):
+    """Stream the text of corpus files in chunks
+    
+    XML files yield element text and attribute values (not markup); other files are read as UTF-8.
+    """
+    for path in iter_corpus_files(paths):
+        if os.path.splitext(path)[1].lower() in CORPUS_XML_SUFFIXES:
+            try:
+                for _, elem in ET.iterparse(path):
+                    if elem.text:
+                        yield elem.text
+                    yield from elem.attrib.values()
+                    elem.clear()
+            except ET.ParseError as e:
+                print(f"Warning: Could not parse {path}: {e}")
+        else:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                while True:
+                    chunk = f.read(65536)
+                    if not chunk:
+                        break
+                    yield chunk
+
+def collect_corpus_codepoints(paths, baseline=""):
+    """Set of printable codepoints used by the corpus, plus the baseline ranges"""
+    codepoints = parse_codepoint_ranges(baseline)
+    for chunk in iter_corpus_text(paths):
+        codepoints.update(map(ord, chunk))
+    # Control characters never reach a label
+    return {cp for cp in codepoints if cp >= 0x20 and not 0x7F <= cp < 0xA0}
+
+def get_glyph_cell_position(bbox, cell_width=None, cell_height=None):
+    """Get the draw position of a character relative to the top-left of its cell
+    
+    bbox is the character's text bbox when drawn at the origin. Cell size defaults to
+    CHAR_WIDTH x CHAR_HEIGHT; padding scales with the cell height.
+    """
+    cell_width = cell_width or CHAR_WIDTH
+    cell_height = cell_height or CHAR_HEIGHT
+    
+    # Get character dimensions and metrics
+    char_w = bbox[2] - bbox[0]
+    char_h = bbox[3] - bbox[1]
+    
+    # Center character horizontally
+    char_x = (cell_width - char_w) // 2
+    
+    # Proper baseline positioning with padding to prevent clipping:
+    # Characters should be centered vertically in their cell
+    # Add 4px padding top and bottom to prevent clipping (doubled for resolution)
+    padding = 4 * cell_height // CHAR_HEIGHT  # Doubled from 2px
+    available_height = cell_height - (padding * 2)
+    char_y = padding + (available_height - char_h) // 2
+    
+    # Account for font metrics offset (bbox can have negative y)
+    if bbox[1] < 0:
+        char_y -= bbox[1]  # Compensate for ascender offset
+    
+    return char_x, char_y
+
+GlyphRaster = namedtuple('GlyphRaster', ['bbox', 'left', 'top', 'mask'])
+GlyphRaster.__doc__ = """A rendered glyph: text bbox at the origin, ink offset from the draw origin and uint8 ink mask"""
+
+def render_glyph_raster(font, char):
+    """Rasterize one character into a tight coverage mask"""
+    draw = ImageDraw.Draw(Image.new('L', (1, 1)))
+    bbox = draw.textbbox((0, 0), char, font=font)
+    
+    margin = GLYPH_RENDER_MARGIN
+    canvas = Image.new('L', (bbox[2] - bbox[0] + margin * 2, bbox[3] - bbox[1] + margin * 2), 0)
+    ImageDraw.Draw(canvas).text((margin - bbox[0], margin - bbox[1]), char, fill=255, font=font)
+    
+    ink_box = canvas.getbbox()
+    if ink_box is None:
+        return GlyphRaster(bbox, 0, 0, np.zeros((0, 0), dtype=np.uint8))
+    return GlyphRaster(bbox, ink_box[0] - margin + bbox[0], ink_box[1] - margin + bbox[1],
+                       np.asarray(canvas.crop(ink_box)))
+
+class GlyphCache:
+    """Size-bounded LRU store of rendered glyph rasters, kept in SQLite under GLYPH_CACHE_DIR
+    
+    Entries are keyed by font file hash, font size, codepoint and render options, so changing
+    the layout, grid or charset only rasterizes glyphs that were never rendered before.
+    """
+    
+    def __init__(self, cache_dir, max_bytes):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.connection = sqlite3.connect(os.path.join(cache_dir, "glyphs.sqlite3"), timeout=60)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS glyphs ("
+            " key TEXT PRIMARY KEY, metrics BLOB NOT NULL, mask BLOB NOT NULL,"
+            " bytes INTEGER NOT NULL, last_used REAL NOT NULL)")
+    
+    @staticmethod
+    def make_key(font_hash, size, char):
+        return f"{font_hash}:{size}:{ord(char)}:L:{PIL_VERSION}"
+    
+    def get_many(self, keys):
+        """Look up rasters by key, returning {key: GlyphRaster} for the hits"""
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self.connection.execute(
+                f"SELECT key, metrics, mask FROM glyphs WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+            for key, metrics, mask in rows:
+                x0, y0, x1, y1, left, top, width, height = struct.unpack('<8i', metrics)
+                pixels = np.frombuffer(zlib.decompress(mask), dtype=np.uint8).reshape(height, width)
+                found[key] = GlyphRaster((x0, y0, x1, y1), left, top, pixels)
+        
+        if found:
+            now = time.time()
+            with self.connection:
+                self.connection.executemany("UPDATE glyphs SET last_used = ? WHERE key = ?",
+                                            [(now, key) for key in found])
+        return found
+    
+    def put_many(self, items):
+        """Store (key, GlyphRaster) pairs, then evict least recently used entries over the size limit"""
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for key, raster in items:
+            height, width = raster.mask.shape
+            metrics = struct.pack('<8i', *raster.bbox, raster.left, raster.top, width, height)
+            mask = zlib.compress(raster.mask.tobytes(), 6)
+            rows.append((key, metrics, mask, len(metrics) + len(mask), now))
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO glyphs VALUES (?, ?, ?, ?, ?)", rows)
+        self.evict()
+    
+    def evict(self):
+        """Drop least recently used entries until the store fits in max_bytes"""
+        total = self.connection.execute("SELECT COALESCE(SUM(bytes), 0) FROM glyphs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in self.connection.execute("SELECT key, bytes FROM glyphs ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        with self.connection:
+            self.connection.executemany("DELETE FROM glyphs WHERE key = ?", stale)
+    
+    def close(self):
+        self.connection.close()
+
+@profiled("rasterize")
+def open_glyph_cache(font_path):
+    """Open the glyph cache for rasterizing one font, returning (cache, font hash)
+    
+    Returns (None, None) when caching is disabled. Callers that rasterize the same font in several
+    batches (the pages of a paged atlas) open it once, pass both on and close the cache.
+    """
+    if not GLYPH_CACHE_DIR:
+        return None, None
+    font_hash = hash_file(font_path) if os.path.exists(font_path) else "default"
+    return GlyphCache(GLYPH_CACHE_DIR, GLYPH_CACHE_MAX_BYTES), font_hash
+
+def rasterize_glyphs(font_path, font, size, chars, cache=None, font_hash=None):
+    """Rasterize chars at the given font size, reusing cached rasters where possible
+    
+    cache and font_hash come from open_glyph_cache; without them the cache is opened for this
+    call. Returns {char: GlyphRaster}; characters that fail to render are left out.
+    """
+    chars = list(dict.fromkeys(chars))
+    own_cache = cache is None
+    if own_cache:
+        cache, font_hash = open_glyph_cache(font_path)
+    try:
+        cached = {}
+        if cache is not None:
+            keys = {char: GlyphCache.make_key(font_hash, size, char) for char in chars}
+            cached = cache.get_many(list(keys.values()))
+        
+        rasters = {}
+        rendered = []
+        for char in chars:
+            raster = cached.get(keys[char]) if cache is not None else None
+            if raster is None:
+                try:
+                    raster = render_glyph_raster(font, char)
+                except Exception as e:
+                    # The glyph counts as unsupported; the rest of the font still renders
+                    print(f"  Warning: could not render U+{ord(char):04X}: {type(e).__name__}: {e}")
+                    continue
+                if cache is not None:
+                    rendered.append((keys[char], raster))
+            rasters[char] = raster
+        
+        if cache is not None:
+            cache.put_many(rendered)
+            print(f"  Glyph cache: {len(cached)} cached, {len(rendered)} rendered")
+            profile_count("glyphs_cached", len(cached))
+            profile_count("glyphs_rendered", len(rendered))
+        else:
+            profile_count("glyphs_rendered", len(rasters))
+        return rasters
+    finally:
+        if own_cache and cache is not None:
+            cache.close()
+
+def rasterize_charset(font_path, font, size, chars, coverage, cache=None, font_hash=None):
+    """Rasterize the characters of a charset (None entries are skipped) like rasterize_glyphs
+    
+    Characters outside CHARSET_SUBSET are left out. Codepoints missing from coverage (see
+    read_cmap_coverage) all draw the font's .notdef glyph, usually a tofu box, so only the first
+    of them is rendered and the rest share its raster. Like any glyph they count as supported
+    where that raster has ink in their cell.
+    """
+    chars = [c for c in dict.fromkeys(chars)
+             if c is not None and (CHARSET_SUBSET is None or ord(c) in CHARSET_SUBSET)]
+    if coverage is None:
+        return rasterize_glyphs(font_path, font, size, chars, cache, font_hash)
+    unmapped = [c for c in chars if ord(c) not in coverage]
+    rasters = rasterize_glyphs(font_path, font, size, [c for c in chars if ord(c) in coverage] + unmapped[:1],
+                               cache, font_hash)
+    notdef = rasters.get(unmapped[0]) if unmapped else None
+    if notdef is not None:
+        rasters.update(dict.fromkeys(unmapped, notdef))
+    return rasters
+
+def place_glyph_in_cell(raster, cell_width=None, cell_height=None):
+    """Position a glyph raster in its cell
+    
+    Returns (left, top, coverage): the mask's offset from the cell's top-left corner and a
+    cell-sized uint8 array holding the part of the glyph that falls inside the cell.
+    """
+    cell_width = cell_width or CHAR_WIDTH
+    cell_height = cell_height or CHAR_HEIGHT
+    cell_x, cell_y = get_glyph_cell_position(raster.bbox, cell_width, cell_height)
+    left = cell_x + raster.left
+    top = cell_y + raster.top
+    
+    coverage = np.zeros((cell_height, cell_width), dtype=np.uint8)
+    height, width = raster.mask.shape
+    x0, y0 = max(0, left), max(0, top)
+    x1, y1 = min(cell_width, left + width), min(cell_height, top + height)
+    if x0 < x1 and y0 < y1:
+        coverage[y0:y1, x0:x1] = raster.mask[y0 - top:y1 - top, x0 - left:x1 - left]
+    return left, top, coverage
+
+def get_ink_box(pixels, left=0, top=0):
+    """(left, top, right, bottom) of the non-zero part of a 2D array, offset by (left, top), or None"""
+    columns, rows = np.flatnonzero(pixels.any(axis=0)), np.flatnonzero(pixels.any(axis=1))
+    if not len(columns):
+        return None
+    return left + int(columns[0]), top + int(rows[0]), left + int(columns[-1]) + 1, top + int(rows[-1]) + 1
+
+@profiled("assemble")
+def build_font_texture(font_path, coverage=None, charset=None, cache=None, font_hash=None):
+    """Rasterize the grid font texture atlas, returning (image, supported_chars, ink_boxes)
+    
+    coverage is the result of read_cmap_coverage for the charset; it is read from the font
+    when not given. charset lists the character of each cell (None leaves a cell empty) and
+    defaults to the 256-slot mapping of get_character_for_index. cache and font_hash are
+    passed to rasterize_glyphs. ink_boxes maps each supported character to the texture pixel
+    box of its own ink inside its cell (see add_glyph_metrics).
+    """
     texture_width = CHAR_WIDTH * CHARS_PER_ROW
     texture_height = CHAR_HEIGHT * TOTAL_ROWS
     
     # Create a new image with transparent background
     img = Image.new('RGBA', (texture_width, texture_height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
     
     # Load font
     font = load_font(font_path, FONT_SIZE)
     
     # Track character support
     supported_chars = {}
+    ink_boxes = {}
+    
+    # Answer "is this codepoint in the font" for the whole charset up front
+    if charset is None:
+        charset = [get_character_for_index(i) for i in range(TOTAL_CHARS)]
+    if coverage is None:
+        coverage = get_glyph_coverage(font_path, {ord(c) for c in charset if c is not None})
+    
+    rasters = rasterize_charset(font_path, font, FONT_SIZE, charset, coverage, cache, font_hash)
     
     # Generate each character
     for row in range(TOTAL_ROWS):
         for col in range(CHARS_PER_ROW):
             index = row * CHARS_PER_ROW + col
-            char = get_character_for_index(index)
+            char = charset[index]
+            if char is None:
+                continue
+            raster = rasters.get(char)
+            if raster is None:
+                supported_chars[char] = False
+                continue
             
             # Calculate position in texture
             x = col * CHAR_WIDTH
             y = row * CHAR_HEIGHT
             
-            # Get character dimensions and metrics
-            bbox = draw.textbbox((0, 0), char, font=font)
-            char_w = bbox[2] - bbox[0]
-            char_h = bbox[3] - bbox[1]
-            
-            # Center character horizontally
-            char_x = x + (CHAR_WIDTH - char_w) // 2
-            
-            # Proper baseline positioning with padding to prevent clipping:
-            # Characters should be centered vertically in their cell
-            # Add 4px padding top and bottom to prevent clipping (doubled for resolution)
-            padding = 4  # Doubled from 2px
-            available_height = CHAR_HEIGHT - (padding * 2)
-            char_y = y + padding + (available_height - char_h) // 2
-            
-            # Account for font metrics offset (bbox can have negative y)
-            if bbox[1] < 0:
-                char_y -= bbox[1]  # Compensate for ascender offset
+            # Mapped glyphs can still be empty (space, NBSP) or fall outside their cell, so
+            # the glyph only counts as supported if some of its ink lands inside its own cell
+            left, top, cell_coverage = place_glyph_in_cell(raster)
+            has_pixels = bool(cell_coverage.any())
+            if has_pixels:
+                img.paste((255, 255, 255, 255), (x + left, y + top), Image.fromarray(raster.mask, 'L'))
+                ink_boxes[char] = get_ink_box(cell_coverage, x, y)
+            supported_chars[char] = has_pixels
+    
+    return img, supported_chars, ink_boxes
+
+def generate_font_texture(font_path, font_name, output_path):
+    """Generate the main font texture atlas, returning (supported_chars, ink_boxes)"""
+    img, supported_chars, ink_boxes = build_font_texture(font_path)
+    
+    # Save the texture
+    save_texture_png(img, output_path)
+    print(f"  Generated Font.png ({img.width}x{img.height} pixels)")
+    
+    return supported_chars, ink_boxes
+
+def get_page_codepoints():
+    """Codepoints of the configured PAGE_SCRIPTS (or the charset subset when subsetting), sorted"""
+    if CHARSET_SUBSET is not None:
+        return sorted(CHARSET_SUBSET)
+    codepoints = set()
+    for script in PAGE_SCRIPTS:
+        for first, last in PAGE_SCRIPT_RANGES[script]:
+            codepoints.update(range(first, last + 1))
+    return sorted(codepoints)
+
+def get_page_texture_name(page):
+    """Texture name (without extension) for an atlas page"""
+    return f"FontPage{page:04X}"
+
+@profiled("assemble")
+def generate_paged_font_textures(font_path, font_name, font_output_dir):
+    """Generate one grid texture per codepoint page that holds supported glyphs
+    
+    Returns (supported_chars, paged_layout, ink_boxes) where paged_layout maps each written page
+    number to its texture name and ink_boxes holds the glyph ink boxes of every page.
+    """
+    coverage = get_glyph_coverage(font_path, get_page_codepoints())
+    if coverage is None:
+        raise ValueError("the paged layout needs a font with a cmap table")
+    
+    pages = {}
+    for codepoint in sorted(coverage):
+        pages.setdefault(codepoint // PAGE_SIZE, []).append(codepoint)
+    
+    supported_chars = {}
+    ink_boxes = {}
+    paged_layout = {"pages": {}}
+    # Hash the font and open the glyph cache once for all pages
+    cache, font_hash = open_glyph_cache(font_path)
+    try:
+        for page, codepoints in pages.items():
+            charset = [None] * PAGE_SIZE
+            for codepoint in codepoints:
+                charset[codepoint % PAGE_SIZE] = chr(codepoint)
+            img, page_supported, page_ink_boxes = build_font_texture(font_path, coverage, charset, cache, font_hash)
+            supported_chars.update(page_supported)
+            ink_boxes.update(page_ink_boxes)
             
-            # Test if character is actually supported by rendering it and checking for pixels
-            # This is the most reliable way - if nothing is drawn, the font doesn't support it
-            try:
-                # Create a small test image just for this character
-                test_img = Image.new('RGBA', (CHAR_WIDTH, CHAR_HEIGHT), (0, 0, 0, 0))
-                test_draw = ImageDraw.Draw(test_img)
-                
-                # Get character bounding box for centering
-                bbox = test_draw.textbbox((0, 0), char, font=font)
-                test_char_w = bbox[2] - bbox[0]
-                test_char_h = bbox[3] - bbox[1]
-                
-                # Center the character in test image
-                test_x = (CHAR_WIDTH - test_char_w) // 2
-                test_y = (CHAR_HEIGHT - test_char_h) // 2
-                if bbox[1] < 0:
-                    test_y -= bbox[1]
-                
-                # Draw the character
-                test_draw.text((test_x, test_y), char, fill=(255, 255, 255, 255), font=font)
-                
-                # Check if any pixels were actually drawn
-                # Get the alpha channel (transparency) to see if anything was rendered
-                pixels = test_img.getdata(3)  # Get alpha channel
-                has_pixels = any(p > 0 for p in pixels)
-                
-                if has_pixels:
-                    # Character is supported - draw it in the main texture
-                    draw.text((char_x, char_y), char, fill=(255, 255, 255, 255), font=font)
-                    supported_chars[char] = True
-                else:
-                    # No pixels drawn - character not supported
-                    supported_chars[char] = False
-            except Exception as e:
-                # Error rendering character
+            # Pages whose mapped glyphs are all blank (e.g. only spaces) aren't worth a texture
+            glyph_count = sum(1 for v in page_supported.values() if v)
+            if not glyph_count:
+                continue
+            texture_name = get_page_texture_name(page)
+            save_texture_png(img, os.path.join(font_output_dir, f"{texture_name}.png"))
+            paged_layout["pages"][page] = texture_name
+            print(f"  Generated {texture_name}.png ({glyph_count} glyphs)")
+    finally:
+        if cache is not None:
+            cache.close()
+    
+    return supported_chars, paged_layout, ink_boxes
+
+def pack_skyline(sizes, width, height):
+    """Place (width, height) rectangles with a bottom-left skyline packer
+    
+    Returns a list of (x, y) positions in the same order as sizes, or None if they don't fit.
+    """
+    # Skyline segments as [x, y, width], left to right, covering the full texture width
+    skyline = [[0, 0, width]]
+    positions = [None] * len(sizes)
+    
+    # Tallest first keeps the skyline flat
+    for i in sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0])):
+        rect_w, rect_h = sizes[i]
+        best = None
+        for start in range(len(skyline)):
+            x = skyline[start][0]
+            if x + rect_w > width:
+                break
+            # The rectangle rests on the highest segment it spans
+            y = 0
+            spanned = 0
+            seg = start
+            while spanned < rect_w:
+                y = max(y, skyline[seg][1])
+                spanned += skyline[seg][2]
+                seg += 1
+            if y + rect_h <= height and (best is None or (y + rect_h, x) < (best[1] + rect_h, best[0])):
+                best = (x, y, start)
+        if best is None:
+            return None
+        
+        x, y, start = best
+        positions[i] = (x, y)
+        
+        # Raise the skyline under the new rectangle, trimming the segments it covers
+        new_skyline = skyline[:start] + [[x, y + rect_h, rect_w]]
+        right = x + rect_w
+        for seg_x, seg_y, seg_w in skyline[start:]:
+            if seg_x + seg_w <= right:
+                continue
+            if seg_x < right:
+                seg_w -= right - seg_x
+                seg_x = right
+            new_skyline.append([seg_x, seg_y, seg_w])
+        
+        # Merge neighbours at the same height
+        skyline = [new_skyline[0]]
+        for seg in new_skyline[1:]:
+            if seg[1] == skyline[-1][1]:
+                skyline[-1][2] += seg[2]
+            else:
+                skyline.append(seg)
+    
+    return positions
+
+@profiled("pack")
+def find_packed_texture_size(sizes):
+    """Find the smallest power-of-two texture the rectangles pack into
+    
+    Returns (width, height, positions).
+    """
+    total_area = sum(w * h for w, h in sizes)
+    max_w = max((w for w, _ in sizes), default=1)
+    max_h = max((h for _, h in sizes), default=1)
+    
+    candidates = []
+    width = 1
+    while width <= MAX_TEXTURE_SIZE:
+        height = 1
+        while height <= MAX_TEXTURE_SIZE:
+            if width >= max_w and height >= max_h and width * height >= total_area:
+                candidates.append((width * height, abs(width - height), width, height))
+            height *= 2
+        width *= 2
+    
+    # Smallest area first, squarest on ties
+    for _, _, width, height in sorted(candidates):
+        positions = pack_skyline(sizes, width, height)
+        if positions is not None:
+            return width, height, positions
+    
+    raise ValueError(f"Glyphs do not fit in a {MAX_TEXTURE_SIZE}x{MAX_TEXTURE_SIZE} texture")
+
+@profiled("assemble")
+def generate_packed_font_texture(font_path, font_name, output_path):
+    """Generate a tightly packed font texture atlas
+    
+    Each glyph is rendered in its grid cell position, trimmed to its ink bounds and packed
+    with PACK_GUTTER transparent pixels around it. Returns (supported_chars, packed_layout, ink_boxes)
+    where packed_layout holds the texture size and, per supported character, its pixel rect in the
+    texture and the offset of that rect inside the character's grid cell. The rects are trimmed to
+    the ink, so they are the ink boxes too.
+    """
+    font = load_font(font_path, FONT_SIZE)
+    
+    charset = [get_character_for_index(i) for i in range(TOTAL_CHARS)]
+    coverage = get_glyph_coverage(font_path, {ord(c) for c in charset})
+    
+    rasters = rasterize_charset(font_path, font, FONT_SIZE, charset, coverage)
+    
+    supported_chars = {}
+    glyphs = []  # (char, trimmed image, ink box within cell)
+    for char in charset:
+        if char in supported_chars:
+            continue
+        raster = rasters.get(char)
+        if raster is None:
+            supported_chars[char] = False
+            continue
+        
+        # Same rule as the grid layout: supported if any ink lands inside the cell
+        _, _, cell_coverage = place_glyph_in_cell(raster)
+        ink_box = Image.fromarray(cell_coverage, 'L').getbbox()
+        supported_chars[char] = ink_box is not None
+        if ink_box is not None:
+            trimmed = Image.new('RGBA', (ink_box[2] - ink_box[0], ink_box[3] - ink_box[1]), (0, 0, 0, 0))
+            alpha = Image.fromarray(cell_coverage[ink_box[1]:ink_box[3], ink_box[0]:ink_box[2]], 'L')
+            trimmed.paste((255, 255, 255, 255), (0, 0), alpha)
+            glyphs.append((char, trimmed, ink_box))
+    
+    sizes = [(image.width + PACK_GUTTER * 2, image.height + PACK_GUTTER * 2) for _, image, _ in glyphs]
+    texture_width, texture_height, positions = find_packed_texture_size(sizes)
+    
+    img = Image.new('RGBA', (texture_width, texture_height), (0, 0, 0, 0))
+    glyph_rects = {}
+    ink_boxes = {}
+    packed_layout = {"textureWidth": texture_width, "textureHeight": texture_height, "glyphs": glyph_rects}
+    for (char, image, ink_box), (x, y) in zip(glyphs, positions):
+        img.paste(image, (x + PACK_GUTTER, y + PACK_GUTTER))
+        glyph_rects[char] = {
+            "x": x + PACK_GUTTER,
+            "y": y + PACK_GUTTER,
+            "width": image.width,
+            "height": image.height,
+            "offsetX": ink_box[0],
+            "offsetY": ink_box[1],
+        }
+        ink_boxes[char] = (x + PACK_GUTTER, y + PACK_GUTTER, x + PACK_GUTTER + image.width, y + PACK_GUTTER + image.height)
+    
+    save_texture_png(img, output_path)
+    grid_pixels = CHAR_WIDTH * CHARS_PER_ROW * CHAR_HEIGHT * TOTAL_ROWS
+    print(f"  Generated packed Font.png ({texture_width}x{texture_height} pixels, "
+          f"{texture_width * texture_height / grid_pixels:.0%} of grid layout)")
+    
+    return supported_chars, packed_layout, ink_boxes
+
+def distance_to_features(features, radius):
+    """Euclidean distance from every pixel to the nearest True pixel, capped at radius
+    
+    features is a boolean (cells, height, width) stack; cells are independent. Uses a separable
+    two-pass transform over shifted arrays, which is exact for every distance up to radius.
+    """
+    capped = float(radius * radius)
+    
+    # Vertical pass: squared distance to the nearest feature in the same column
+    column = np.where(features, 0.0, capped).astype(np.float32)
+    for dy in range(1, radius + 1):
+        step = np.float32(dy * dy)
+        np.minimum(column[:, dy:, :], np.where(features[:, :-dy, :], step, capped), out=column[:, dy:, :])
+        np.minimum(column[:, :-dy, :], np.where(features[:, dy:, :], step, capped), out=column[:, :-dy, :])
+    
+    # Horizontal pass: combine with the column distances of neighbouring columns
+    squared = column.copy()
+    for dx in range(1, radius + 1):
+        step = np.float32(dx * dx)
+        np.minimum(squared[:, :, dx:], column[:, :, :-dx] + step, out=squared[:, :, dx:])
+        np.minimum(squared[:, :, :-dx], column[:, :, dx:] + step, out=squared[:, :, :-dx])
+    
+    return np.sqrt(np.minimum(squared, capped))
+
+@profiled("distance_field")
+def compute_sdf_cells(coverage_cells, scale, spread):
+    """Turn high-resolution glyph coverage cells into downsampled 8-bit distance fields
+    
+    coverage_cells is a uint8 (cells, height, width) stack at scale x the output size. Output
+    values are 128 on the glyph edge, rising inside the glyph and reaching 0 at spread output
+    pixels outside it.
+    """
+    radius = int(np.ceil(spread * scale)) + 1
+    inside = coverage_cells >= 128
+    
+    # Signed distance in high-res pixels, measured to the boundary between pixel centers
+    outside_distance = distance_to_features(inside, radius)
+    inside_distance = distance_to_features(~inside, radius)
+    signed = np.where(inside, 0.5 - inside_distance, outside_distance - 0.5)
+    
+    # Area-average down to the output cell size, converting to output pixels
+    cells, height, width = signed.shape
+    signed = signed.reshape(cells, height // scale, scale, width // scale, scale).mean(axis=(2, 4)) / scale
+    
+    normalized = np.clip(0.5 - signed / (2 * spread), 0.0, 1.0)
+    return np.round(normalized * 255).astype(np.uint8)
+
+@profiled("assemble")
+def generate_sdf_font_texture(font_path, font_name, output_path):
+    """Generate a single-channel signed distance field font texture in the grid layout
+    
+    Returns (supported_chars, sdf_info, ink_boxes) where sdf_info describes the cell size and
+    distance encoding for Atlas.json and a glyph's ink box is everything inside the spread.
+    """
+    hires_width = SDF_CELL_WIDTH * SDF_SCALE
+    hires_height = SDF_CELL_HEIGHT * SDF_SCALE
+    texture_width = SDF_CELL_WIDTH * CHARS_PER_ROW
+    texture_height = SDF_CELL_HEIGHT * TOTAL_ROWS
+    
+    # Keep the glyph-to-cell proportions of the regular atlas at the internal resolution
+    hires_size = round(FONT_SIZE * hires_height / CHAR_HEIGHT)
+    font = load_font(font_path, hires_size)
+    
+    charset = [get_character_for_index(i) for i in range(TOTAL_CHARS)]
+    coverage = get_glyph_coverage(font_path, {ord(c) for c in charset})
+    
+    rasters = rasterize_charset(font_path, font, hires_size, charset, coverage)
+    
+    img = Image.new('L', (texture_width, texture_height), 0)
+    supported_chars = {}
+    ink_boxes = {}
+    
+    # One atlas row at a time keeps the high-res working set small
+    for row in range(TOTAL_ROWS):
+        row_cells = np.zeros((CHARS_PER_ROW, hires_height, hires_width), dtype=np.uint8)
+        for col in range(CHARS_PER_ROW):
+            char = charset[row * CHARS_PER_ROW + col]
+            raster = rasters.get(char)
+            if raster is None:
                 supported_chars[char] = False
+                continue
+            
+            _, _, row_cells[col] = place_glyph_in_cell(raster, hires_width, hires_height)
+            supported_chars[char] = bool(row_cells[col].any())
+        
+        sdf_cells = compute_sdf_cells(row_cells, SDF_SCALE, SDF_SPREAD)
+        for col in range(CHARS_PER_ROW):
+            char = charset[row * CHARS_PER_ROW + col]
+            if supported_chars.get(char):
+                ink_boxes[char] = get_ink_box(sdf_cells[col], col * SDF_CELL_WIDTH, row * SDF_CELL_HEIGHT)
+        row_strip = np.concatenate(list(sdf_cells), axis=1)
+        img.paste(Image.fromarray(row_strip, 'L'), (0, row * SDF_CELL_HEIGHT))
     
-    # Save the texture
-    img.save(output_path, 'PNG')
-    print(f"  Generated Font.png ({texture_width}x{texture_height} pixels)")
+    save_texture_png(img, output_path)
+    print(f"  Generated SDF Font.png ({texture_width}x{texture_height} pixels, single channel)")
+    
+    sdf_info = {
+        "charWidth": SDF_CELL_WIDTH,
+        "charHeight": SDF_CELL_HEIGHT,
+        "spread": SDF_SPREAD,
+        "scale": SDF_SCALE,
+    }
+    return supported_chars, sdf_info, ink_boxes
+
+def downsample_area(image, factor):
+    """Downsample an image by an integer factor, averaging each factor x factor block
     
-    return supported_chars
+    RGBA is averaged with premultiplied alpha so transparent texels don't darken glyph edges.
+    """
+    if factor == 1:
+        return image.copy()
+    if image.width % factor or image.height % factor:
+        raise ValueError(f"{image.width}x{image.height} texture is not divisible by {factor}")
+    
+    pixels = np.asarray(image, dtype=np.float32)
+    if pixels.ndim == 2:
+        pixels = pixels[:, :, np.newaxis]
+    height, width, channels = pixels.shape
+    
+    if image.mode == 'RGBA':
+        alpha = pixels[:, :, 3:4] / 255
+        pixels = np.concatenate([pixels[:, :, :3] * alpha, pixels[:, :, 3:4]], axis=2)
+    
+    blocks = pixels.reshape(height // factor, factor, width // factor, factor, channels).mean(axis=(1, 3))
+    
+    if image.mode == 'RGBA':
+        alpha = blocks[:, :, 3:4] / 255
+        blocks[:, :, :3] = np.where(alpha > 0, blocks[:, :, :3] / np.maximum(alpha, 1e-6), 0)
+    
+    result = np.clip(np.round(blocks), 0, 255).astype(np.uint8)
+    if image.mode != 'RGBA':
+        return Image.fromarray(result[:, :, 0], image.mode)
+    return Image.fromarray(result, 'RGBA')
+
+def get_tier_texture_name(tier, base_name="Font"):
+    """Texture name (without extension) for a resolution tier of a full-resolution texture"""
+    return base_name if tier == "full" else f"{base_name}{tier.capitalize()}"
+
+@profiled("tiers")
+def generate_resolution_tiers(font_output_dir, sdf_info=None, base_names=None):
+    """Derive the configured lower-resolution tiers from the full-resolution textures
+    
+    base_names lists the full-resolution textures to downsample (Font.png by default, the
+    page textures for the paged layout). Returns the tier list for Atlas.json, full tier first.
+    """
+    fulls = {}
+    for base_name in base_names or ["Font"]:
+        with Image.open(os.path.join(font_output_dir, f"{base_name}.png")) as full:
+            # Downsample in RGBA (or the single channel of distance fields), so "l" tiers still
+            # carry their coverage in alpha when they are block-compressed
+            fulls[base_name] = full.copy() if sdf_info is not None else decode_texture(full)
+    width, height = next(iter(fulls.values())).size
+    
+    tiers = []
+    for tier in ["full"] + [t for t in RESOLUTION_TIERS if t != "full"]:
+        factor = TIER_FACTORS[tier]
+        if factor != 1:
+            for base_name, full in fulls.items():
+                texture_name = get_tier_texture_name(tier, base_name)
+                save_texture_png(downsample_area(full, factor), os.path.join(font_output_dir, f"{texture_name}.png"))
+                print(f"  Generated {texture_name}.png ({full.width // factor}x{full.height // factor} pixels)")
+        
+        tier_info = {"name": tier}
+        if base_names is None:
+            tier_info["texture"] = get_tier_texture_name(tier)
+        else:
+            # Each page texture gets the suffix, e.g. FontPage0004Half
+            tier_info["textureSuffix"] = get_tier_texture_name(tier, "")
+        tier_info.update({
+            "textureWidth": width // factor,
+            "textureHeight": height // factor,
+            "scale": 1 / factor,
+            "sidecar": "Atlas.bin" if tier == "full" else f"Atlas{tier.capitalize()}.bin",
+        })
+        if PREBAKED_LABELS:
+            tier_info["labels"] = "Labels.json" if tier == "full" else f"Labels{tier.capitalize()}.json"
+        if sdf_info is not None:
+            tier_info["distanceSpread"] = sdf_info["spread"] / factor
+        tiers.append(tier_info)
+    
+    return tiers
 
 def detect_language_support(supported_chars):
     """Detect which language/script systems are supported by checking character ranges"""
@@ -187,9 +1526,9 @@ def detect_language_support(supported_chars):
         "latinExtended": False, # Latin with accents/diacritics
         "cyrillic": False,    # Russian, etc.
         "greek": False,       # Greek
-        "chinese": False,     # Chinese (would need extended implementation)
-        "japanese": False,    # Japanese (would need extended implementation)
-        "korean": False,      # Korean (would need extended implementation)
+        "chinese": False,     # Chinese (paged layout only)
+        "japanese": False,    # Japanese (paged layout only)
+        "korean": False,      # Korean (paged layout only)
         "arabic": False,      # Arabic (would need extended implementation)
     }
     
@@ -215,15 +1554,46 @@ def detect_language_support(supported_chars):
     if any(supported_chars.get(c, False) for c in greek_chars):
         support["greek"] = True
     
+    # Check CJK support - common characters, kana and Hangul syllables
+    chinese_chars = "的一是不了人我在有他这中大来上国个到说们为子和你地出道也时年"
+    if sum(1 for c in chinese_chars if supported_chars.get(c, False)) >= 20:
+        support["chinese"] = True
+    kana_chars = "あいうえおかきくけこさしすせそたちつてとアイウエオカキクケコサシスセソ"
+    if sum(1 for c in kana_chars if supported_chars.get(c, False)) >= 20:
+        support["japanese"] = True
+    hangul_chars = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루"
+    if sum(1 for c in hangul_chars if supported_chars.get(c, False)) >= 20:
+        support["korean"] = True
+    
     return support
 
-def generate_atlas_json(font_name, supported_chars, output_path):
-    """Generate the Atlas.json file with character mappings and UV coordinates"""
+@profiled("atlas_json")
+def generate_atlas_json(font_name, supported_chars, output_path, packed_layout=None, sdf_info=None, tiers=None,
+                        paged_layout=None, font_path=None, ink_boxes=None):
+    """Generate the Atlas.json file with character mappings and UV coordinates
+    
+    Pass the packed_layout from generate_packed_font_texture to write the packed format, the
+    paged_layout from generate_paged_font_textures for the paged format, or the sdf_info from
+    generate_sdf_font_texture to describe a distance field texture. tiers lists the resolution
+    tiers the loader can choose from (UVs are shared between tiers). font_path adds glyph advances
+    and ink_boxes, from the texture generator, glyph ink boxes.
+    """
     # Detect language support
     language_support = detect_language_support(supported_chars)
     
+    if packed_layout is not None:
+        write_packed_atlas_json(font_name, supported_chars, language_support, packed_layout, output_path, tiers,
+                                font_path, ink_boxes)
+        return
+    if paged_layout is not None:
+        write_paged_atlas_json(font_name, supported_chars, language_support, paged_layout, output_path, tiers,
+                               font_path, ink_boxes)
+        return
+    
     atlas = {
         "fontName": font_name,
+        "formatVersion": ATLAS_FORMAT_GRID,
+        "layout": "grid",
         "textureWidth": CHAR_WIDTH * CHARS_PER_ROW,
         "textureHeight": CHAR_HEIGHT * TOTAL_ROWS,
         "charWidth": CHAR_WIDTH,
@@ -241,6 +1611,22 @@ def generate_atlas_json(font_name, supported_chars, output_path):
         "characters": {}
     }
     
+    if sdf_info is not None:
+        # Same grid, smaller cells; alpha is a distance field rather than coverage
+        atlas["textureWidth"] = sdf_info["charWidth"] * CHARS_PER_ROW
+        atlas["textureHeight"] = sdf_info["charHeight"] * TOTAL_ROWS
+        atlas["charWidth"] = sdf_info["charWidth"]
+        atlas["charHeight"] = sdf_info["charHeight"]
+        atlas["distanceField"] = {
+            "channel": "L",
+            "spread": sdf_info["spread"],  # Output pixels from the edge to value 0 (or 255)
+            "edgeValue": 128,
+            "rasterScale": sdf_info["scale"],
+        }
+    
+    if tiers:
+        atlas["tiers"] = tiers
+    
     # Generate character entries
     for index in range(TOTAL_CHARS):
         char = get_character_for_index(index)
@@ -272,14 +1658,436 @@ def generate_atlas_json(font_name, supported_chars, output_path):
             "supported": True
         }
     
-    # Save the atlas
+    # Save the atlas
+    print(f"  Generated Atlas.json with {len(atlas['characters'])} character mappings")
+    write_atlas_files(atlas, output_path, font_path, ink_boxes)
+
+def write_packed_atlas_json(font_name, supported_chars, language_support, packed_layout, output_path, tiers=None,
+                            font_path=None, ink_boxes=None):
+    """Write the packed-layout Atlas.json with per-glyph pixel rects, UVs and cell offsets
+    
+    UVs use the same top-left origin as the grid format. offsetX/offsetY place the trimmed
+    glyph inside a charWidth x charHeight cell, so quads line up with grid-layout labels.
+    """
+    texture_width = packed_layout["textureWidth"]
+    texture_height = packed_layout["textureHeight"]
+    
+    atlas = {
+        "fontName": font_name,
+        "formatVersion": ATLAS_FORMAT_PACKED,
+        "layout": "packed",
+        "textureWidth": texture_width,
+        "textureHeight": texture_height,
+        "charWidth": CHAR_WIDTH,
+        "charHeight": CHAR_HEIGHT,
+        "gutter": PACK_GUTTER,
+        "languageSupport": language_support,
+        "metadata": {
+            "hasLatinSupport": language_support["latin"],
+            "hasAccentSupport": language_support["latinExtended"],
+            "hasCyrillicSupport": language_support["cyrillic"],
+            "hasGreekSupport": language_support["greek"],
+            "totalSupportedCharacters": sum(1 for v in supported_chars.values() if v)
+        },
+        "characters": {}
+    }
+    if tiers:
+        # Pixel rects refer to the full tier; UVs apply to every tier
+        atlas["tiers"] = tiers
+    
+    for index in range(TOTAL_CHARS):
+        char = get_character_for_index(index)
+        rect = packed_layout["glyphs"].get(char)
+        if rect is None:
+            continue
+        
+        atlas["characters"][str(ord(char))] = {
+            "char": char,
+            "index": index,
+            "x": rect["x"],
+            "y": rect["y"],
+            "width": rect["width"],
+            "height": rect["height"],
+            "offsetX": rect["offsetX"],
+            "offsetY": rect["offsetY"],
+            "uvLeft": rect["x"] / texture_width,
+            "uvRight": (rect["x"] + rect["width"]) / texture_width,
+            "uvTop": rect["y"] / texture_height,
+            "uvBottom": (rect["y"] + rect["height"]) / texture_height,
+            "supported": True
+        }
+    
+    print(f"  Generated packed Atlas.json with {len(atlas['characters'])} character mappings")
+    write_atlas_files(atlas, output_path, font_path, ink_boxes)
+
+def write_paged_atlas_json(font_name, supported_chars, language_support, paged_layout, output_path, tiers=None,
+                           font_path=None, ink_boxes=None):
+    """Write the paged-layout Atlas.json
+    
+    Every page is a charsPerRow x totalRows grid with the grid format's cell size. A glyph lives
+    on page codepoint // pageSize in cell codepoint % pageSize, so lookup is arithmetic plus one
+    "pages" entry; pages missing from it hold no supported glyphs. UVs are relative to the page.
+    """
+    atlas = {
+        "fontName": font_name,
+        "formatVersion": ATLAS_FORMAT_PAGED,
+        "layout": "paged",
+        "textureWidth": CHAR_WIDTH * CHARS_PER_ROW,  # Of every page
+        "textureHeight": CHAR_HEIGHT * TOTAL_ROWS,
+        "charWidth": CHAR_WIDTH,
+        "charHeight": CHAR_HEIGHT,
+        "charsPerRow": CHARS_PER_ROW,
+        "totalRows": TOTAL_ROWS,
+        "pageSize": PAGE_SIZE,
+        "pages": {str(page): texture for page, texture in sorted(paged_layout["pages"].items())},
+        "languageSupport": language_support,
+        "metadata": {
+            "hasLatinSupport": language_support["latin"],
+            "hasAccentSupport": language_support["latinExtended"],
+            "hasCyrillicSupport": language_support["cyrillic"],
+            "hasGreekSupport": language_support["greek"],
+            "totalSupportedCharacters": sum(1 for v in supported_chars.values() if v),
+            "scripts": PAGE_SCRIPTS,
+        },
+        "characters": {}
+    }
+    if tiers:
+        atlas["tiers"] = tiers
+    
+    for char in sorted((c for c, supported in supported_chars.items() if supported), key=ord):
+        page, index = divmod(ord(char), PAGE_SIZE)
+        grid_x = index % CHARS_PER_ROW
+        grid_y = index // CHARS_PER_ROW
+        atlas["characters"][str(ord(char))] = {
+            "char": char,
+            "page": page,
+            "index": index,
+            "gridX": grid_x,
+            "gridY": grid_y,
+            "uvLeft": grid_x / CHARS_PER_ROW,
+            "uvRight": (grid_x + 1) / CHARS_PER_ROW,
+            "uvTop": grid_y / TOTAL_ROWS,
+            "uvBottom": (grid_y + 1) / TOTAL_ROWS,
+            "supported": True
+        }
+    
+    print(f"  Generated paged Atlas.json with {len(atlas['characters'])} character mappings"
+          f" on {len(atlas['pages'])} pages")
+    write_atlas_files(atlas, output_path, font_path, ink_boxes)
+
+def get_runtime_uv_rect(atlas, entry, texture_size=None):
+    """Compute the UV rect the runtime draws for an Atlas.json character entry
+    
+    Mirrors FontAtlas.GetGlyph for grid atlases (and the pages of paged atlases): cells are inset
+    by 4px (2px for textures up to 600px wide) and V is flipped to Unity's bottom-left origin.
+    Packed rects already carry a gutter, so they are only flipped. texture_size overrides the size used for the padding
+    (lower resolution tiers). Returns (uvLeft, uvBottom, uvRight, uvTop).
+    """
+    if atlas.get("layout") == "packed":
+        return (entry["x"] / atlas["textureWidth"],
+                1 - (entry["y"] + entry["height"]) / atlas["textureHeight"],
+                (entry["x"] + entry["width"]) / atlas["textureWidth"],
+                1 - entry["y"] / atlas["textureHeight"])
+    
+    texture_width, texture_height = texture_size or (atlas["textureWidth"], atlas["textureHeight"])
+    
+    padding = 4.0 if texture_width > 600 else 2.0
+    u_padding = padding / texture_width
+    v_padding = padding / texture_height
+    cell_u = 1 / atlas["charsPerRow"]
+    cell_v = 1 / atlas["totalRows"]
+    return (entry["gridX"] * cell_u + u_padding,
+            1 - (entry["gridY"] + 1) * cell_v + v_padding,
+            (entry["gridX"] + 1) * cell_u - u_padding,
+            1 - entry["gridY"] * cell_v - v_padding)
+
+@profiled("atlas_bin")
+def write_atlas_bin(atlas, output_path, texture_size=None):
+    """Write the compact binary sidecar for an Atlas.json dictionary
+    
+    texture_size selects a resolution tier other than the one Atlas.json describes.
+    """
+    texture_width, texture_height = texture_size or (atlas["textureWidth"], atlas["textureHeight"])
+    entries = sorted(atlas["characters"].items(), key=lambda item: int(item[0]))
+    records = np.zeros(len(entries), dtype=ATLAS_BIN_RECORD)
+    for i, (char_code, entry) in enumerate(entries):
+        uv_left, uv_bottom, uv_right, uv_top = get_runtime_uv_rect(atlas, entry, texture_size)
+        records[i] = (int(char_code), uv_left, uv_bottom, uv_right, uv_top, entry.get("advance", 1.0))
+    
+    flags = 0
+    if atlas.get("layout") == "packed":
+        flags |= ATLAS_BIN_FLAG_PACKED
+    if "distanceField" in atlas:
+        flags |= ATLAS_BIN_FLAG_DISTANCE_FIELD
+    if atlas.get("layout") == "paged":
+        flags |= ATLAS_BIN_FLAG_PAGED
+    
+    header = ATLAS_BIN_HEADER.pack(
+        ATLAS_BIN_MAGIC, ATLAS_BIN_VERSION, ATLAS_BIN_HEADER.size, len(records),
+        texture_width, texture_height, atlas["charWidth"], atlas["charHeight"],
+        ATLAS_BIN_RECORD.itemsize, flags)
+    
+    with open(output_path, 'wb') as f:
+        f.write(header)
+        f.write(records.tobytes())
+    profile_count("bytes_written", len(header) + records.nbytes)
+    
+    print(f"  Generated {os.path.basename(output_path)} ({len(header) + records.nbytes} bytes)")
+
+def read_atlas_bin(path):
+    """Read an Atlas.bin sidecar, returning (header dict, records array)
+    
+    The records are a read-only memory map sorted by codepoint; use lookup_atlas_bin to find a glyph.
+    """
+    with open(path, 'rb') as f:
+        raw_header = f.read(ATLAS_BIN_HEADER.size)
+    (magic, version, header_size, glyph_count, texture_width, texture_height,
+     cell_width, cell_height, record_size, flags) = ATLAS_BIN_HEADER.unpack(raw_header)
+    if magic != ATLAS_BIN_MAGIC or version != ATLAS_BIN_VERSION or record_size != ATLAS_BIN_RECORD.itemsize:
+        raise ValueError(f"{path} is not a version {ATLAS_BIN_VERSION} atlas sidecar")
+    
+    header = {
+        "glyphCount": glyph_count,
+        "textureWidth": texture_width,
+        "textureHeight": texture_height,
+        "charWidth": cell_width,
+        "charHeight": cell_height,
+        "flags": flags,
+    }
+    if glyph_count == 0:
+        return header, np.zeros(0, dtype=ATLAS_BIN_RECORD)
+    records = np.memmap(path, dtype=ATLAS_BIN_RECORD, mode='r', offset=header_size, shape=(glyph_count,))
+    return header, records
+
+def lookup_atlas_bin(records, codepoint):
+    """Binary-search the sidecar records for a codepoint, returning the record or None"""
+    position = int(np.searchsorted(records['codepoint'], codepoint))
+    if position < len(records) and records['codepoint'][position] == codepoint:
+        return records[position]
+    return None
+
+@profiled("atlas_bin")
+def verify_atlas_bin(bin_path, atlas, texture_size=None):
+    """Check that a sidecar holds the UVs Atlas.json describes for every glyph
+    
+    The expected values come from the entries' own UVs (top-left origin) rather than from
+    get_runtime_uv_rect, which wrote the sidecar: grid and paged cells are inset by the runtime's
+    padding for the texture size in the header, packed rects are used as they are, then V is
+    flipped. Raises ValueError on the first mismatch.
+    """
+    header, records = read_atlas_bin(bin_path)
+    texture_width, texture_height = texture_size or (atlas["textureWidth"], atlas["textureHeight"])
+    if (header["textureWidth"], header["textureHeight"]) != (texture_width, texture_height):
+        raise ValueError(f"{bin_path}: texture is {header['textureWidth']}x{header['textureHeight']},"
+                         f" expected {texture_width}x{texture_height}")
+    if header["glyphCount"] != len(atlas["characters"]):
+        raise ValueError(f"{bin_path}: {header['glyphCount']} glyphs, Atlas.json has {len(atlas['characters'])}")
+    
+    packed = bool(header["flags"] & ATLAS_BIN_FLAG_PACKED)
+    if packed != (atlas.get("layout") == "packed"):
+        raise ValueError(f"{bin_path}: packed flag does not match the {atlas.get('layout')} layout")
+    
+    padding = 0.0 if packed else 4.0 if header["textureWidth"] > 600 else 2.0
+    u_inset = padding / header["textureWidth"]
+    v_inset = padding / header["textureHeight"]
+    for char_code, entry in atlas["characters"].items():
+        record = lookup_atlas_bin(records, int(char_code))
+        if record is None:
+            raise ValueError(f"{bin_path}: codepoint {char_code} missing")
+        expected = [entry["uvLeft"] + u_inset, 1 - entry["uvBottom"] + v_inset,
+                    entry["uvRight"] - u_inset, 1 - entry["uvTop"] - v_inset]
+        actual = [record['uvLeft'], record['uvBottom'], record['uvRight'], record['uvTop']]
+        # float32 keeps about 7 digits, and the two derivations round differently
+        if not np.allclose(actual, expected, rtol=0, atol=1e-6) or \
+                not np.isclose(record['advance'], entry.get("advance", 1.0), rtol=1e-6, atol=0):
+            raise ValueError(f"{bin_path}: codepoint {char_code} does not match Atlas.json")
+
+def get_prebaked_labels():
+    """Expand and upper-case PREBAKED_LABELS, in order and without duplicates"""
+    labels = []
+    for label in PREBAKED_LABELS:
+        variants = ([label.replace("{n}", str(n)) for n in range(1, PREBAKED_LABEL_NUMBERS + 1)]
+                    if "{n}" in label else [label])
+        for variant in variants:
+            # Per character like C# ToUpper, which never expands a character (e.g. ß)
+            labels.append("".join(c.upper() if len(c.upper()) == 1 else c for c in variant))
+    return list(dict.fromkeys(labels))
+
+def get_runtime_ink_rect(atlas, entry, texture_size=None):
+    """The part of a glyph's runtime UV rect (see get_runtime_uv_rect) covered by its ink box
+    
+    Returns (uvLeft, uvBottom, uvRight, uvTop) with the same bottom-left origin, or None for
+    glyphs without ink.
+    """
+    if "inkUvLeft" not in entry:
+        return None
+    uv_left, uv_bottom, uv_right, uv_top = get_runtime_uv_rect(atlas, entry, texture_size)
+    ink_left, ink_right = max(uv_left, entry["inkUvLeft"]), min(uv_right, entry["inkUvRight"])
+    ink_bottom, ink_top = max(uv_bottom, 1 - entry["inkUvBottom"]), min(uv_top, 1 - entry["inkUvTop"])
+    if ink_left >= ink_right or ink_bottom >= ink_top:
+        return None  # All ink is in the padding the runtime doesn't sample
+    return ink_left, ink_bottom, ink_right, ink_top
+
+def get_label_glyph_entry(atlas, char):
+    """Atlas entry the runtime draws for a label character, or None if it has no quad"""
+    entry = atlas["characters"].get(str(ord(char)))
+    if entry is None and atlas.get("layout") == "grid":
+        # FontAtlas maps the whole charset and draws unsupported characters as their empty cell
+        index = get_index_for_character(char)
+        if index >= 0:
+            entry = {"gridX": index % CHARS_PER_ROW, "gridY": index // CHARS_PER_ROW}
+    return entry
+
+def layout_label(atlas, text, texture_size=None):
+    """Lay out a label like FontRenderer.GenerateMesh, returning (quads, total width)
+    
+    Every character advances one cell, which spans LABEL_QUAD_BOTTOM to LABEL_QUAD_TOP on the
+    mesh's z axis. Quads are trimmed to the glyph's ink - placed where that ink shows in the cell
+    (see get_label_ink_box) - and glyphs without ink get none: [x0, x1, z0, z1, uvLeft, uvBottom,
+    uvRight, uvTop] (plus the page for paged atlases).
+    """
+    quads = []
+    x = 0.0
+    cell_height = LABEL_QUAD_TOP - LABEL_QUAD_BOTTOM
+    for char in text:
+        entry = get_label_glyph_entry(atlas, char)
+        if entry is None:
+            if char == ' ':
+                x += 1.0
+            continue
+        ink_rect = get_runtime_ink_rect(atlas, entry, texture_size)
+        if ink_rect is not None:
+            left, bottom, right, top = get_label_ink_box(atlas, entry, ink_rect, texture_size)
+            quad = [x + left, x + right,
+                    LABEL_QUAD_BOTTOM + bottom * cell_height, LABEL_QUAD_BOTTOM + top * cell_height,
+                    *ink_rect]
+            quad = [round(value, LABEL_QUAD_DIGITS) for value in quad]
+            if "page" in entry:
+                quad.append(entry["page"])
+            quads.append(quad)
+        x += 1.0
+    return quads, x
+
+def get_label_ink_box(atlas, entry, ink_rect, texture_size=None):
+    """Where a glyph's ink (ink_rect, from get_runtime_ink_rect) shows in its label cell
+    
+    Returns (left, bottom, right, top) as fractions of the cell from its bottom-left corner. The
+    grid runtime stretches the glyph's UV rect over the whole cell, so the ink keeps its place in
+    that rect. Packed rects only hold the trimmed glyph: offsetX/offsetY place them in a
+    charWidth x charHeight cell, and the ink box (in texture pixels) places the ink in the rect.
+    """
+    ink_left, ink_bottom, ink_right, ink_top = ink_rect
+    if atlas.get("layout") == "packed":
+        # Pixels from the cell's top-left corner; the ink box is clipped to the rect like ink_rect
+        cell_left = entry["offsetX"] - entry["x"]
+        cell_top = entry["offsetY"] - entry["y"]
+        ink_box_left, ink_box_right = max(entry["x"], entry["inkLeft"]), min(entry["x"] + entry["width"], entry["inkRight"])
+        ink_box_top, ink_box_bottom = max(entry["y"], entry["inkTop"]), min(entry["y"] + entry["height"], entry["inkBottom"])
+        return ((cell_left + ink_box_left) / atlas["charWidth"],
+                1 - (cell_top + ink_box_bottom) / atlas["charHeight"],
+                (cell_left + ink_box_right) / atlas["charWidth"],
+                1 - (cell_top + ink_box_top) / atlas["charHeight"])
+    
+    uv_left, uv_bottom, uv_right, uv_top = get_runtime_uv_rect(atlas, entry, texture_size)
+    return ((ink_left - uv_left) / (uv_right - uv_left),
+            (ink_bottom - uv_bottom) / (uv_top - uv_bottom),
+            (ink_right - uv_left) / (uv_right - uv_left),
+            (ink_top - uv_bottom) / (uv_top - uv_bottom))
+
+@profiled("labels")
+def write_label_table(atlas, output_path, texture_size=None):
+    """Write the prebaked label layouts for one resolution tier"""
+    texture_width, texture_height = texture_size or (atlas["textureWidth"], atlas["textureHeight"])
+    table = {
+        "version": LABEL_TABLE_VERSION,
+        "fontName": atlas["fontName"],
+        "textureWidth": texture_width,
+        "textureHeight": texture_height,
+        "quadFormat": ["x0", "x1", "z0", "z1", "uvLeft", "uvBottom", "uvRight", "uvTop"]
+                      + (["page"] if atlas.get("layout") == "paged" else []),
+        "labels": {},
+    }
+    for label in get_prebaked_labels():
+        quads, width = layout_label(atlas, label, texture_size)
+        table["labels"][label] = {"width": width, "quads": quads}
+    
+    # Compact: the table is only read by the runtime
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(table, f, ensure_ascii=False, separators=(',', ':'))
+    profile_count("bytes_written", os.path.getsize(output_path))
+    print(f"  Generated {os.path.basename(output_path)} ({len(table['labels'])} prebaked labels)")
+
+@profiled("glyph_metrics")
+def add_glyph_metrics(atlas, ink_boxes=None, font_path=None):
+    """Add each glyph's ink box (and, given the font, its advance) to the Atlas.json entries
+    
+    ink_boxes maps characters to the full-resolution texture pixel box of their ink, recorded
+    by the texture generator from the glyph's own raster (for distance fields, everything inside
+    the spread), so ink bleeding in from a neighbouring cell doesn't count. It is clipped to the
+    glyph's rect and grown by INK_MARGIN pixels for texture filtering. Entries get it in texture
+    pixels (inkLeft..inkBottom), as UVs with the atlas's top-left origin (inkUvLeft..inkUvBottom)
+    and as the trimmed quad's place in the glyph's rect (quadOffsetX/Y from its left and bottom,
+    quadWidth/Height), all fractions. Glyphs without ink (spaces) get no ink box. advance is the
+    font's horizontal advance in cell widths.
+    """
+    width, height = atlas["textureWidth"], atlas["textureHeight"]
+    for page, texture in get_atlas_textures(atlas) if ink_boxes else []:
+        texture_name = os.path.splitext(texture)[0]
+        for char_code, (left, top, right, bottom) in get_texture_glyph_rects(atlas, texture_name, (width, height)).items():
+            ink_box = ink_boxes.get(chr(char_code))
+            if ink_box is None:
+                continue
+            ink_left = max(left, ink_box[0] - INK_MARGIN)
+            ink_right = min(right, ink_box[2] + INK_MARGIN)
+            ink_top = max(top, ink_box[1] - INK_MARGIN)
+            ink_bottom = min(bottom, ink_box[3] + INK_MARGIN)
+            atlas["characters"][str(char_code)].update({
+                "inkLeft": ink_left,
+                "inkTop": ink_top,
+                "inkRight": ink_right,
+                "inkBottom": ink_bottom,
+                "inkUvLeft": ink_left / width,
+                "inkUvRight": ink_right / width,
+                "inkUvTop": ink_top / height,
+                "inkUvBottom": ink_bottom / height,
+                "quadOffsetX": (ink_left - left) / (right - left),
+                "quadOffsetY": (bottom - ink_bottom) / (bottom - top),
+                "quadWidth": (ink_right - ink_left) / (right - left),
+                "quadHeight": (ink_bottom - ink_top) / (bottom - top),
+            })
+    
+    if font_path is not None:
+        font = load_font(font_path, FONT_SIZE)
+        for entry in atlas["characters"].values():
+            entry["advance"] = font.getlength(entry["char"]) / CHAR_WIDTH
+
+def write_atlas_files(atlas, output_path, font_path=None, ink_boxes=None):
+    """Write Atlas.json plus a verified binary sidecar (and label table) for each resolution tier
+    
+    Glyph metrics are added from ink_boxes (and font_path) first.
+    """
+    add_glyph_metrics(atlas, ink_boxes, font_path)
+    if PNG_ENCODING != "rgba" and "distanceField" not in atlas:
+        # Tells the loader how to expand the texture (e.g. "l" keeps alpha in the luminance channel)
+        atlas["textureEncoding"] = PNG_ENCODING
+    if DDS_FORMAT:
+        # Every texture has a block-compressed .dds next to it
+        atlas["blockCompression"] = DDS_FORMAT
     with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(atlas, f, indent=2, ensure_ascii=False)
+    profile_count("bytes_written", os.path.getsize(output_path))
     
-    print(f"  Generated Atlas.json with {len(atlas['characters'])} character mappings")
+    output_dir = os.path.dirname(output_path)
+    for tier in atlas.get("tiers") or [{"sidecar": os.path.basename(output_path)[:-len(".json")] + ".bin"}]:
+        bin_path = os.path.join(output_dir, tier["sidecar"])
+        texture_size = (tier["textureWidth"], tier["textureHeight"]) if "textureWidth" in tier else None
+        write_atlas_bin(atlas, bin_path, texture_size)
+        verify_atlas_bin(bin_path, atlas, texture_size)
+        if "labels" in tier:
+            write_label_table(atlas, os.path.join(output_dir, tier["labels"]), texture_size)
 
-def generate_preview_image(font_path, font_name, output_path):
-    """Generate a preview image showing the font name in that font"""
+def render_preview_image(font_path, font_name):
+    """Render the font name in that font, for the settings font dropdown"""
     # Use fixed font size for consistency across all fonts
     preview_font = load_font(font_path, PREVIEW_FONT_SIZE)
     
@@ -308,67 +2116,915 @@ def generate_preview_image(font_path, font_name, output_path):
     # Draw the font name in white (using the uppercase display_text)
     draw.text((text_x, text_y), display_text, fill=(255, 255, 255, 255), font=preview_font)
     
+    return img
+
+@profiled("preview")
+def generate_preview_image(font_path, font_name, output_path):
+    """Generate a preview image showing the font name in that font"""
+    img = render_preview_image(font_path, font_name)
+    
     # Save the preview
-    img.save(output_path, 'PNG')
-    print(f"  Generated Preview.png ({preview_width}x{preview_height} pixels)")
+    save_png(img, output_path)
+    print(f"  Generated Preview.png ({img.width}x{img.height} pixels)")
 
-def process_font(font_path, font_name=None):
-    """Process a single font file"""
+def resolve_font_name(font_path, font_name=None):
+    """Derive the output font name from the font filename if not provided"""
+    if font_name is not None:
+        return font_name
+    
+    font_filename = os.path.basename(font_path)
+    font_name = os.path.splitext(font_filename)[0]
+    # Clean up common suffixes
+    for suffix in ['-Regular', '-Bold', '-Medium', '-Light', 'NL-Regular']:
+        if font_name.endswith(suffix):
+            font_name = font_name[:-len(suffix)]
+    return font_name
+
+def report_subset_coverage(supported_chars):
+    """Print how much of the charset subset made it into the atlas"""
+    kept = {ord(c) for c, supported in supported_chars.items() if supported}
+    # Whitespace has no ink, so it never counts as a supported glyph
+    wanted = {cp for cp in CHARSET_SUBSET if not chr(cp).isspace()}
+    missing = sorted(wanted - kept)
+    print(f"  Charset subset: {len(kept)} glyphs kept, {len(wanted) - len(missing)}/{len(wanted)}"
+          f" used characters covered ({(len(wanted) - len(missing)) / max(len(wanted), 1):.1%})")
+    if missing:
+        # Outside the layout's charset (grid) or absent from the font
+        sample = "".join(chr(cp) for cp in missing[:40])
+        print(f"  Missing {len(missing)} used characters: {sample}{'...' if len(missing) > 40 else ''}")
+
+def generate_texture_and_atlas(font_path, font_name, font_output_dir):
+    """Generate Font.png and the Atlas.json that depends on its character support"""
+    font_texture_path = os.path.join(font_output_dir, "Font.png")
+    atlas_path = os.path.join(font_output_dir, "Atlas.json")
+    
+    packed_layout = None
+    paged_layout = None
+    sdf_info = None
+    if SDF_ENABLED:
+        supported_chars, sdf_info, ink_boxes = generate_sdf_font_texture(font_path, font_name, font_texture_path)
+    elif ATLAS_LAYOUT == "packed":
+        supported_chars, packed_layout, ink_boxes = generate_packed_font_texture(font_path, font_name,
+                                                                                 font_texture_path)
+    elif ATLAS_LAYOUT == "paged":
+        supported_chars, paged_layout, ink_boxes = generate_paged_font_textures(font_path, font_name,
+                                                                                font_output_dir)
+        if not paged_layout["pages"]:
+            raise ValueError(f"no glyphs of {', '.join(PAGE_SCRIPTS)} in the font")
+    else:
+        supported_chars, ink_boxes = generate_font_texture(font_path, font_name, font_texture_path)
+    
+    profile_count("glyphs_supported", sum(1 for v in supported_chars.values() if v))
+    profile_count("glyphs_skipped", sum(1 for v in supported_chars.values() if not v))
+    if CHARSET_SUBSET is not None:
+        report_subset_coverage(supported_chars)
+    
+    page_textures = list(paged_layout["pages"].values()) if paged_layout is not None else None
+    tiers = generate_resolution_tiers(font_output_dir, sdf_info, page_textures)
+    generate_atlas_json(font_name, supported_chars, atlas_path, packed_layout, sdf_info, tiers, paged_layout, font_path,
+                        ink_boxes)
+
+def process_font(font_path, font_name=None, font_output_dir=None):
+    """Process a single font file (into font_output_dir, by default OUTPUT_DIR/<font name>)"""
     if not os.path.exists(font_path):
         print(f"Error: Font file {font_path} not found")
         return False
     
-    # Extract font name from filename if not provided
-    if font_name is None:
-        font_filename = os.path.basename(font_path)
-        font_name = os.path.splitext(font_filename)[0]
-        # Clean up common suffixes
-        for suffix in ['-Regular', '-Bold', '-Medium', '-Light', 'NL-Regular']:
-            if font_name.endswith(suffix):
-                font_name = font_name[:-len(suffix)]
+    font_name = resolve_font_name(font_path, font_name)
     
     print(f"\nProcessing font: {font_name}")
     print(f"  Source: {font_path}")
     
     # Create output directory
-    font_output_dir = os.path.join(OUTPUT_DIR, font_name)
+    font_output_dir = font_output_dir or os.path.join(OUTPUT_DIR, font_name)
     os.makedirs(font_output_dir, exist_ok=True)
     
-    # Generate Font.png
-    font_texture_path = os.path.join(font_output_dir, "Font.png")
-    supported_chars = generate_font_texture(font_path, font_name, font_texture_path)
-    
-    # Generate Atlas.json
-    atlas_path = os.path.join(font_output_dir, "Atlas.json")
-    generate_atlas_json(font_name, supported_chars, atlas_path)
+    # Generate Font.png and Atlas.json
+    with profile_font(font_name, "texture"):
+        generate_texture_and_atlas(font_path, font_name, font_output_dir)
     
     # Generate Preview.png
     preview_path = os.path.join(font_output_dir, "Preview.png")
-    generate_preview_image(font_path, font_name, preview_path)
+    with profile_font(font_name, "preview"):
+        generate_preview_image(font_path, font_name, preview_path)
     
     print(f"  Font {font_name} processed successfully!")
     return True
 
-def process_target_fonts(fonts_dir):
-    """Process only the target fonts specified in TARGET_FONTS list"""
+def get_worker_settings():
+    """Snapshot the module settings that worker processes need to match this run"""
+    return {
+        "FONT_SIZE": FONT_SIZE,
+        "CHAR_WIDTH": CHAR_WIDTH,
+        "CHAR_HEIGHT": CHAR_HEIGHT,
+        "OUTPUT_DIR": OUTPUT_DIR,
+        "ATLAS_LAYOUT": ATLAS_LAYOUT,
+        "PACK_GUTTER": PACK_GUTTER,
+        "SDF_ENABLED": SDF_ENABLED,
+        "SDF_SCALE": SDF_SCALE,
+        "SDF_SPREAD": SDF_SPREAD,
+        "RESOLUTION_TIERS": RESOLUTION_TIERS,
+        "CHARSET_SUBSET": CHARSET_SUBSET,
+        "PNG_ENCODING": PNG_ENCODING,
+        "PNG_COMPRESS_LEVEL": PNG_COMPRESS_LEVEL,
+        "PNG_STRATEGY": PNG_STRATEGY,
+        "PNG_REPORT": PNG_REPORT,
+        "DDS_FORMAT": DDS_FORMAT,
+        "PREBAKED_LABELS": PREBAKED_LABELS,
+        "PAGE_SCRIPTS": PAGE_SCRIPTS,
+        "GLYPH_CACHE_DIR": GLYPH_CACHE_DIR,
+        "GLYPH_CACHE_MAX_BYTES": GLYPH_CACHE_MAX_BYTES,
+        "PROFILE_ENABLED": PROFILE_ENABLED,
+        "PROFILE_CPROFILE_DIR": PROFILE_CPROFILE_DIR,
+    }
+
+def init_worker(settings):
+    """Apply the parent's settings in a worker (spawned workers re-import this module)"""
+    globals().update(settings)
+
+def run_captured(font_name, task, func, *args):
+    """Run a generation stage in a worker, returning (ok, console output, profile data)"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            with profile_font(font_name, task):
+                func(*args)
+            ok = True
+        except Exception as e:
+            print(f"  Error: {type(e).__name__}: {e}")
+            ok = False
+    return ok, output.getvalue(), take_profile_data()
+
+def run_isolated(settings, *task):
+    """Run a run_captured task alone in a fresh single-worker pool"""
+    with ProcessPoolExecutor(max_workers=1, initializer=init_worker, initargs=(settings,)) as executor:
+        return executor.submit(run_captured, *task).result()
+
+def process_font_contained(font_path, font_name=None, font_output_dir=None):
+    """process_font for the serial path, reporting a failure the way run_captured does
+    
+    An error in one font (bad input, a failed self-check) must not abort the remaining fonts or
+    a watch loop, so it is printed and returned as False instead of raised.
+    """
+    try:
+        return process_font(font_path, font_name, font_output_dir)
+    except Exception as e:
+        print(f"  Error: {type(e).__name__}: {e}")
+        print(f"  Font {resolve_font_name(font_path, font_name)} failed")
+        return False
+
+def process_fonts(font_jobs, jobs=1):
+    """Process (font_path, font_name, font_output_dir) jobs, optionally on a process pool
+    
+    font_output_dir may be None for OUTPUT_DIR/<font name>. Returns a list of success flags in
+    the same order as font_jobs.
+    """
+    if jobs == 1 or not font_jobs:
+        return [process_font_contained(font_path, font_name, font_output_dir)
+                for font_path, font_name, font_output_dir in font_jobs]
+    
+    # Texture+atlas and preview are independent stages, so each font becomes two tasks
+    results = []
+    settings = get_worker_settings()
+    with ProcessPoolExecutor(max_workers=jobs or None, initializer=init_worker,
+                             initargs=(settings,)) as executor:
+        pending = []
+        for font_path, font_name, font_output_dir in font_jobs:
+            if not os.path.exists(font_path):
+                pending.append((font_path, font_name, None))
+                continue
+            
+            font_name = resolve_font_name(font_path, font_name)
+            font_output_dir = font_output_dir or os.path.join(OUTPUT_DIR, font_name)
+            os.makedirs(font_output_dir, exist_ok=True)
+            
+            preview_path = os.path.join(font_output_dir, "Preview.png")
+            tasks = [
+                (font_name, "texture", generate_texture_and_atlas, font_path, font_name, font_output_dir),
+                (font_name, "preview", generate_preview_image, font_path, font_name, preview_path),
+            ]
+            stages = [(executor.submit(run_captured, *task), task) for task in tasks]
+            pending.append((font_path, font_name, stages))
+        
+        # Report in submission order so console output stays grouped per font
+        for font_path, font_name, stages in pending:
+            if stages is None:
+                print(f"Error: Font file {font_path} not found")
+                results.append(False)
+                continue
+            
+            print(f"\nProcessing font: {font_name}")
+            print(f"  Source: {font_path}")
+            
+            font_ok = True
+            for stage, task in stages:
+                try:
+                    try:
+                        ok, output, profile_data = stage.result()
+                    except BrokenProcessPool:
+                        # A dying worker breaks the pool for every unfinished task, so re-run this
+                        # one alone: only the font that crashed it fails again
+                        ok, output, profile_data = run_isolated(settings, *task)
+                    merge_profile_data(profile_data)
+                except BrokenProcessPool:
+                    ok, output = False, f"  Error: worker process died during the {task[1]} stage of {font_name}\n"
+                except Exception as e:
+                    ok, output = False, f"  Error: worker failed: {type(e).__name__}: {e}\n"
+                print(output, end="")
+                font_ok = font_ok and ok
+            
+            if font_ok:
+                print(f"  Font {font_name} processed successfully!")
+            else:
+                print(f"  Font {font_name} failed")
+            results.append(font_ok)
+    
+    return results
+
+def hash_file(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def get_generator_settings():
+    """Collect every setting that affects the generated outputs"""
+    return {
+        "generator": hash_file(os.path.abspath(__file__)),
+        "pillow": PIL_VERSION,
+        "fontSize": FONT_SIZE,
+        "charWidth": CHAR_WIDTH,
+        "charHeight": CHAR_HEIGHT,
+        "charsPerRow": CHARS_PER_ROW,
+        "totalRows": TOTAL_ROWS,
+        "charset": [ord(get_character_for_index(i)) for i in range(TOTAL_CHARS)],
+        "previewHeight": PREVIEW_HEIGHT,
+        "previewFontSize": PREVIEW_FONT_SIZE,
+        "previewPadding": PREVIEW_PADDING,
+        "atlasLayout": ATLAS_LAYOUT,
+        "packGutter": PACK_GUTTER,
+        "sdf": [SDF_CELL_WIDTH, SDF_CELL_HEIGHT, SDF_SCALE, SDF_SPREAD] if SDF_ENABLED else None,
+        "tiers": RESOLUTION_TIERS,
+        "pageScripts": PAGE_SCRIPTS if ATLAS_LAYOUT == "paged" else None,
+        "charsetSubset": sorted(CHARSET_SUBSET) if CHARSET_SUBSET is not None else None,
+        "png": [PNG_ENCODING, PNG_COMPRESS_LEVEL, PNG_STRATEGY],
+        "dds": DDS_FORMAT,
+        "prebakedLabels": get_prebaked_labels(),
+    }
+
+def hash_settings(settings):
+    """Stable hash of a settings dictionary"""
+    encoded = json.dumps(settings, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+def load_build_manifest():
+    """Load the incremental build manifest, or an empty one if missing or outdated"""
+    manifest_path = os.path.join(OUTPUT_DIR, MANIFEST_FILE)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "fonts": {}}
+
+def save_build_manifest(manifest):
+    """Write the incremental build manifest"""
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    manifest_path = os.path.join(OUTPUT_DIR, MANIFEST_FILE)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+def hash_outputs(font_output_dir):
+    """Hash every generated file in a font's output directory"""
+    return {
+        name: hash_file(os.path.join(font_output_dir, name))
+        for name in sorted(os.listdir(font_output_dir))
+        if os.path.isfile(os.path.join(font_output_dir, name))
+    }
+
+def prune_build_manifest(manifest):
+    """Drop manifest entries whose output directory was removed or replaced since they were built"""
+    for font_name, entry in list(manifest["fonts"].items()):
+        font_output_dir = os.path.join(OUTPUT_DIR, font_name)
+        if not os.path.isdir(font_output_dir) or set(entry.get("outputs", {})) != {
+                name for name in os.listdir(font_output_dir) if os.path.isfile(os.path.join(font_output_dir, name))}:
+            del manifest["fonts"][font_name]
+
+def is_font_up_to_date(entry, source_hash, settings_hash, font_output_dir):
+    """Check a manifest entry against the current inputs and the outputs on disk"""
+    if not entry or entry.get("sourceHash") != source_hash or entry.get("settingsHash") != settings_hash:
+        return False
+    if not os.path.isdir(font_output_dir):
+        return False
+    # Outputs that were deleted or edited by hand also trigger a rebuild
+    return entry.get("outputs") == hash_outputs(font_output_dir)
+
+def build_fonts(font_jobs, jobs=1, force=False):
+    """Regenerate the (font_path, font_name) pairs whose inputs changed since the last build
+    
+    Returns {font name: success flag} in the order of font_jobs (font_name None resolves from the
+    path); up-to-date fonts count as successful. Pass force=True to ignore the manifest and
+    rebuild everything.
+    """
+    manifest = load_build_manifest()
+    settings_hash = hash_settings(get_generator_settings())
+    remove_leftover_staging_dirs()
+    prune_build_manifest(manifest)
+    
+    # Several files can resolve to the same font name (e.g. a family's Regular and Bold with
+    # --all); they would share one output directory, so only the last of them is built
+    font_jobs = [(font_path, resolve_font_name(font_path, font_name)) for font_path, font_name in font_jobs]
+    last_position = {font_name: position for position, (_, font_name) in enumerate(font_jobs)}
+    
+    results = [True] * len(font_jobs)
+    stale = []
+    for position, (font_path, font_name) in enumerate(font_jobs):
+        if last_position[font_name] != position:
+            print(f"\nSkipping {font_path}: {font_jobs[last_position[font_name]][0]} is also named {font_name}")
+            continue
+        font_output_dir = os.path.join(OUTPUT_DIR, font_name)
+        source_hash = hash_file(font_path) if os.path.exists(font_path) else None
+        
+        if not force and source_hash and is_font_up_to_date(
+                manifest["fonts"].get(font_name), source_hash, settings_hash, font_output_dir):
+            print(f"\nSkipping font: {font_name} (up to date)")
+            continue
+        
+        stale.append((position, font_path, font_name, source_hash))
+    
+    # Fonts are generated into empty staging directories (so outputs from older runs don't
+    # linger) and swapped in only once complete; a failed rebuild keeps the previous outputs
+    stale_results = process_fonts([(font_path, font_name, get_staging_dir(font_name))
+                                   for _, font_path, font_name, _ in stale], jobs)
+    
+    savings = []
+    for (position, font_path, font_name, source_hash), ok in zip(stale, stale_results):
+        results[position] = ok
+        if ok:
+            font_output_dir = os.path.join(OUTPUT_DIR, font_name)
+            replace_directory(get_staging_dir(font_name), font_output_dir)
+            output_bytes = get_output_bytes(font_output_dir)
+            # Remember the size of the last full-charset build to measure subsets against
+            full_output_bytes = output_bytes
+            if CHARSET_SUBSET is not None:
+                full_output_bytes = manifest["fonts"].get(font_name, {}).get("fullOutputBytes")
+                savings.append((font_name, output_bytes, full_output_bytes))
+            manifest["fonts"][font_name] = {
+                "source": font_path,
+                "sourceHash": source_hash,
+                "settingsHash": settings_hash,
+                "outputs": hash_outputs(font_output_dir),
+                "outputBytes": output_bytes,
+                "fullOutputBytes": full_output_bytes,
+            }
+        else:
+            shutil.rmtree(get_staging_dir(font_name), ignore_errors=True)
+            manifest["fonts"].pop(font_name, None)
+    
+    save_build_manifest(manifest)
+    if savings:
+        print_subset_savings(savings)
+    return {font_name: results[position] for font_name, position in last_position.items()}
+
+def get_staging_dir(font_name):
+    """Directory a font is generated into before replace_directory moves it into place"""
+    return os.path.join(OUTPUT_DIR, f".{font_name}.staging")
+
+def replace_directory(new_dir, target_dir):
+    """Move a complete output directory into place, replacing the previous one
+    
+    Both renames stay inside OUTPUT_DIR, so target_dir only ever holds a complete set of
+    outputs (it is briefly absent between the two renames, never half-written).
+    """
+    old_dir = None
+    if os.path.isdir(target_dir):
+        old_dir = f"{new_dir}.old"
+        shutil.rmtree(old_dir, ignore_errors=True)
+        os.rename(target_dir, old_dir)
+    os.rename(new_dir, target_dir)
+    if old_dir:
+        shutil.rmtree(old_dir)
+
+def remove_leftover_staging_dirs():
+    """Remove staging directories left behind by an interrupted build"""
+    if not os.path.isdir(OUTPUT_DIR):
+        return
+    for item in os.listdir(OUTPUT_DIR):
+        item_path = os.path.join(OUTPUT_DIR, item)
+        if item.startswith(".") and item.endswith((".staging", ".staging.old")) and os.path.isdir(item_path):
+            shutil.rmtree(item_path)
+
+def get_output_bytes(font_output_dir):
+    """Total size of the generated files in a font's output directory"""
+    return sum(os.path.getsize(os.path.join(font_output_dir, name)) for name in os.listdir(font_output_dir)
+               if os.path.isfile(os.path.join(font_output_dir, name)))
+
+def print_subset_savings(savings):
+    """Print per-font output sizes of a subset build against the last full-charset build"""
+    print("\nCharset subset size savings:")
+    for font_name, output_bytes, full_output_bytes in savings:
+        if full_output_bytes:
+            saved = 1 - output_bytes / full_output_bytes
+            print(f"  {font_name}: {output_bytes / 1024:.1f} KB, full charset {full_output_bytes / 1024:.1f} KB"
+                  f" ({saved:.1%} smaller)")
+        else:
+            print(f"  {font_name}: {output_bytes / 1024:.1f} KB (build once without --charset-from to compare)")
+
+def get_atlas_textures(atlas):
+    """Full-resolution textures of an Atlas.json as (page or None, file name) pairs"""
+    if atlas.get("layout") == "paged":
+        return [(int(page), f"{texture}.png") for page, texture in atlas["pages"].items()]
+    return [(None, "Font.png")]
+
+def choose_combined_grid(count, slice_width, slice_height):
+    """Columns and rows of slices for the combined atlas, or None if it can't fit MAX_TEXTURE_SIZE
+    
+    Picks the smallest texture area, then the squarest.
+    """
+    best = None
+    for columns in range(1, count + 1):
+        rows = -(-count // columns)
+        width, height = columns * slice_width, rows * slice_height
+        if width > MAX_TEXTURE_SIZE or height > MAX_TEXTURE_SIZE:
+            continue
+        key = (width * height, max(width, height))
+        if best is None or key < best[0]:
+            best = (key, columns, rows)
+    return best and best[1:]
+
+def remap_uv_rect(rect, source_size, origin, texture_size):
+    """Move a runtime UV rect (bottom-left origin) of a source texture placed at origin
+    (top-left pixel) into a larger texture"""
+    uv_left, uv_bottom, uv_right, uv_top = rect
+    source_width, source_height = source_size
+    x, y = origin
+    width, height = texture_size
+    return ((x + uv_left * source_width) / width,
+            1 - (y + (1 - uv_bottom) * source_height) / height,
+            (x + uv_right * source_width) / width,
+            1 - (y + (1 - uv_top) * source_height) / height)
+
+@profiled("combined")
+def write_combined_output(font_names, output_dir):
+    """Write the combined textures and Combined.json for the given (already built) fonts
+    
+    Every font texture becomes a slice as large as the largest one, with the texture in its top-left
+    corner. Combined.json maps each font's codepoints to [slice, uvLeft, uvBottom, uvRight, uvTop,
+    advance], with runtime-ready UVs (padded and flipped like FontAtlas) in the texture holding the slice.
+    """
+    atlases = {}
+    sources = []
+    for font_name in font_names:
+        with open(os.path.join(OUTPUT_DIR, font_name, "Atlas.json"), 'r', encoding='utf-8') as f:
+            atlases[font_name] = json.load(f)
+        for page, texture in get_atlas_textures(atlases[font_name]):
+            with Image.open(os.path.join(OUTPUT_DIR, font_name, texture)) as img:
+                # RGBA (or the single channel of distance fields), like the tiers
+                sources.append((font_name, page, texture,
+                                img.copy() if "distanceField" in atlases[font_name] else decode_texture(img)))
+    
+    slice_width = max(img.width for *_, img in sources)
+    slice_height = max(img.height for *_, img in sources)
+    mode = sources[0][3].mode
+    if COMBINED_MODE == "atlas":
+        grid = choose_combined_grid(len(sources), slice_width, slice_height)
+        if grid is None:
+            raise ValueError(f"{len(sources)} textures of {slice_width}x{slice_height} don't fit a "
+                             f"{MAX_TEXTURE_SIZE}px atlas, use --combined array")
+        columns, rows = grid
+        texture_size = (columns * slice_width, rows * slice_height)
+        origins = [((i % columns) * slice_width, (i // columns) * slice_height) for i in range(len(sources))]
+        textures = ["Fonts"]
+    else:
+        texture_size = (slice_width, slice_height)
+        origins = [(0, 0)] * len(sources)
+        textures = [f"Slice{i:02d}" for i in range(len(sources))]
+    
+    combined = {
+        "version": COMBINED_VERSION,
+        "mode": COMBINED_MODE,
+        "textureWidth": texture_size[0],
+        "textureHeight": texture_size[1],
+        "sliceWidth": slice_width,
+        "sliceHeight": slice_height,
+        "textures": textures,
+        "slices": [],
+        "glyphFormat": ["slice", "uvLeft", "uvBottom", "uvRight", "uvTop", "advance"],
+        "fonts": {},
+    }
+    
+    atlas_img = Image.new(mode, texture_size, 0) if COMBINED_MODE == "atlas" else None
+    slice_of = {}
+    for i, ((font_name, page, texture, img), origin) in enumerate(zip(sources, origins)):
+        if atlas_img is not None:
+            atlas_img.paste(img, origin)
+        else:
+            slice_img = Image.new(mode, texture_size, 0)
+            slice_img.paste(img, origin)
+            save_texture_png(slice_img, os.path.join(output_dir, f"{textures[i]}.png"))
+        slice_of[(font_name, page)] = i
+        slice_info = {"font": font_name, "source": texture, "width": img.width, "height": img.height}
+        if atlas_img is not None:
+            slice_info.update({"x": origin[0], "y": origin[1]})
+        combined["slices"].append(slice_info)
+    if atlas_img is not None:
+        save_texture_png(atlas_img, os.path.join(output_dir, f"{textures[0]}.png"))
+    
+    for font_name, atlas in atlases.items():
+        glyphs = {}
+        for char_code, entry in sorted(atlas["characters"].items(), key=lambda item: int(item[0])):
+            i = slice_of[(font_name, entry.get("page"))]
+            rect = remap_uv_rect(get_runtime_uv_rect(atlas, entry), (atlas["textureWidth"], atlas["textureHeight"]),
+                                 origins[i], texture_size)
+            glyphs[char_code] = [i, *rect, entry.get("advance", 1.0)]
+        combined["fonts"][font_name] = {"layout": atlas["layout"], "glyphs": glyphs}
+    
+    with open(os.path.join(output_dir, "Combined.json"), 'w', encoding='utf-8') as f:
+        json.dump(combined, f, separators=(',', ':'))
+    profile_count("bytes_written", os.path.getsize(os.path.join(output_dir, "Combined.json")))
+    print(f"  Generated {COMBINED_MODE} of {len(sources)} textures from {len(font_names)} fonts"
+          f" ({texture_size[0]}x{texture_size[1]}, {len(textures)} texture(s))")
+    return combined
+
+def get_built_fonts(manifest, font_names):
+    """Names of font_names (the fonts of the current run) that the build manifest records as
+    built with the current settings, sorted
+    
+    Other manifest entries, such as one-off --font builds, stay out of the shared outputs.
+    """
+    settings_hash = hash_settings(get_generator_settings())
+    return sorted(name for name in set(font_names)
+                  if manifest["fonts"].get(name, {}).get("settingsHash") == settings_hash
+                  and os.path.isdir(os.path.join(OUTPUT_DIR, name)))
+
+def pack_preview_sheet(sizes):
+    """Shelf-pack preview images (all PREVIEW_HEIGHT tall) into rows of PREVIEW_SHEET_WIDTH
+    
+    Returns (sheet width, sheet height, [(x, y)] in input order).
+    """
+    sheet_width = max([PREVIEW_SHEET_WIDTH] + [width for width, _ in sizes])
+    positions = []
+    x = y = 0
+    for width, height in sizes:
+        if x and x + width > sheet_width:
+            x = 0
+            y += PREVIEW_HEIGHT + PREVIEW_SHEET_GUTTER
+        positions.append((x, y))
+        x += width + PREVIEW_SHEET_GUTTER
+    return sheet_width, y + PREVIEW_HEIGHT, positions
+
+@profiled("preview")
+def write_preview_sheet(fonts, texture_path):
+    """Render the previews of (font_path, font_name) pairs into one sheet, returning its index
+    
+    Rendering goes through load_font, so fonts already loaded by this process are reused. Index
+    rects are in pixels (top-left origin) plus UVs with Unity's bottom-left origin.
+    """
+    previews = [(font_name, render_preview_image(font_path, font_name)) for font_path, font_name in fonts]
+    sheet_width, sheet_height, positions = pack_preview_sheet([img.size for _, img in previews])
+    
+    sheet = Image.new('RGBA', (sheet_width, sheet_height), (0, 0, 0, 0))
+    index = {
+        "version": PREVIEW_SHEET_VERSION,
+        "texture": PREVIEW_SHEET_NAME,
+        "textureWidth": sheet_width,
+        "textureHeight": sheet_height,
+        "fonts": {},
+    }
+    for (font_name, img), (x, y) in zip(previews, positions):
+        sheet.paste(img, (x, y))
+        index["fonts"][font_name] = {
+            "x": x,
+            "y": y,
+            "width": img.width,
+            "height": img.height,
+            "uvLeft": x / sheet_width,
+            "uvBottom": 1 - (y + img.height) / sheet_height,
+            "uvRight": (x + img.width) / sheet_width,
+            "uvTop": 1 - y / sheet_height,
+        }
+    
+    save_png(sheet, texture_path)
+    print(f"  Generated {PREVIEW_SHEET_NAME}.png ({sheet_width}x{sheet_height} pixels, "
+          f"{len(previews)} fonts)")
+    return index
+
+def build_preview_sheet(font_names, force=False):
+    """Regenerate the preview sheet of the fonts of this run (font_names) that were built
+    
+    Skipped when no font's source or settings changed since the last sheet. The sheet and its index
+    are written under temporary names and moved into place together.
+    """
+    manifest = load_build_manifest()
+    fonts = [(manifest["fonts"][name]["source"], name) for name in get_built_fonts(manifest, font_names)]
+    missing = [font_path for font_path, _ in fonts if not os.path.exists(font_path)]
+    if missing:
+        print(f"\nSkipping preview sheet: font file(s) not found: {', '.join(missing)}")
+        return False
+    if not fonts:
+        return False
+    
+    texture_path = os.path.join(OUTPUT_DIR, f"{PREVIEW_SHEET_NAME}.png")
+    index_path = os.path.join(OUTPUT_DIR, f"{PREVIEW_SHEET_NAME}.json")
+    inputs_hash = hash_settings({name: [manifest["fonts"][name]["settingsHash"], manifest["fonts"][name]["sourceHash"]]
+                                 for _, name in fonts})
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            up_to_date = json.load(f).get("inputsHash") == inputs_hash and os.path.exists(texture_path)
+    except (OSError, ValueError):
+        up_to_date = False
+    if up_to_date and not force:
+        print("\nSkipping preview sheet (up to date)")
+        return True
+    
+    print(f"\nPacking {len(fonts)} font previews into {texture_path}")
+    index = write_preview_sheet(fonts, texture_path + ".tmp")
+    index["inputsHash"] = inputs_hash
+    with open(index_path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+    profile_count("bytes_written", os.path.getsize(index_path + ".tmp"))
+    os.replace(texture_path + ".tmp", texture_path)
+    os.replace(index_path + ".tmp", index_path)
+    return True
+
+def build_combined_output(font_names, force=False):
+    """Regenerate the combined output from the fonts of this run (font_names) that were built
+    
+    Skipped when none of those fonts' outputs changed since the last combined build.
+    """
+    manifest = load_build_manifest()
+    font_names = get_built_fonts(manifest, font_names)
+    combined_dir = os.path.join(OUTPUT_DIR, COMBINED_DIR_NAME)
+    if not font_names:
+        print("\nNo fonts built with the current settings to combine")
+        return False
+    
+    inputs_hash = hash_settings({"mode": COMBINED_MODE, "fonts": {name: manifest["fonts"][name]["outputs"]
+                                                                   for name in font_names}})
+    try:
+        with open(os.path.join(combined_dir, "Combined.json"), 'r', encoding='utf-8') as f:
+            up_to_date = json.load(f).get("inputsHash") == inputs_hash
+    except (OSError, ValueError):
+        up_to_date = False
+    if up_to_date and not force:
+        print("\nSkipping combined output (up to date)")
+        return True
+    
+    print(f"\nCombining {len(font_names)} fonts into {combined_dir}")
+    staging_dir = get_staging_dir(COMBINED_DIR_NAME)
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+    try:
+        combined = write_combined_output(font_names, staging_dir)
+        combined["inputsHash"] = inputs_hash
+        with open(os.path.join(staging_dir, "Combined.json"), 'w', encoding='utf-8') as f:
+            json.dump(combined, f, separators=(',', ':'))
+    except (OSError, ValueError) as e:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        print(f"  Error: combined output failed: {e}")
+        return False
+    replace_directory(staging_dir, combined_dir)
+    return True
+
+def load_texture_pixels(path, encoding="rgba"):
+    """Load an atlas texture for comparison as an (height, width, channels) uint8 array
+    
+    RGBA is premultiplied by alpha, so colour under transparent pixels doesn't count as a change;
+    distance fields keep their single channel.
+    """
+    with Image.open(path) as img:
+        if img.mode == 'L' and encoding != "l":
+            return np.asarray(img)[:, :, None]
+        rgba = np.asarray(decode_texture(img, encoding)).astype(np.uint16)
+    rgb = (rgba[:, :, :3] * rgba[:, :, 3:] + 127) // 255
+    return np.concatenate([rgb, rgba[:, :, 3:]], axis=2).astype(np.uint8)
+
+def get_texture_glyph_rects(atlas, texture_name, size):
+    """Pixel rects (left, top, right, bottom) of the glyphs an Atlas.json places on a texture
+    
+    Works for every layout and resolution tier, since the UVs (top-left origin) are shared by the tiers.
+    """
+    entries = atlas["characters"].items()
+    if atlas.get("layout") == "paged":
+        pages = [int(page) for page, base in atlas["pages"].items() if texture_name.startswith(base)]
+        entries = [(char_code, entry) for char_code, entry in entries if entry["page"] in pages]
+    width, height = size
+    return {int(char_code): (round(entry["uvLeft"] * width), round(entry["uvTop"] * height),
+                             round(entry["uvRight"] * width), round(entry["uvBottom"] * height))
+            for char_code, entry in entries}
+
+def diff_texture(golden_path, generated_path, golden_encoding="rgba", generated_encoding="rgba"):
+    """Per-pixel difference (largest over the channels) of a regenerated texture and its golden
+    copy, or None if their sizes differ"""
+    golden = load_texture_pixels(golden_path, golden_encoding)
+    generated = load_texture_pixels(generated_path, generated_encoding)
+    if golden.shape != generated.shape:
+        return None
+    return np.abs(golden.astype(np.int16) - generated).max(axis=2).astype(np.uint8)
+
+def get_changed_glyphs(difference, atlas, texture_name, tolerance):
+    """{codepoint: max difference} of the glyph cells of a texture that changed by more than tolerance"""
+    height, width = difference.shape
+    changed = {}
+    for char_code, (left, top, right, bottom) in get_texture_glyph_rects(atlas, texture_name, (width, height)).items():
+        cell_difference = int(difference[top:bottom, left:right].max(initial=0))
+        if cell_difference > tolerance:
+            changed[char_code] = cell_difference
+    return changed
+
+def write_diff_heatmap(golden_path, difference, output_path):
+    """Write a heatmap of a texture difference: changed pixels in red over the dimmed golden glyphs"""
+    golden = load_texture_pixels(golden_path)[:, :, -1]
+    base = golden // 4
+    scale = 255 / max(int(difference.max()), 1)
+    red = np.maximum(base, (difference * scale).astype(np.uint8))
+    heatmap = np.stack([red, np.where(difference > 0, 0, base), np.where(difference > 0, 0, base)], axis=2)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    Image.fromarray(heatmap.astype(np.uint8), 'RGB').save(output_path, 'PNG')
+
+def diff_atlas_json(golden, generated):
+    """Differences between two Atlas.json dictionaries, as printable lines
+    
+    Fields the golden doesn't have at all (top-level or per character) are schema additions, not
+    differences: see get_schema_additions.
+    """
+    def same(a, b):
+        if isinstance(a, float) or isinstance(b, float):
+            return isinstance(a, (int, float)) and isinstance(b, (int, float)) and abs(a - b) <= 1e-9
+        return a == b
+    
+    lines = []
+    for key in sorted(set(golden) - {"characters"}):
+        if key not in generated:
+            lines.append(f"field {key} removed")
+        elif golden[key] != generated[key]:
+            lines.append(f"field {key} changed")
+    
+    golden_chars, generated_chars = golden.get("characters", {}), generated.get("characters", {})
+    removed = sorted(set(golden_chars) - set(generated_chars), key=int)
+    added = sorted(set(generated_chars) - set(golden_chars), key=int)
+    if removed:
+        lines.append(f"{len(removed)} characters removed: {format_codepoints(removed)}")
+    if added:
+        lines.append(f"{len(added)} characters added: {format_codepoints(added)}")
+    for char_code in sorted(set(golden_chars) & set(generated_chars), key=int):
+        old, new = golden_chars[char_code], generated_chars[char_code]
+        fields = [field for field in sorted(old) if field not in new or not same(old[field], new[field])]
+        if fields:
+            lines.append(f"character {format_codepoints([char_code])} changed: {', '.join(fields)}")
+    return lines
+
+def get_schema_additions(golden, generated):
+    """(top-level fields, per-character fields) of a regenerated Atlas.json that its golden predates
+    
+    Goldens written before a field was introduced can't match it; the fields are reported but don't
+    fail --verify until the goldens are regenerated.
+    """
+    fields = sorted(set(generated) - set(golden) - {"characters"})
+    golden_chars = golden.get("characters", {})
+    char_fields = set()
+    for char_code, entry in generated.get("characters", {}).items():
+        if char_code in golden_chars:
+            char_fields.update(set(entry) - set(golden_chars[char_code]))
+    return fields, sorted(char_fields)
+
+def format_codepoints(codepoints, limit=16):
+    """Short printable list of codepoints with their characters"""
+    shown = [f"U+{int(c):04X} {chr(int(c))!r}" for c in list(codepoints)[:limit]]
+    if len(codepoints) > limit:
+        shown.append(f"... ({len(codepoints) - limit} more)")
+    return ", ".join(shown)
+
+def verify_font_outputs(font_name, golden_dir, generated_dir, tolerance, report_dir):
+    """Compare one regenerated font with its golden outputs, printing the differences
+    
+    The golden directory decides what is checked: its Atlas.json and PNG textures. Returns True if
+    everything matches within tolerance; Atlas.json fields newer than the golden are only listed.
+    """
+    problems = []
+    with open(os.path.join(golden_dir, "Atlas.json"), 'r', encoding='utf-8') as f:
+        golden_atlas = json.load(f)
+    generated_atlas_path = os.path.join(generated_dir, "Atlas.json")
+    if not os.path.exists(generated_atlas_path):
+        print(f"  {font_name}: FAILED - no Atlas.json was regenerated")
+        return False
+    with open(generated_atlas_path, 'r', encoding='utf-8') as f:
+        generated_atlas = json.load(f)
+    problems.extend(f"Atlas.json: {line}" for line in diff_atlas_json(golden_atlas, generated_atlas))
+    notes = []
+    fields, char_fields = get_schema_additions(golden_atlas, generated_atlas)
+    if fields:
+        notes.append(f"Atlas.json: new fields the golden predates: {', '.join(fields)}")
+    if char_fields:
+        notes.append(f"Atlas.json: new character fields the golden predates: {', '.join(char_fields)}")
+    
+    for name in sorted(os.listdir(golden_dir)):
+        if not name.endswith(".png"):
+            continue
+        golden_path = os.path.join(golden_dir, name)
+        generated_path = os.path.join(generated_dir, name)
+        if not os.path.exists(generated_path):
+            problems.append(f"{name}: not regenerated")
+            continue
+        
+        is_preview = name.startswith("Preview")
+        if is_preview:
+            difference = diff_texture(golden_path, generated_path)
+        else:
+            difference = diff_texture(golden_path, generated_path, golden_atlas.get("textureEncoding", "rgba"),
+                                      generated_atlas.get("textureEncoding", "rgba"))
+        if difference is None:
+            with Image.open(golden_path) as golden, Image.open(generated_path) as generated:
+                problems.append(f"{name}: size changed from {golden.width}x{golden.height}"
+                                f" to {generated.width}x{generated.height}")
+            continue
+        if int(difference.max()) <= tolerance:
+            continue
+        
+        heatmap_path = os.path.join(report_dir, font_name, f"{os.path.splitext(name)[0]}.diff.png")
+        write_diff_heatmap(golden_path, difference, heatmap_path)
+        if is_preview:
+            # Not an atlas: only the whole image is compared
+            problems.append(f"{name}: changed (max difference {int(difference.max())}), heatmap {heatmap_path}")
+        else:
+            changed = get_changed_glyphs(difference, generated_atlas, os.path.splitext(name)[0], tolerance)
+            if changed:
+                problems.append(f"{name}: {len(changed)} glyph cells changed (max difference {max(changed.values())}):"
+                                f" {format_codepoints(sorted(changed))}, heatmap {heatmap_path}")
+            else:
+                problems.append(f"{name}: changed outside the glyph cells (max difference {int(difference.max())}),"
+                                f" heatmap {heatmap_path}")
+    
+    print(f"  {font_name}: {'FAILED' if problems else 'OK'}")
+    for problem in problems:
+        print(f"    {problem}")
+    for note in notes:
+        print(f"    schema only, not a failure - {note}")
+    return not problems
+
+def get_golden_font_names(output_dir):
+    """Names of the per-font output directories (with an Atlas.json) under output_dir"""
+    if not os.path.isdir(output_dir):
+        return []
+    return [name for name in os.listdir(output_dir)
+            if not name.startswith(".") and name != COMBINED_DIR_NAME
+            and os.path.exists(os.path.join(output_dir, name, "Atlas.json"))]
+
+def verify_fonts(build, jobs, tolerance, report_dir, every_golden=True):
+    """Regenerate fonts into a temporary directory and compare them with the outputs in OUTPUT_DIR
+    
+    build(jobs, force) is the generation run to check and returns {font name: success}. OUTPUT_DIR
+    is only read. A font that fails to regenerate fails the check, and so (with every_golden) does
+    a golden font the run did not regenerate. Returns the exit code: 0 if every font matches its
+    golden outputs, 1 otherwise.
+    """
+    global OUTPUT_DIR
+    
+    golden_root = OUTPUT_DIR
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="font_verify_") as generated_root:
+        OUTPUT_DIR = generated_root
+        try:
+            built = build(jobs, True)
+        finally:
+            OUTPUT_DIR = golden_root
+        
+        print(f"\nVerifying against {golden_root} (tolerance {tolerance}):")
+        shutil.rmtree(report_dir, ignore_errors=True)
+        font_names = set(built)
+        if every_golden:
+            font_names.update(get_golden_font_names(golden_root))
+        results = []
+        for font_name in sorted(font_names):
+            generated_dir = os.path.join(generated_root, font_name)
+            golden_dir = os.path.join(golden_root, font_name)
+            if not built.get(font_name, False) or not os.path.isdir(generated_dir):
+                print(f"  {font_name}: FAILED")
+                print(f"    {'not regenerated' if font_name not in built else 'failed to regenerate'}")
+                results.append(False)
+                continue
+            if not os.path.exists(os.path.join(golden_dir, "Atlas.json")):
+                print(f"  {font_name}: no golden outputs, skipped")
+                continue
+            results.append(verify_font_outputs(font_name, golden_dir, generated_dir, tolerance, report_dir))
+    
+    failed = results.count(False)
+    print(f"\n{len(results) - failed}/{len(results)} fonts match their golden outputs"
+          f" ({time.perf_counter() - start:.1f}s)")
+    return 1 if failed or not results else 0
+
+def process_target_fonts(fonts_dir, jobs=1, force=False):
+    """Process only the target fonts specified in TARGET_FONTS list, returning {name: success}"""
     successful = 0
     failed = []
     
-    # Clean up old font directories first
-    print("Cleaning up old font directories...")
-    fonts_output_dir = os.path.join(OUTPUT_DIR)
-    if os.path.exists(fonts_output_dir):
-        for item in os.listdir(fonts_output_dir):
-            item_path = os.path.join(fonts_output_dir, item)
-            if os.path.isdir(item_path):
-                # Only remove directories that will be regenerated
-                font_names = [name for _, name in TARGET_FONTS]
-                if any(item.startswith(name) for name in font_names):
-                    print(f"  Removing old generation: {item}")
-                    shutil.rmtree(item_path)
-    
     print(f"\nProcessing {len(TARGET_FONTS)} target fonts...\n")
     
+    font_jobs = []
     for font_filename, output_name in TARGET_FONTS:
         # Try to find the font file in various locations
         font_paths = [
@@ -379,25 +3035,40 @@ def process_target_fonts(fonts_dir):
             font_filename,  # Try direct path
         ]
         
-        font_found = False
-        for font_path in font_paths:
-            if os.path.exists(font_path):
-                if process_font(font_path, output_name):
-                    successful += 1
-                else:
-                    failed.append((font_filename, output_name))
-                font_found = True
-                break
-        
-        if not font_found:
+        font_path = next((path for path in font_paths if os.path.exists(path)), None)
+        if font_path is None:
             print(f"Warning: Font file '{font_filename}' not found")
             failed.append((font_filename, output_name))
+            continue
+        
+        font_jobs.append((font_path, output_name, font_filename))
+    
+    # Clean up old generations that no target font will regenerate
+    # (directories of up-to-date fonts are kept, stale ones are rebuilt from scratch)
+    print("Cleaning up old font directories...")
+    font_names = [name for _, name in TARGET_FONTS]
+    found_names = {name for _, name, _ in font_jobs}
+    if os.path.exists(OUTPUT_DIR):
+        for item in os.listdir(OUTPUT_DIR):
+            item_path = os.path.join(OUTPUT_DIR, item)
+            if os.path.isdir(item_path) and item not in found_names:
+                if any(item.startswith(name) for name in font_names):
+                    print(f"  Removing old generation: {item}")
+                    shutil.rmtree(item_path)
+    
+    results = build_fonts([(path, name) for path, name, _ in font_jobs], jobs, force)
+    for _, output_name, font_filename in font_jobs:
+        if results[output_name]:
+            successful += 1
+        else:
+            failed.append((font_filename, output_name))
     
     print(f"\nProcessed {successful}/{len(TARGET_FONTS)} fonts successfully")
     if failed:
         print("Failed to process:")
         for font_file, name in failed:
             print(f"  - {name} ({font_file})")
+    return {name: results.get(name, False) for _, name in TARGET_FONTS}
 
 def migrate_existing_fonts():
     """Migrate existing font textures to new structure"""
@@ -446,10 +3117,211 @@ def migrate_existing_fonts():
             img.save(preview_path, 'PNG')
             print(f"    Generated simple preview for {font_name}")
 
+class InotifyWatcher:
+    """Report changed files under a set of directories using Linux inotify (through libc)"""
+    
+    EVENT = struct.Struct('iIII')  # wd, mask, cookie, name length
+    IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE = 0x002, 0x004, 0x008
+    IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x040, 0x080, 0x100, 0x200
+    IN_ISDIR = 0x40000000
+    WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    
+    def __init__(self, directories):
+        """directories is a list of (directory, recursive) pairs; raises OSError without inotify"""
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}  # watch descriptor -> (directory, recursive)
+        for directory, recursive in directories:
+            self.add_directory(directory, recursive)
+    
+    def add_directory(self, directory, recursive):
+        """Watch a directory (and, if recursive, its current and future subdirectories)"""
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"cannot watch {directory}")
+        self.watches[wd] = (directory, recursive)
+        if recursive:
+            for entry in os.scandir(directory):
+                if entry.is_dir(follow_symlinks=False):
+                    self.add_directory(entry.path, True)
+    
+    def read(self, timeout=None):
+        """Wait up to timeout seconds (forever if None) and return the set of changed paths"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        
+        data = os.read(self.fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = os.fsdecode(data[offset:offset + name_length].rstrip(b"\0"))
+            offset += name_length
+            if wd not in self.watches or not name:
+                continue
+            directory, recursive = self.watches[wd]
+            path = os.path.join(directory, name)
+            if mask & self.IN_ISDIR:
+                if recursive and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self.add_directory(path, True)
+                continue
+            changed.add(path)
+        return changed
+    
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Fallback for InotifyWatcher: compare file modification times every WATCH_POLL_INTERVAL"""
+    
+    def __init__(self, directories):
+        self.directories = directories
+        self.snapshot = self.scan()
+    
+    def scan(self):
+        """{path: (mtime, size)} for every file in the watched directories"""
+        snapshot = {}
+        for directory, recursive in self.directories:
+            for root, dirs, files in os.walk(directory):
+                if not recursive:
+                    dirs.clear()
+                for name in files:
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+    
+    def read(self, timeout=None):
+        """Wait up to timeout seconds (forever if None) and return the set of changed paths"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(WATCH_POLL_INTERVAL if deadline is None
+                       else max(0, min(WATCH_POLL_INTERVAL, deadline - time.monotonic())))
+            snapshot = self.scan()
+            changed = {path for path in snapshot.keys() | self.snapshot.keys()
+                       if snapshot.get(path) != self.snapshot.get(path)}
+            self.snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+    
+    def close(self):
+        pass
+
+def wait_for_changes(watcher, is_relevant):
+    """Block until relevant files change, then collect changes until WATCH_DEBOUNCE passes quietly"""
+    changed = set()
+    while not changed:
+        changed = {path for path in watcher.read() if is_relevant(path)}
+    while True:
+        more = {path for path in watcher.read(WATCH_DEBOUNCE) if is_relevant(path)}
+        if not more:
+            return changed
+        changed |= more
+
+def watch_fonts(font_dirs, config_paths, rebuild):
+    """Rebuild whenever font files under font_dirs change, until interrupted
+    
+    Unchanged fonts are skipped by the build manifest, so only affected fonts are regenerated,
+    in this process with their fonts still loaded. A change to one of config_paths (the
+    generator itself, corpus files) restarts the generator with the same arguments.
+    """
+    config_paths = [os.path.abspath(path) for path in config_paths]
+    directories = [(os.path.abspath(directory), True) for directory in font_dirs if os.path.isdir(directory)]
+    for path in config_paths:
+        directories.append((path, True) if os.path.isdir(path) else (os.path.dirname(path), False))
+    
+    def is_config(path):
+        return any(path == config or path.startswith(config + os.sep) for config in config_paths)
+    
+    def is_relevant(path):
+        path = os.path.abspath(path)
+        return path.lower().endswith(FONT_SUFFIXES) or is_config(path)
+    
+    try:
+        watcher = InotifyWatcher(directories)
+        method = "inotify"
+    except OSError:
+        watcher = PollingWatcher(directories)
+        method = f"polling every {WATCH_POLL_INTERVAL:g}s"
+    
+    print(f"\nWatching {', '.join(directory for directory, _ in directories)} ({method}), Ctrl+C to stop")
+    try:
+        while True:
+            changed = wait_for_changes(watcher, is_relevant)
+            print(f"\nChanged: {', '.join(sorted(os.path.relpath(path) for path in changed))}")
+            if any(is_config(os.path.abspath(path)) for path in changed):
+                print("Generator configuration changed, restarting...")
+                sys.stdout.flush()
+                os.execv(sys.executable, [sys.executable] + sys.argv)
+            rebuild()
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    finally:
+        watcher.close()
+
+def print_profile_report(wall_time, report_path=None):
+    """Print per-font and per-stage timing tables, optionally writing them as JSON"""
+    fonts = {}
+    stage_totals = {}
+    for font_name, font_data in _profile_data.items():
+        total = sum(font_data["stages"].values())
+        fonts[font_name] = {"total": total, **font_data}
+        for stage, seconds in font_data["stages"].items():
+            stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+    
+    font_order = sorted(fonts, key=lambda name: -fonts[name]["total"])
+    stage_order = sorted(stage_totals, key=lambda stage: -stage_totals[stage])
+    cpu_total = sum(stage_totals.values()) or 1.0
+    
+    print("\nProfile (seconds of generation time per font and stage)")
+    print("========================================================")
+    name_width = max([len("Font")] + [len(name) for name in font_order])
+    print(f"{'Font':<{name_width}}  {'total':>8}" + "".join(f"  {stage:>14}" for stage in stage_order))
+    for font_name in font_order:
+        stages = fonts[font_name]["stages"]
+        print(f"{font_name:<{name_width}}  {fonts[font_name]['total']:8.3f}"
+              + "".join(f"  {stages.get(stage, 0.0):14.3f}" for stage in stage_order))
+    print(f"{'(all fonts)':<{name_width}}  {cpu_total:8.3f}"
+          + "".join(f"  {stage_totals[stage]:14.3f}" for stage in stage_order))
+    
+    print("\nStages by share of generation time:")
+    for stage in stage_order:
+        print(f"  {stage:<16} {stage_totals[stage]:8.3f}s  {stage_totals[stage] / cpu_total:6.1%}")
+    
+    print("\nCounters:")
+    for font_name in font_order:
+        counters = fonts[font_name]["counters"]
+        summary = ", ".join(f"{name} {value}" for name, value in sorted(counters.items()))
+        print(f"  {font_name}: {summary}")
+    print(f"\nWall time: {wall_time:.3f}s")
+    
+    if report_path:
+        report = {
+            "wallTime": wall_time,
+            "fonts": {name: fonts[name] for name in font_order},
+            "stages": {stage: stage_totals[stage] for stage in stage_order},
+        }
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Profile report written to {report_path}")
+
 def main():
     import argparse
     
-    global FONT_SIZE  # Declare global at the start of function
+    global FONT_SIZE, ATLAS_LAYOUT, PACK_GUTTER, SDF_ENABLED, SDF_SCALE, SDF_SPREAD
+    global RESOLUTION_TIERS, GLYPH_CACHE_DIR, GLYPH_CACHE_MAX_BYTES, PAGE_SCRIPTS, CHARSET_SUBSET
+    global PNG_ENCODING, PNG_COMPRESS_LEVEL, PNG_STRATEGY, PNG_REPORT, PREBAKED_LABELS, COMBINED_MODE
+    global DDS_FORMAT, PREVIEW_SHEET_ENABLED
+    global PROFILE_ENABLED, PROFILE_CPROFILE_DIR  # Declare globals at the start of function
     
     parser = argparse.ArgumentParser(description="Generate complete font system for LabelsOnFloor")
     parser.add_argument("--fonts-dir", default="fonts", help="Directory containing font files")
@@ -459,16 +3331,124 @@ def main():
     parser.add_argument("--migrate", action="store_true", help="Migrate existing font textures")
     parser.add_argument("--clean", action="store_true", help="Clean output directory before generating")
     parser.add_argument("--all", action="store_true", help="Process ALL fonts in directory (override target list)")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Number of worker processes (0 = one per CPU, 1 = no pool)")
+    parser.add_argument("--force", action="store_true", help="Regenerate all fonts, ignoring the build manifest")
+    parser.add_argument("--layout", choices=["grid", "packed", "paged"], default=ATLAS_LAYOUT,
+                        help="Atlas layout: fixed 16x16 grid (runtime default), trimmed, bin-packed glyphs "
+                             "or one 16x16 grid page per populated block of codepoints")
+    parser.add_argument("--scripts", default=",".join(PAGE_SCRIPTS),
+                        help=f"Comma-separated scripts for --layout paged ({', '.join(PAGE_SCRIPT_RANGES)})")
+    parser.add_argument("--gutter", type=int, default=PACK_GUTTER, help="Transparent pixels around packed glyphs")
+    parser.add_argument("--sdf", action="store_true",
+                        help=f"Generate a single-channel signed distance field atlas ({SDF_CELL_WIDTH}x{SDF_CELL_HEIGHT} cells)")
+    parser.add_argument("--sdf-scale", type=int, default=SDF_SCALE, help="Internal rasterization multiplier for --sdf")
+    parser.add_argument("--sdf-spread", type=int, default=SDF_SPREAD, help="Distance range in output pixels for --sdf")
+    parser.add_argument("--charset-from", nargs="+", metavar="PATH",
+                        help="Only include glyphs used by these corpus files or directories "
+                             "(translation XMLs, save games, text files)")
+    parser.add_argument("--charset-baseline", default=CHARSET_BASELINE,
+                        help="Hex codepoint ranges always included with --charset-from (e.g. 0020-007E,00B0)")
+    parser.add_argument("--png-encoding", choices=list(PNG_ENCODINGS), default=PNG_ENCODING,
+                        help="Atlas texture format: RGBA (runtime default), luminance-alpha, alpha as luminance "
+                             "or 8-bit palette; non-RGBA encodings are verified to decode to the same alpha")
+    parser.add_argument("--png-level", type=int, choices=range(10), default=PNG_COMPRESS_LEVEL, metavar="0-9",
+                        help="zlib compression level for PNG output")
+    parser.add_argument("--png-strategy", choices=list(PNG_STRATEGIES), default=PNG_STRATEGY,
+                        help="zlib compression strategy for PNG output")
+    parser.add_argument("--png-report", action="store_true",
+                        help="Print size and encode time of every PNG encoding and level for each atlas texture")
+    parser.add_argument("--dds", choices=list(DDS_FOURCC),
+                        help="Also write a block-compressed .dds of every atlas texture (bc4: alpha only, "
+                             "dxt5: RGBA), decoded back and checked against the source")
+    parser.add_argument("--no-preview-sheet", action="store_true",
+                        help=f"Don't pack the font previews into {PREVIEW_SHEET_NAME}.png/.json")
+    parser.add_argument("--labels", metavar="FILE",
+                        help="Prebake these labels (one per line, {n} for numbers 1-9) instead of the built-in list")
+    parser.add_argument("--no-labels", action="store_true", help="Don't write prebaked label tables")
+    parser.add_argument("--combined", choices=["atlas", "array"],
+                        help=f"Also pack every built font into one shared atlas or equal-size texture array "
+                             f"slices under {COMBINED_DIR_NAME}/, indexed by Combined.json")
+    parser.add_argument("--glyph-cache-dir", default=GLYPH_CACHE_DIR, help="Directory of the persistent glyph raster cache")
+    parser.add_argument("--glyph-cache-size", type=int, default=GLYPH_CACHE_MAX_BYTES // (1024 * 1024),
+                        help="Glyph cache size limit in MB (least recently used glyphs are evicted)")
+    parser.add_argument("--no-glyph-cache", action="store_true", help="Rasterize every glyph without the cache")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and regenerate fonts whose files change (restarts when the generator changes)")
+    parser.add_argument("--verify", action="store_true",
+                        help=f"Regenerate into a temporary directory and compare with the outputs in {OUTPUT_DIR} "
+                             f"(exit code 1 on differences; Atlas.json fields the outputs predate are only listed)")
+    parser.add_argument("--verify-tolerance", type=int, default=VERIFY_TOLERANCE,
+                        help="Per-pixel difference that --verify still accepts")
+    parser.add_argument("--verify-report", default=VERIFY_REPORT_DIR,
+                        help="Directory for the --verify diff heatmaps")
+    parser.add_argument("--profile", action="store_true", help="Print per-font, per-stage timings and counters")
+    parser.add_argument("--profile-out", help="Write the --profile report to this JSON file (implies --profile)")
+    parser.add_argument("--profile-cprofile", metavar="DIR",
+                        help="With --profile, also write a cProfile dump per font task into DIR")
+    parser.add_argument("--tiers", default=",".join(RESOLUTION_TIERS),
+                        help=f"Comma-separated resolution tiers to write ({', '.join(TIER_FACTORS)}); full is always written")
     
     args = parser.parse_args()
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 (one per CPU) or a positive number of workers")
+    if args.sdf and args.layout != "grid":
+        parser.error("--sdf is only supported with the grid layout")
+    if args.verify and (args.clean or args.migrate or args.watch):
+        parser.error("--verify can't be combined with --clean, --migrate or --watch")
+    if args.sdf and args.dds == "dxt5":
+        parser.error("distance fields are single-channel, use --dds bc4 with --sdf")
+    scripts = [script.strip() for script in args.scripts.split(",") if script.strip()]
+    unknown_scripts = [script for script in scripts if script not in PAGE_SCRIPT_RANGES]
+    if unknown_scripts:
+        parser.error(f"unknown script(s): {', '.join(unknown_scripts)}")
+    if args.charset_from:
+        missing_paths = [path for path in args.charset_from if not os.path.exists(path)]
+        if missing_paths:
+            parser.error(f"corpus path(s) not found: {', '.join(missing_paths)}")
+        try:
+            CHARSET_SUBSET = collect_corpus_codepoints(args.charset_from, args.charset_baseline)
+        except ValueError:
+            parser.error(f"invalid --charset-baseline: {args.charset_baseline}")
+    tiers = [tier.strip() for tier in args.tiers.split(",") if tier.strip()]
+    unknown_tiers = [tier for tier in tiers if tier not in TIER_FACTORS]
+    if unknown_tiers:
+        parser.error(f"unknown resolution tier(s): {', '.join(unknown_tiers)}")
     
     # Update font size if specified
     if args.font_size:
         FONT_SIZE = args.font_size
+    ATLAS_LAYOUT = args.layout
+    PACK_GUTTER = args.gutter
+    SDF_ENABLED = args.sdf
+    SDF_SCALE = args.sdf_scale
+    SDF_SPREAD = args.sdf_spread
+    RESOLUTION_TIERS = tiers
+    PAGE_SCRIPTS = scripts
+    PNG_ENCODING = args.png_encoding
+    PNG_COMPRESS_LEVEL = args.png_level
+    PNG_STRATEGY = args.png_strategy
+    PNG_REPORT = args.png_report
+    DDS_FORMAT = args.dds
+    PREVIEW_SHEET_ENABLED = not args.no_preview_sheet
+    COMBINED_MODE = args.combined
+    if args.no_labels:
+        PREBAKED_LABELS = []
+    elif args.labels:
+        with open(args.labels, 'r', encoding='utf-8') as f:
+            PREBAKED_LABELS = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    GLYPH_CACHE_DIR = None if args.no_glyph_cache else args.glyph_cache_dir
+    GLYPH_CACHE_MAX_BYTES = args.glyph_cache_size * 1024 * 1024
+    PROFILE_ENABLED = args.profile or bool(args.profile_out)
+    PROFILE_CPROFILE_DIR = args.profile_cprofile if PROFILE_ENABLED else None
+    run_start = time.perf_counter()
     
     print("LabelsOnFloor Font System Generator")
     print("====================================")
     
+    if CHARSET_SUBSET is not None:
+        print(f"Charset subset: {len(CHARSET_SUBSET)} codepoints from {len(args.charset_from)} corpus path(s)")
+    
     # Clean output directory if requested
     if args.clean and os.path.exists(OUTPUT_DIR):
         print(f"Cleaning {OUTPUT_DIR}...")
@@ -477,20 +3457,49 @@ def main():
     # Create output directory
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     
+    # Compile the charset spec for the runtime, checking that every slot round-trips
+    try:
+        if len(CHARSET_SLOTS) != TOTAL_CHARS:
+            raise ValueError(f"spec declares {len(CHARSET_SLOTS)} slots, the grid has {TOTAL_CHARS}")
+        verify_charset(CHARSET_SLOTS, CHARSET_LOOKUP)
+    except ValueError as e:
+        print(f"Error: {CHARSET_SPEC_FILE}: {e}")
+        sys.exit(1)
+    if not args.verify:
+        write_charset_bin(os.path.join(OUTPUT_DIR, CHARSET_BIN_FILE))
+        if update_charset_csharp():
+            print(f"Updated {os.path.relpath(CHARSET_CSHARP_FILE)} from the charset spec")
+    
     # Migrate existing fonts if requested
     if args.migrate:
         migrate_existing_fonts()
     
-    # Process specific font or directory
-    if args.font:
-        process_font(args.font, args.font_name)
-    elif args.all:
-        # Process ALL fonts in directory (old behavior)
-        print("Processing ALL fonts in directory...")
-        process_all_fonts_in_directory(args.fonts_dir)
-    else:
-        # Process only target fonts (default behavior)
-        process_target_fonts(args.fonts_dir)
+    def build(jobs, force):
+        # Process specific font or directory
+        if args.font:
+            results = build_fonts([(args.font, args.font_name)], jobs, force)
+        elif args.all:
+            # Process ALL fonts in directory (old behavior)
+            print("Processing ALL fonts in directory...")
+            results = process_all_fonts_in_directory(args.fonts_dir, jobs, force)
+        else:
+            # Process only target fonts (default behavior)
+            results = process_target_fonts(args.fonts_dir, jobs, force)
+        built = [font_name for font_name, ok in results.items() if ok]
+        if COMBINED_MODE:
+            build_combined_output(built, force)
+        if PREVIEW_SHEET_ENABLED:
+            build_preview_sheet(built, force)
+        return results
+    
+    if args.verify:
+        sys.exit(verify_fonts(build, args.jobs, args.verify_tolerance, args.verify_report,
+                              every_golden=not args.font))
+    
+    build(args.jobs, args.force)
+    
+    if PROFILE_ENABLED:
+        print_profile_report(time.perf_counter() - run_start, args.profile_out)
     
     print("\nDone! Font system generated successfully.")
     print(f"Output directory: {OUTPUT_DIR}")
@@ -498,9 +3507,27 @@ def main():
     print("1. Add font files to the 'fonts' directory")
     print("2. Update TARGET_FONTS list in this script")
     print("3. Run: python3 generate_font_system.py")
+    
+    if args.watch:
+        def rebuild():
+            # Rebuilds run in this process so loaded fonts stay warm
+            rebuild_start = time.perf_counter()
+            take_profile_data()
+            try:
+                build(1, False)
+            except Exception as e:
+                # Fonts contain their own failures; keep watching whatever else went wrong
+                print(f"\nRebuild failed: {type(e).__name__}: {e}")
+                return
+            if PROFILE_ENABLED:
+                print_profile_report(time.perf_counter() - rebuild_start, args.profile_out)
+            print(f"\nRebuilt in {time.perf_counter() - rebuild_start:.2f}s")
+        
+        font_dirs = [os.path.dirname(os.path.abspath(args.font))] if args.font else [args.fonts_dir]
+        watch_fonts(font_dirs, [__file__, CHARSET_SPEC_FILE] + (args.charset_from or []), rebuild)
 
-def process_all_fonts_in_directory(fonts_dir):
-    """Process ALL font files in a directory (old behavior for --all flag)"""
+def process_all_fonts_in_directory(fonts_dir, jobs=1, force=False):
+    """Process ALL font files in a directory (old behavior for --all flag), returning {name: success}"""
     # Look for TTF and OTF files
     font_patterns = ['*.ttf', '*.otf', '*.TTF', '*.OTF']
     font_files = []
@@ -511,17 +3538,16 @@ def process_all_fonts_in_directory(fonts_dir):
     
     if not font_files:
         print(f"No font files found in {fonts_dir}")
-        return
+        return {}
     
     print(f"Found {len(font_files)} font files to process")
     
     # Process each font
-    successful = 0
-    for font_path in font_files:
-        if process_font(font_path):
-            successful += 1
+    results = build_fonts([(font_path, None) for font_path in font_files], jobs, force)
+    successful = sum(1 for font_path in font_files if results[resolve_font_name(font_path)])
     
     print(f"\nProcessed {successful}/{len(font_files)} fonts successfully")
+    return results
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -13,6 +13,7 @@ namespace LabelsOnFloor.FontLibrary
         private readonly float _cellWidth;
         private readonly float _cellHeight;
         private readonly Dictionary<char, int> _characterToIndex;
+        private readonly short[] _slotLookup;
         private readonly bool _flipVertical;
 
         public Texture2D Texture => _texture;
@@ -35,16 +36,44 @@ namespace LabelsOnFloor.FontLibrary
             _flipVertical = flipVertical;
         }
 
+        /// <summary>
+        /// Atlas addressed through a dense codepoint -> slot table (-1 = unmapped), see CharsetTable
+        /// </summary>
+        public FontAtlas(
+            Texture2D texture,
+            int gridWidth,
+            int gridHeight,
+            short[] slotLookup,
+            bool flipVertical = true)
+        {
+            _texture = texture ?? throw new ArgumentNullException(nameof(texture));
+            _gridWidth = gridWidth;
+            _gridHeight = gridHeight;
+            _cellWidth = 1f / gridWidth;
+            _cellHeight = 1f / gridHeight;
+            _slotLookup = slotLookup ?? throw new ArgumentNullException(nameof(slotLookup));
+            _flipVertical = flipVertical;
+        }
+
+        private bool TryGetIndex(char character, out int index)
+        {
+            if (_slotLookup == null)
+                return _characterToIndex.TryGetValue(character, out index);
+
+            index = character < _slotLookup.Length ? _slotLookup[character] : -1;
+            return index >= 0;
+        }
+
         public bool HasCharacter(char character)
         {
-            return _characterToIndex.ContainsKey(character);
+            return TryGetIndex(character, out _);
         }
 
         public CharacterGlyph GetGlyph(char character)
         {
-            if (!_characterToIndex.TryGetValue(character, out int index))
+            if (!TryGetIndex(character, out int index))
             {
-                if (_characterToIndex.TryGetValue(' ', out int spaceIndex))
+                if (TryGetIndex(' ', out int spaceIndex))
                 {
                     index = spaceIndex;
                 }
@@ -97,34 +126,9 @@ namespace LabelsOnFloor.FontLibrary
             );
         }
 
-        public static FontAtlas CreateStandardAsciiAtlas(Texture2D texture, int gridWidth = 16, int gridHeight = 16)
-        {
-            var characterMapping = new Dictionary<char, int>();
-            
-            for (int i = 32; i <= 126; i++)
-            {
-                characterMapping[(char)i] = i - 32;
-            }
-            
-            for (int i = 160; i <= 255; i++)
-            {
-                characterMapping[(char)i] = i - 32;
-            }
-            
-            for (int i = 256; i <= 319; i++)
-            {
-                if (i - 32 < gridWidth * gridHeight)
-                {
-                    characterMapping[(char)i] = i - 32;
-                }
-            }
-
-            return new FontAtlas(texture, gridWidth, gridHeight, characterMapping, flipVertical: true);
-        }
-        
         public bool HasGlyph(char character)
         {
-            return _characterToIndex.ContainsKey(character);
+            return TryGetIndex(character, out _);
         }
     }
 }
\ No newline at end of file
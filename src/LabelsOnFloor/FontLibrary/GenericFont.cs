@@ -73,26 +73,17 @@ namespace LabelsOnFloor.FontLibrary
                 }
 
                 // Detect texture layout based on dimensions
-                Dictionary<char, int> characterMapping;
-                int gridWidth, gridHeight;
-                
                 if (_texture.width > 2000) // Original Consolas.png is 2415px wide (single row)
                 {
-                    // Single row layout - original Consolas
-                    gridWidth = 69; // 69 characters in the original
-                    gridHeight = 1;
-                    characterMapping = BuildOriginalConsolasMapping();
+                    // Single row layout - original Consolas (69 characters in the original)
+                    _atlas = new FontAtlas(_texture, 69, 1, BuildOriginalConsolasMapping(), flipVertical: true);
                 }
                 else
                 {
-                    // Grid layout - new font system
-                    gridWidth = 16;
-                    gridHeight = 16;
-                    characterMapping = BuildCharacterMapping();
+                    // Grid layout - new font system, slots generated from font_charset.json
+                    _atlas = new FontAtlas(_texture, 16, 16, CharsetTable.CodepointToSlot, flipVertical: true);
                 }
                 
-                _atlas = new FontAtlas(_texture, gridWidth, gridHeight, characterMapping, flipVertical: true);
-                
                 // Try to load metadata from Atlas.json
                 LoadMetadata();
                 
@@ -104,38 +95,6 @@ namespace LabelsOnFloor.FontLibrary
             }
         }
 
-        private Dictionary<char, int> BuildCharacterMapping()
-        {
-            var mapping = new Dictionary<char, int>();
-
-            mapping[' '] = 0;
-            
-            // Basic ASCII (33-126)
-            for (int i = 33; i <= 126; i++)
-            {
-                mapping[(char)i] = i - 32;
-            }
-            
-            // Latin-1 Supplement (160-255)
-            for (int i = 160; i <= 255; i++)
-            {
-                mapping[(char)i] = i - 65;
-            }
-            
-            // Cyrillic (1040-1103) - Russian alphabet
-            // Maps to indices 191-254
-            for (int i = 1040; i <= 1103; i++)
-            {
-                int index = 191 + (i - 1040);
-                if (index < 256)
-                {
-                    mapping[(char)i] = index;
-                }
-            }
-
-            return mapping;
-        }
-
         private Dictionary<char, int> BuildOriginalConsolasMapping()
         {
             var mapping = new Dictionary<char, int>();
@@ -0,0 +1,725 @@
+#!/usr/bin/env python3
+"""
+Tests for generate_font_system.py
+Run from the repository root: python3 -m unittest discover -s tests
+Tests that render glyphs use a freely licensed font found like the benchmark does
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import struct
+import tempfile
+import unittest
+import contextlib
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_font_system as fontgen
+from benchmark_font_system import find_benchmark_font
+
+TEST_FONT = find_benchmark_font()
+
+def build_font(font_path, output_dir, layout="grid"):
+    """Generate one font's outputs into output_dir with the given atlas layout, returning its Atlas.json"""
+    settings = {"ATLAS_LAYOUT": layout, "GLYPH_CACHE_DIR": None}
+    saved = {name: getattr(fontgen, name) for name in settings}
+    fontgen.__dict__.update(settings)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fontgen.generate_texture_and_atlas(font_path, "Test", output_dir)
+    finally:
+        fontgen.__dict__.update(saved)
+    with open(os.path.join(output_dir, "Atlas.json"), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+@unittest.skipIf(TEST_FONT is None, "no test font installed")
+class LabelLayoutTest(unittest.TestCase):
+    """Prebaked label quads must not depend on the atlas layout"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.output_dir = tempfile.mkdtemp(prefix="font_test_")
+        cls.atlases = {}
+        for layout in ("grid", "packed"):
+            os.makedirs(os.path.join(cls.output_dir, layout))
+            cls.atlases[layout] = build_font(TEST_FONT, os.path.join(cls.output_dir, layout), layout)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.output_dir, ignore_errors=True)
+
+    def test_packed_quads_match_grid(self):
+        # Ink boxes come from each glyph's own raster, so ink bleeding into a grid cell from its
+        # neighbour doesn't widen the grid quad. The quads may still disagree by the grid runtime's
+        # cell padding and the grid ink margin (plus a pixel for rounding).
+        padding = 4.0 if fontgen.CHAR_WIDTH * fontgen.CHARS_PER_ROW > 600 else 2.0
+        slack = padding + fontgen.INK_MARGIN + 1
+        x_tolerance = slack / (fontgen.CHAR_WIDTH - 2 * padding)
+        z_tolerance = slack / (fontgen.CHAR_HEIGHT - 2 * padding) * (fontgen.LABEL_QUAD_TOP - fontgen.LABEL_QUAD_BOTTOM)
+        
+        for text in ("TOMB", "DINING ROOM", "STOCKPILE 7", "FREEZER-2", "KAWAII?"):
+            grid_quads, grid_width = fontgen.layout_label(self.atlases["grid"], text)
+            packed_quads, packed_width = fontgen.layout_label(self.atlases["packed"], text)
+            self.assertEqual(grid_width, packed_width, text)
+            self.assertEqual(len(grid_quads), len(packed_quads), text)
+            for grid_quad, packed_quad in zip(grid_quads, packed_quads):
+                message = f"{text}: grid {grid_quad[:4]}, packed {packed_quad[:4]}"
+                for i, tolerance in enumerate((x_tolerance, x_tolerance, z_tolerance, z_tolerance)):
+                    self.assertAlmostEqual(grid_quad[i], packed_quad[i], delta=tolerance, msg=message)
+
+    def test_packed_quads_are_trimmed(self):
+        quads, _ = fontgen.layout_label(self.atlases["packed"], "-")
+        x0, x1, z0, z1 = quads[0][:4]
+        self.assertGreater(x0, 0.0)
+        self.assertLess(x1, 1.0)
+        self.assertLess(z1 - z0, (fontgen.LABEL_QUAD_TOP - fontgen.LABEL_QUAD_BOTTOM) / 4)
+
+class AtlasBinTest(unittest.TestCase):
+    """Atlas.bin holds the runtime UVs of hand-made Atlas.json entries"""
+
+    GRID_ATLAS = {
+        "layout": "grid", "textureWidth": 1120, "textureHeight": 2048, "charWidth": 70, "charHeight": 128,
+        "charsPerRow": 16, "totalRows": 16,
+        "characters": {
+            "65": {"char": "A", "gridX": 1, "gridY": 2, "uvLeft": 1 / 16, "uvRight": 2 / 16,
+                   "uvTop": 2 / 16, "uvBottom": 3 / 16, "advance": 0.5},
+            "33": {"char": "!", "gridX": 1, "gridY": 0, "uvLeft": 1 / 16, "uvRight": 2 / 16,
+                   "uvTop": 0.0, "uvBottom": 1 / 16},
+        },
+    }
+    PACKED_ATLAS = {
+        "layout": "packed", "textureWidth": 256, "textureHeight": 128, "charWidth": 70, "charHeight": 128,
+        "characters": {
+            "66": {"char": "B", "x": 10, "y": 20, "width": 30, "height": 40, "offsetX": 5, "offsetY": 6,
+                   "uvLeft": 10 / 256, "uvRight": 40 / 256, "uvTop": 20 / 128, "uvBottom": 60 / 128,
+                   "advance": 0.75},
+        },
+    }
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp(prefix="font_test_")
+        self.addCleanup(shutil.rmtree, self.output_dir, True)
+
+    def write(self, atlas, texture_size=None):
+        path = os.path.join(self.output_dir, "Atlas.bin")
+        with contextlib.redirect_stdout(io.StringIO()):
+            fontgen.write_atlas_bin(atlas, path, texture_size)
+        return path
+
+    def assert_record(self, records, codepoint, expected):
+        record = fontgen.lookup_atlas_bin(records, codepoint)
+        self.assertIsNotNone(record)
+        for name, expected_value in zip(("uvLeft", "uvBottom", "uvRight", "uvTop", "advance"), expected):
+            self.assertAlmostEqual(float(record[name]), expected_value, places=6, msg=f"U+{codepoint:04X} {name}")
+
+    def test_grid_round_trip(self):
+        path = self.write(self.GRID_ATLAS)
+        header, records = fontgen.read_atlas_bin(path)
+        self.assertEqual((header["glyphCount"], header["textureWidth"], header["textureHeight"]), (2, 1120, 2048))
+        self.assertEqual(list(records["codepoint"]), [33, 65])
+        # Cells inset by 4px (the texture is over 600px wide), V flipped to a bottom-left origin
+        self.assert_record(records, 65, [0.0625 + 4 / 1120, 0.8125 + 4 / 2048, 0.125 - 4 / 1120, 0.875 - 4 / 2048, 0.5])
+        self.assert_record(records, 33, [0.0625 + 4 / 1120, 0.9375 + 4 / 2048, 0.125 - 4 / 1120, 1 - 4 / 2048, 1.0])
+        self.assertIsNone(fontgen.lookup_atlas_bin(records, 66))
+        fontgen.verify_atlas_bin(path, self.GRID_ATLAS)
+
+    def test_grid_tier_padding(self):
+        # A half resolution tier is at most 600px wide, so the inset is 2px of the smaller texture
+        path = self.write(self.GRID_ATLAS, (560, 1024))
+        _, records = fontgen.read_atlas_bin(path)
+        self.assert_record(records, 65, [0.0625 + 2 / 560, 0.8125 + 2 / 1024, 0.125 - 2 / 560, 0.875 - 2 / 1024, 0.5])
+        fontgen.verify_atlas_bin(path, self.GRID_ATLAS, (560, 1024))
+
+    def test_packed_round_trip(self):
+        path = self.write(self.PACKED_ATLAS)
+        header, records = fontgen.read_atlas_bin(path)
+        self.assertTrue(header["flags"] & fontgen.ATLAS_BIN_FLAG_PACKED)
+        self.assert_record(records, 66, [10 / 256, 1 - 60 / 128, 40 / 256, 1 - 20 / 128, 0.75])
+        fontgen.verify_atlas_bin(path, self.PACKED_ATLAS)
+
+    def test_verify_rejects_wrong_uvs(self):
+        path = self.write(self.GRID_ATLAS)
+        header_size = fontgen.ATLAS_BIN_HEADER.size
+        with open(path, 'r+b') as f:
+            # uvLeft of the first record (U+0021)
+            f.seek(header_size + fontgen.ATLAS_BIN_RECORD.fields["uvLeft"][1])
+            f.write(struct.pack('<f', 0.5))
+        with self.assertRaises(ValueError):
+            fontgen.verify_atlas_bin(path, self.GRID_ATLAS)
+
+class PackSkylineTest(unittest.TestCase):
+    """The skyline packer places every rectangle inside the texture without overlaps"""
+
+    def assert_packed(self, sizes, positions, width, height):
+        self.assertEqual(len(positions), len(sizes))
+        covered = np.zeros((height, width), dtype=np.uint8)
+        for (w, h), (x, y) in zip(sizes, positions):
+            self.assertTrue(0 <= x and x + w <= width and 0 <= y and y + h <= height, f"{w}x{h} at {x},{y}")
+            covered[y:y + h, x:x + w] += 1
+        self.assertLessEqual(int(covered.max()), 1)
+
+    def test_random_rects(self):
+        rng = np.random.default_rng(7)
+        sizes = [(int(w), int(h)) for w, h in rng.integers(4, 40, size=(120, 2))]
+        positions = fontgen.pack_skyline(sizes, 512, 512)
+        self.assertIsNotNone(positions)
+        self.assert_packed(sizes, positions, 512, 512)
+
+    def test_exact_fit(self):
+        sizes = [(32, 32)] * 4 + [(64, 16)]
+        positions = fontgen.pack_skyline(sizes, 64, 80)
+        self.assert_packed(sizes, positions, 64, 80)
+        self.assertEqual(sorted(positions[:4]), [(0, 0), (0, 32), (32, 0), (32, 32)])
+
+    def test_too_large(self):
+        self.assertIsNone(fontgen.pack_skyline([(32, 32)] * 5, 64, 64))
+        self.assertIsNone(fontgen.pack_skyline([(65, 1)], 64, 64))
+
+    def test_texture_size(self):
+        sizes = [(30, 50)] * 20
+        width, height, positions = fontgen.find_packed_texture_size(sizes)
+        self.assertEqual((width & (width - 1), height & (height - 1)), (0, 0))
+        self.assertGreaterEqual(width * height, 30 * 50 * 20)
+        self.assert_packed(sizes, positions, width, height)
+
+class DistanceFieldTest(unittest.TestCase):
+    """Distance fields are exact within their radius and encode the edge at 128"""
+
+    def test_distance_to_features(self):
+        rng = np.random.default_rng(5)
+        features = rng.random((2, 24, 20)) > 0.97
+        features[1] = False
+        features[1, 3, 4] = True
+        radius = 6
+        distances = fontgen.distance_to_features(features, radius)
+        
+        y, x = np.mgrid[0:24, 0:20]
+        for cell in range(2):
+            expected = np.full((24, 20), float(radius))
+            for fy, fx in zip(*np.nonzero(features[cell])):
+                expected = np.minimum(expected, np.hypot(y - fy, x - fx))
+            np.testing.assert_allclose(distances[cell], expected, atol=1e-4)
+
+    def test_vertical_edge(self):
+        # Left half inside: the output is a ramp across the edge, constant down each column
+        scale, spread = 4, 4
+        coverage = np.zeros((1, 32 * scale, 32 * scale), dtype=np.uint8)
+        coverage[:, :, :16 * scale] = 255
+        cells = fontgen.compute_sdf_cells(coverage, scale, spread)
+        self.assertEqual(cells.shape, (1, 32, 32))
+        self.assertTrue((cells[0] == cells[0, :1]).all())
+        
+        # Signed distance of each output pixel center to the edge, in output pixels
+        distance = np.arange(32) + 0.5 - 16
+        expected = np.round(np.clip(0.5 - distance / (2 * spread), 0, 1) * 255)
+        self.assertLessEqual(np.abs(cells[0, 0].astype(np.float64) - expected).max(), 1)
+        self.assertGreater(int(cells[0, 0, 15]), 128)
+        self.assertLess(int(cells[0, 0, 16]), 128)
+        self.assertEqual((int(cells[0, 0, 0]), int(cells[0, 0, 31])), (255, 0))
+
+    def test_empty_cell(self):
+        cells = fontgen.compute_sdf_cells(np.zeros((1, 16, 16), dtype=np.uint8), 2, 4)
+        self.assertTrue((cells == 0).all())
+
+class DownsampleTest(unittest.TestCase):
+    """Tiers average each block of texels, weighting colour by alpha"""
+
+    def test_single_channel(self):
+        pixels = np.arange(64, dtype=np.uint8).reshape(8, 8) * 4
+        half = fontgen.downsample_area(Image.fromarray(pixels, 'L'), 2)
+        self.assertEqual((half.mode, half.size), ('L', (4, 4)))
+        expected = pixels.astype(np.float64).reshape(4, 2, 4, 2).mean(axis=(1, 3))
+        np.testing.assert_array_equal(np.asarray(half), np.round(expected))
+
+    def test_premultiplied_alpha(self):
+        # One opaque white texel among transparent black ones stays white, at a quarter coverage
+        pixels = np.zeros((4, 4, 4), dtype=np.uint8)
+        pixels[0, 0] = (255, 255, 255, 255)
+        pixels[2:, 2:] = (255, 0, 0, 128)
+        quarter = np.asarray(fontgen.downsample_area(Image.fromarray(pixels, 'RGBA'), 2))
+        self.assertEqual(quarter[0, 0].tolist(), [255, 255, 255, 64])
+        self.assertEqual(quarter[1, 1].tolist(), [255, 0, 0, 128])
+        self.assertEqual(quarter[0, 1].tolist(), [0, 0, 0, 0])
+
+    def test_factors(self):
+        img = Image.new('RGBA', (12, 8), (255, 255, 255, 255))
+        self.assertEqual(fontgen.downsample_area(img, 1).tobytes(), img.tobytes())
+        self.assertEqual(fontgen.downsample_area(img, 4).size, (3, 2))
+        with self.assertRaises(ValueError):
+            fontgen.downsample_area(img, 8)
+
+class CharsetSubsetTest(unittest.TestCase):
+    """--charset-from keeps the glyphs a corpus uses, and only those"""
+
+    def setUp(self):
+        self.addCleanup(setattr, fontgen, "CHARSET_SUBSET", fontgen.CHARSET_SUBSET)
+        self.corpus_dir = tempfile.mkdtemp(prefix="font_test_")
+        self.addCleanup(shutil.rmtree, self.corpus_dir, True)
+
+    def write(self, name, text):
+        with open(os.path.join(self.corpus_dir, name), 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_collect_corpus(self):
+        self.write("Labels.txt", "Kühlraum\tÉ\n")
+        # Only text and attribute values count, not tag or attribute names
+        self.write("Keyed.xml", '<LanguageData><x label="Ωμ">Ёж</x></LanguageData>')
+        self.write("Notes.md", "ignored: Z")
+        codepoints = fontgen.collect_corpus_codepoints([self.corpus_dir], "0030-0031,0041")
+        self.assertEqual("".join(sorted(map(chr, codepoints))), "01AKahlmruÉüΩμЁж")
+
+    def test_corpus_files(self):
+        self.write("a.txt", "a")
+        os.makedirs(os.path.join(self.corpus_dir, "sub"))
+        self.write(os.path.join("sub", "b.XML"), "<b/>")
+        self.write("c.png", "")
+        single = os.path.join(self.corpus_dir, "c.png")
+        files = list(fontgen.iter_corpus_files([self.corpus_dir, single]))
+        self.assertEqual([os.path.relpath(path, self.corpus_dir) for path in files],
+                         ["a.txt", os.path.join("sub", "b.XML"), "c.png"])
+
+    @unittest.skipIf(TEST_FONT is None, "no test font installed")
+    def test_subset_atlas(self):
+        # Spaces have no ink; the characters left out must not fall back to .notdef
+        fontgen.CHARSET_SUBSET = fontgen.parse_codepoint_ranges("0020,0041-0043,00A0,00E9")
+        output_dir = tempfile.mkdtemp(prefix="font_test_")
+        self.addCleanup(shutil.rmtree, output_dir, True)
+        for layout in ("grid", "packed"):
+            os.makedirs(os.path.join(output_dir, layout))
+            atlas = build_font(TEST_FONT, os.path.join(output_dir, layout), layout)
+            self.assertEqual("".join(entry["char"] for entry in atlas["characters"].values()), "ABCé", layout)
+
+class PngEncodingTest(unittest.TestCase):
+    """Every PNG encoding decodes back to the white-glyph RGBA texture it was written from"""
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp(prefix="font_test_")
+        self.addCleanup(shutil.rmtree, self.output_dir, True)
+        for name in ("PNG_ENCODING", "DDS_FORMAT"):
+            self.addCleanup(setattr, fontgen, name, getattr(fontgen, name))
+        fontgen.DDS_FORMAT = None
+        y, x = np.mgrid[0:32, 0:48]
+        self.alpha = np.clip((12 - np.hypot(x - 20.5, y - 15.5)) * 40, 0, 255).astype(np.uint8)
+        self.img = Image.fromarray(np.dstack([np.full((32, 48, 3), 255, np.uint8), self.alpha]), 'RGBA')
+
+    def test_round_trip(self):
+        for encoding, mode in (("rgba", 'RGBA'), ("la", 'LA'), ("l", 'L'), ("palette", 'P')):
+            fontgen.PNG_ENCODING = encoding
+            path = os.path.join(self.output_dir, f"Font.{encoding}.png")
+            fontgen.save_texture_png(self.img, path)
+            with Image.open(path) as img:
+                self.assertEqual(img.mode, mode, encoding)
+                decoded = np.asarray(fontgen.decode_texture(img, encoding))
+            np.testing.assert_array_equal(decoded[:, :, 3], self.alpha, encoding)
+            self.assertTrue((decoded[self.alpha > 0, :3] == 255).all(), encoding)
+
+    def test_distance_fields_unchanged(self):
+        field = Image.fromarray(self.alpha, 'L')
+        for encoding in fontgen.PNG_ENCODINGS:
+            self.assertIs(fontgen.encode_texture(field, encoding), field)
+
+    def test_lossy_encoding_rejected(self):
+        # Only white glyphs survive dropping the colour channels
+        red = Image.fromarray(np.dstack([np.full((32, 48), 255, np.uint8), np.zeros((32, 48, 2), np.uint8),
+                                         self.alpha]), 'RGBA')
+        fontgen.PNG_ENCODING = "l"
+        with self.assertRaisesRegex(ValueError, "changed glyph colours"):
+            fontgen.save_texture_png(red, os.path.join(self.output_dir, "Red.png"))
+
+class DdsTest(unittest.TestCase):
+    """Block decoding follows the BC4/DXT5 formulas, and encoded textures stay within DDS_MAX_ERROR"""
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp(prefix="font_test_")
+        self.addCleanup(shutil.rmtree, self.output_dir, True)
+        saved = fontgen.DDS_FORMAT
+        self.addCleanup(setattr, fontgen, "DDS_FORMAT", saved)
+
+    @staticmethod
+    def pack_indices(indices, bits):
+        value = sum(index << (i * bits) for i, index in enumerate(indices))
+        return value.to_bytes(16 * bits // 8, 'little')
+
+    def assert_close(self, actual, expected):
+        self.assertLessEqual(np.abs(np.asarray(actual, dtype=np.float64) - expected).max(), 1.0,
+                             f"{np.asarray(actual).tolist()} vs {np.asarray(expected).tolist()}")
+
+    def test_bc4_blocks(self):
+        indices = [i % 8 for i in range(16)]
+        # a0 > a1: the endpoints and six values between them
+        block = bytes([255, 0]) + self.pack_indices(indices, 3)
+        palette = [255, 0] + [(7 - i) * 255 / 7 for i in range(1, 7)]
+        self.assert_close(fontgen.decode_bc4_blocks(np.frombuffer(block, np.uint8).reshape(1, 8))[0],
+                          [palette[i] for i in indices])
+        # a0 <= a1: four values between the endpoints, then exact 0 and 255
+        block = bytes([10, 200]) + self.pack_indices(indices, 3)
+        palette = [10, 200] + [((5 - i) * 10 + i * 200) / 5 for i in range(1, 5)] + [0, 255]
+        decoded = fontgen.decode_bc4_blocks(np.frombuffer(block, np.uint8).reshape(1, 8))[0]
+        self.assert_close(decoded, [palette[i] for i in indices])
+        self.assertEqual([int(decoded[i]) for i in (6, 7)], [0, 255])
+
+    def test_dxt5_blocks(self):
+        indices = [i % 4 for i in range(16)]
+        # Opaque alpha, red and blue RGB565 endpoints
+        block = bytes([255, 255]) + bytes(6) + struct.pack('<HH', 0xF800, 0x001F) + self.pack_indices(indices, 2)
+        palette = [(255, 0, 0), (0, 0, 255), (170, 0, 85), (85, 0, 170)]
+        decoded = fontgen.decode_dxt5_blocks(np.frombuffer(block, np.uint8).reshape(1, 16))[0]
+        self.assert_close(decoded[:, :3], [palette[i] for i in indices])
+        self.assertTrue((decoded[:, 3] == 255).all())
+
+    def test_encoded_texture(self):
+        # A white anti-aliased disc, like a glyph
+        y, x = np.mgrid[0:64, 0:64]
+        alpha = np.clip((24 - np.hypot(x - 31.5, y - 31.5)) * 64, 0, 255).astype(np.uint8)
+        img = Image.fromarray(np.dstack([np.full((64, 64, 3), 255, np.uint8), alpha]), 'RGBA')
+        
+        for dds_format, fourcc, block_size in (("bc4", b'ATI1', 8), ("dxt5", b'DXT5', 16)):
+            fontgen.DDS_FORMAT = dds_format
+            path = os.path.join(self.output_dir, f"Font.{dds_format}.dds")
+            fontgen.write_dds(img, path)
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Fields at their DDS_HEADER offsets: size, height, width, linear size, pixel format fourCC
+            self.assertEqual(data[:4], b'DDS ')
+            self.assertEqual(struct.unpack_from('<I', data, 4)[0], 124)
+            self.assertEqual(struct.unpack_from('<III', data, 12), (64, 64, 16 * 16 * block_size))
+            self.assertEqual(data[84:88], fourcc)
+            self.assertEqual(len(data), 128 + 16 * 16 * block_size)
+            
+            decoded = fontgen.read_dds(path)
+            decoded_alpha = decoded if decoded.ndim == 2 else decoded[:, :, 3]
+            self.assertLessEqual(int(np.abs(alpha.astype(np.int16) - decoded_alpha).max()), fontgen.DDS_MAX_ERROR)
+            if decoded.ndim == 3:
+                self.assertTrue((decoded[alpha > 0, :3] == 255).all())
+
+    def test_l_encoded_tier(self):
+        # "l" textures store coverage as luminance; their DXT5 tiers must keep it in alpha
+        for name in ("PNG_ENCODING", "RESOLUTION_TIERS"):
+            self.addCleanup(setattr, fontgen, name, getattr(fontgen, name))
+        fontgen.PNG_ENCODING, fontgen.RESOLUTION_TIERS, fontgen.DDS_FORMAT = "l", ["full", "half"], "dxt5"
+        y, x = np.mgrid[0:64, 0:64]
+        alpha = np.clip((24 - np.hypot(x - 31.5, y - 31.5)) * 64, 0, 255).astype(np.uint8)
+        img = Image.fromarray(np.dstack([np.full((64, 64, 3), 255, np.uint8), alpha]), 'RGBA')
+        with contextlib.redirect_stdout(io.StringIO()):
+            fontgen.save_texture_png(img, os.path.join(self.output_dir, "Font.png"))
+            fontgen.generate_resolution_tiers(self.output_dir)
+
+        with Image.open(os.path.join(self.output_dir, "FontHalf.png")) as half:
+            self.assertEqual(half.mode, 'L')
+            coverage = np.asarray(half).astype(np.int16)
+        np.testing.assert_array_equal(coverage, np.asarray(fontgen.downsample_area(img, 2).getchannel('A')))
+        decoded = fontgen.read_dds(os.path.join(self.output_dir, "FontHalf.dds"))
+        self.assertLessEqual(int(np.abs(coverage - decoded[:, :, 3]).max()), fontgen.DDS_MAX_ERROR)
+        self.assertTrue((decoded[coverage == 0, 3] == 0).all())
+
+class VerifyTest(unittest.TestCase):
+    """--verify reports Atlas.json fields newer than the golden apart from real differences"""
+
+    def test_schema_additions(self):
+        golden = {"fontName": "Test", "characters": {"65": {"uvLeft": 0.25, "supported": True}}}
+        generated = {"fontName": "Test", "formatVersion": 1,
+                     "characters": {"65": {"uvLeft": 0.25, "supported": True, "advance": 0.5}}}
+        self.assertEqual(fontgen.diff_atlas_json(golden, generated), [])
+        self.assertEqual(fontgen.get_schema_additions(golden, generated), (["formatVersion"], ["advance"]))
+
+    def test_changes_still_differ(self):
+        golden = {"fontName": "Test", "layout": "grid", "characters": {"65": {"uvLeft": 0.25}, "66": {"uvLeft": 0.5}}}
+        generated = {"fontName": "Test", "characters": {"65": {"uvLeft": 0.375, "advance": 0.5}}}
+        self.assertEqual(fontgen.diff_atlas_json(golden, generated),
+                         ["field layout removed", "1 characters removed: U+0042 'B'",
+                          "character U+0041 'A' changed: uvLeft"])
+        self.assertEqual(fontgen.get_schema_additions(golden, generated), ([], ["advance"]))
+
+class CmapLookupTest(unittest.TestCase):
+    """cmap subtables are searched by binary search, including at the edges of their ranges"""
+
+    def test_format4_segments(self):
+        # Two delta segments plus the required 0xFFFF terminator
+        end_codes, start_codes, deltas = [0x5A, 0x7A, 0xFFFF], [0x41, 0x61, 0xFFFF], [-0x40, -0x50, 1]
+        segments = struct.pack('>3H', *end_codes) + b'\0\0' + struct.pack('>3H', *start_codes)
+        segments += struct.pack('>3h', *deltas) + struct.pack('>3H', 0, 0, 0)
+        data = struct.pack('>7H', 4, 14 + len(segments), 0, 6, 4, 1, 2) + segments
+        lookup = fontgen._cmap_subtable_lookup(data, 0)
+        self.assertEqual([lookup(cp) for cp in (0x40, 0x41, 0x5A, 0x5B, 0x61, 0x7A, 0x7B, 0xFFFE)],
+                         [0, 1, 0x1A, 0, 0x11, 0x2A, 0, 0])
+
+    def test_format12_groups(self):
+        groups = [(0x20, 0x7E, 1), (0x4E00, 0x9FFF, 100), (0x20000, 0x20010, 30000)]
+        data = struct.pack('>HHIII', 12, 0, 16 + 12 * len(groups), 0, len(groups))
+        data += b''.join(struct.pack('>III', *group) for group in groups)
+        lookup = fontgen._cmap_subtable_lookup(data, 0)
+        self.assertEqual([lookup(cp) for cp in (0x1F, 0x20, 0x7E, 0x7F, 0x4E00, 0x9FFF, 0xA000, 0x20010, 0x20011)],
+                         [0, 1, 0x5F, 0, 100, 100 + 0x51FF, 0, 30016, 0])
+
+class ProfileTest(unittest.TestCase):
+    """--profile credits time to the innermost stage and sums counters per font"""
+
+    def setUp(self):
+        self.addCleanup(setattr, fontgen, "PROFILE_ENABLED", fontgen.PROFILE_ENABLED)
+        self.addCleanup(fontgen.take_profile_data)
+        fontgen.PROFILE_ENABLED = True
+        fontgen.take_profile_data()
+
+    def test_disabled(self):
+        fontgen.PROFILE_ENABLED = False
+        with fontgen.profile_font("Test", "texture"), fontgen.profile_stage("assemble"):
+            fontgen.profile_count("glyphs_rendered")
+        self.assertEqual(fontgen.take_profile_data(), {})
+
+    def test_nested_stages(self):
+        with fontgen.profile_font("Test", "texture"):
+            with fontgen.profile_stage("assemble"):
+                with fontgen.profile_stage("png_encode"):
+                    time.sleep(0.05)
+                fontgen.profile_count("bytes_written", 100)
+            fontgen.profile_count("bytes_written", 20)
+        # Outside profile_font nothing is recorded
+        fontgen.profile_count("bytes_written", 1000)
+        
+        data = fontgen.take_profile_data()
+        self.assertEqual(set(data), {"Test"})
+        stages = data["Test"]["stages"]
+        self.assertEqual(set(stages), {"other", "assemble", "png_encode"})
+        self.assertGreaterEqual(stages["png_encode"], 0.05)
+        self.assertLess(stages["assemble"], 0.05)
+        self.assertEqual(data["Test"]["counters"], {"bytes_written": 120})
+
+    def test_merge_worker_data(self):
+        with fontgen.profile_font("Test", "texture"), fontgen.profile_stage("pack"):
+            fontgen.profile_count("glyphs_rendered", 3)
+        worker = fontgen.take_profile_data()
+        fontgen.merge_profile_data(worker)
+        fontgen.merge_profile_data(worker)
+        merged = fontgen.take_profile_data()
+        self.assertEqual(merged["Test"]["counters"], {"glyphs_rendered": 6})
+        self.assertAlmostEqual(merged["Test"]["stages"]["pack"], 2 * worker["Test"]["stages"]["pack"])
+
+    @unittest.skipIf(TEST_FONT is None, "no test font installed")
+    def test_font_counters(self):
+        output_dir = tempfile.mkdtemp(prefix="font_test_")
+        self.addCleanup(shutil.rmtree, output_dir, True)
+        with fontgen.profile_font("Test", "texture"):
+            atlas = build_font(TEST_FONT, output_dir)
+        counters = fontgen.take_profile_data()["Test"]["counters"]
+        self.assertEqual(counters["glyphs_supported"], atlas["metadata"]["totalSupportedCharacters"])
+        self.assertGreater(counters["glyphs_rendered"], 0)
+        written = sum(os.path.getsize(os.path.join(output_dir, name)) for name in os.listdir(output_dir))
+        self.assertEqual(counters["bytes_written"], written)
+
+@unittest.skipIf(TEST_FONT is None, "no test font installed")
+class CombinedOutputTest(unittest.TestCase):
+    """Combined UVs sample the same texels in the combined textures as the per-font UVs do"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.output_dir = tempfile.mkdtemp(prefix="font_test_")
+        cls.atlases = {}
+        for font_name, layout in (("Grid", "grid"), ("Packed", "packed")):
+            os.makedirs(os.path.join(cls.output_dir, font_name))
+            cls.atlases[font_name] = build_font(TEST_FONT, os.path.join(cls.output_dir, font_name), layout)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.output_dir, ignore_errors=True)
+
+    def setUp(self):
+        for name in ("OUTPUT_DIR", "COMBINED_MODE"):
+            self.addCleanup(setattr, fontgen, name, getattr(fontgen, name))
+        fontgen.OUTPUT_DIR = self.output_dir
+        self.combined_dir = tempfile.mkdtemp(prefix="font_test_")
+        self.addCleanup(shutil.rmtree, self.combined_dir, True)
+
+    @staticmethod
+    def texels(path, rect):
+        """The pixels under a runtime UV rect (bottom-left origin)"""
+        with Image.open(path) as img:
+            width, height = img.size
+            uv_left, uv_bottom, uv_right, uv_top = rect
+            box = (round(uv_left * width), round((1 - uv_top) * height),
+                   round(uv_right * width), round((1 - uv_bottom) * height))
+            return np.asarray(img.convert('RGBA').crop(box))
+
+    def check_combined(self, mode):
+        fontgen.COMBINED_MODE = mode
+        with contextlib.redirect_stdout(io.StringIO()):
+            combined = fontgen.write_combined_output(sorted(self.atlases), self.combined_dir)
+        self.assertEqual(set(combined["fonts"]), set(self.atlases))
+        self.assertEqual([entry["font"] for entry in combined["slices"]], ["Grid", "Packed"])
+        with open(os.path.join(self.combined_dir, "Combined.json"), 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f), combined)
+        
+        for font_name, atlas in self.atlases.items():
+            glyphs = combined["fonts"][font_name]["glyphs"]
+            self.assertEqual(set(glyphs), set(atlas["characters"]))
+            for char_code in ("65", "103", "1046"):
+                entry = atlas["characters"][char_code]
+                slice_index, *rect, advance = glyphs[char_code]
+                texture = combined["textures"][slice_index if mode == "array" else 0]
+                np.testing.assert_array_equal(
+                    self.texels(os.path.join(self.combined_dir, f"{texture}.png"), rect),
+                    self.texels(os.path.join(self.output_dir, font_name, "Font.png"),
+                                fontgen.get_runtime_uv_rect(atlas, entry)))
+                self.assertEqual(advance, entry["advance"])
+        return combined
+
+    def test_atlas(self):
+        combined = self.check_combined("atlas")
+        self.assertEqual(combined["textures"], ["Fonts"])
+        with Image.open(os.path.join(self.combined_dir, "Fonts.png")) as img:
+            self.assertEqual(img.size, (combined["textureWidth"], combined["textureHeight"]))
+
+    def test_array(self):
+        combined = self.check_combined("array")
+        self.assertEqual(combined["textures"], ["Slice00", "Slice01"])
+        for texture in combined["textures"]:
+            with Image.open(os.path.join(self.combined_dir, f"{texture}.png")) as img:
+                self.assertEqual(img.size, (combined["sliceWidth"], combined["sliceHeight"]))
+
+class PreviewSheetTest(unittest.TestCase):
+    """Font previews are packed into one sheet whose index locates each of them"""
+
+    def test_pack_rows(self):
+        gutter, height = fontgen.PREVIEW_SHEET_GUTTER, fontgen.PREVIEW_HEIGHT
+        row = height + gutter
+        # The 500px preview doesn't fit after the 600px one in a 1024px row
+        sheet_width, sheet_height, positions = fontgen.pack_preview_sheet([(600, height), (500, height), (100, height)])
+        self.assertEqual(positions, [(0, 0), (0, row), (500 + gutter, row)])
+        self.assertEqual((sheet_width, sheet_height), (fontgen.PREVIEW_SHEET_WIDTH, row + height))
+        # A preview wider than the sheet widens it
+        sheet_width, sheet_height, positions = fontgen.pack_preview_sheet([(100, height), (1200, height)])
+        self.assertEqual(positions, [(0, 0), (0, row)])
+        self.assertEqual((sheet_width, sheet_height), (1200, row + height))
+
+    @unittest.skipIf(TEST_FONT is None, "no test font installed")
+    def test_sheet_holds_previews(self):
+        output_dir = tempfile.mkdtemp(prefix="font_test_")
+        self.addCleanup(shutil.rmtree, output_dir, True)
+        path = os.path.join(output_dir, "Previews.png")
+        with contextlib.redirect_stdout(io.StringIO()):
+            index = fontgen.write_preview_sheet([(TEST_FONT, "Alpha"), (TEST_FONT, "Beta Gamma")], path)
+        
+        with Image.open(path) as sheet:
+            self.assertEqual(sheet.size, (index["textureWidth"], index["textureHeight"]))
+            for font_name, rect in index["fonts"].items():
+                preview = fontgen.render_preview_image(TEST_FONT, font_name)
+                self.assertEqual((rect["width"], rect["height"]), preview.size)
+                box = (rect["x"], rect["y"], rect["x"] + rect["width"], rect["y"] + rect["height"])
+                self.assertEqual(sheet.crop(box).tobytes(), preview.tobytes(), font_name)
+                self.assertAlmostEqual(rect["uvLeft"] * sheet.width, rect["x"])
+                self.assertAlmostEqual((1 - rect["uvTop"]) * sheet.height, rect["y"])
+                self.assertAlmostEqual((1 - rect["uvBottom"]) * sheet.height, rect["y"] + rect["height"])
+
+    @unittest.skipIf(TEST_FONT is None, "no test font installed")
+    def test_build_skips_unchanged(self):
+        output_dir = tempfile.mkdtemp(prefix="font_test_")
+        self.addCleanup(shutil.rmtree, output_dir, True)
+        for name, value in (("OUTPUT_DIR", output_dir), ("GLYPH_CACHE_DIR", None)):
+            self.addCleanup(setattr, fontgen, name, getattr(fontgen, name))
+            setattr(fontgen, name, value)
+        
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            fontgen.build_fonts([(TEST_FONT, "Test")])
+            # Fonts of this run that weren't built are left out
+            self.assertTrue(fontgen.build_preview_sheet(["Test", "Missing"]))
+        with open(os.path.join(output_dir, "Previews.json"), 'r', encoding='utf-8') as f:
+            self.assertEqual(list(json.load(f)["fonts"]), ["Test"])
+        
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertTrue(fontgen.build_preview_sheet(["Test"]))
+        self.assertIn("Skipping preview sheet (up to date)", output.getvalue())
+        self.assertFalse(fontgen.build_preview_sheet(["Missing"]))
+
+@unittest.skipIf(TEST_FONT is None, "no test font installed")
+class GlyphSupportTest(unittest.TestCase):
+    """Reading the cmap must not change which characters count as supported"""
+
+    def test_unmapped_codepoints_draw_notdef(self):
+        # Private use codepoints aren't in the font's cmap, so they draw its .notdef box
+        charset = [chr(0xE000), chr(0xE001), "A"] + [None] * (fontgen.TOTAL_CHARS - 3)
+        coverage = fontgen.read_cmap_coverage(TEST_FONT, {ord(c) for c in charset if c is not None})
+        self.assertEqual(coverage, {ord("A")})
+        
+        saved = fontgen.GLYPH_CACHE_DIR
+        fontgen.GLYPH_CACHE_DIR = None
+        try:
+            img, supported_chars, _ = fontgen.build_font_texture(TEST_FONT, coverage, charset)
+        finally:
+            fontgen.GLYPH_CACHE_DIR = saved
+        self.assertEqual(supported_chars, {chr(0xE000): True, chr(0xE001): True, "A": True})
+        cells = [img.crop((i * fontgen.CHAR_WIDTH, 0, (i + 1) * fontgen.CHAR_WIDTH, fontgen.CHAR_HEIGHT)).tobytes()
+                 for i in range(3)]
+        self.assertEqual(cells[0], cells[1])
+        self.assertNotEqual(cells[0], cells[2])
+
+    def test_render_errors_are_reported(self):
+        render = fontgen.render_glyph_raster
+        def failing_render(font, char):
+            if char == "B":
+                raise OSError("broken outline")
+            return render(font, char)
+        fontgen.render_glyph_raster = failing_render
+        self.addCleanup(setattr, fontgen, "render_glyph_raster", render)
+        # Rendered, not cached, rasters
+        self.addCleanup(setattr, fontgen, "GLYPH_CACHE_DIR", fontgen.GLYPH_CACHE_DIR)
+        fontgen.GLYPH_CACHE_DIR = None
+        
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            rasters = fontgen.rasterize_glyphs(TEST_FONT, fontgen.load_font(TEST_FONT, fontgen.FONT_SIZE),
+                                               fontgen.FONT_SIZE, "ABC")
+        self.assertEqual(sorted(rasters), ["A", "C"])
+        self.assertIn("U+0042: OSError: broken outline", output.getvalue())
+
+@unittest.skipIf(TEST_FONT is None, "no test font installed")
+class BuildManifestTest(unittest.TestCase):
+    """Fonts are rebuilt only when their source, the settings or their outputs changed"""
+
+    def setUp(self):
+        output_dir = tempfile.mkdtemp(prefix="font_test_")
+        self.addCleanup(shutil.rmtree, output_dir, True)
+        for name, value in (("OUTPUT_DIR", output_dir), ("GLYPH_CACHE_DIR", None)):
+            self.addCleanup(setattr, fontgen, name, getattr(fontgen, name))
+            setattr(fontgen, name, value)
+        self.font_dir = os.path.join(output_dir, "Test")
+
+    def build(self, force=False):
+        """Run build_fonts for the test font, returning whether it was regenerated"""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(fontgen.build_fonts([(TEST_FONT, "Test")], force=force), {"Test": True})
+        return "Processing font: Test" in output.getvalue()
+
+    def test_unchanged_font_is_skipped(self):
+        self.assertTrue(self.build())
+        outputs = fontgen.hash_outputs(self.font_dir)
+        self.assertFalse(self.build())
+        self.assertEqual(fontgen.hash_outputs(self.font_dir), outputs)
+        self.assertTrue(self.build(force=True))
+
+    def test_changes_invalidate(self):
+        self.assertTrue(self.build())
+        # An edited output
+        with open(os.path.join(self.font_dir, "Atlas.json"), 'a', encoding='utf-8') as f:
+            f.write(" ")
+        self.assertTrue(self.build())
+        # A deleted output
+        os.remove(os.path.join(self.font_dir, "Preview.png"))
+        self.assertTrue(self.build())
+        self.assertTrue(os.path.exists(os.path.join(self.font_dir, "Preview.png")))
+        # A generator setting
+        self.addCleanup(setattr, fontgen, "PACK_GUTTER", fontgen.PACK_GUTTER)
+        fontgen.PACK_GUTTER += 1
+        self.assertTrue(self.build())
+        self.assertFalse(self.build())
+
+if __name__ == "__main__":
+    unittest.main()